@@ -0,0 +1,23 @@
+# Every cache here is shared by all the workers and servers using it, so the
+# directory, availability and summary entries and their invalidation are seen
+# by all of them. A per process LocMemCache is only right for one worker.
+
+# redis, the default: a cache hit costs no database query.
+
+REDIS = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# Opt in for deployments without redis. Every hit, and every generation key
+# read before it, is a query; create the table with
+# `python manage.py createcachetable`.
+
+DATABASE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'dineeasy_cache',
+    }
+}
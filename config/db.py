@@ -6,6 +6,14 @@ SQLITE = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # A file, not shared-cache memory, so concurrent tests wait on locks
+        # instead of failing with "database table is locked".
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        }
     }
 }
 
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 
-from config import db
+from config import cache, db
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,6 +39,7 @@ THIRD_APPS = [
 INSTALLED_APPS = DJANGO_APPS + LOCAL_APPS + THIRD_APPS
 
 MIDDLEWARE = [
+    'core.metrics.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +75,8 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 DATABASES = db.SQLITE
 
+CACHES = cache.REDIS
+
 
 
 # Password validation
@@ -121,6 +124,12 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
 MEDIA_URL = '/media/'
 
+# core.media.media_view serves MEDIA_URL. Set MEDIA_SERVING to override the
+# defaults in core.media: SENDFILE hands the file body to the web server,
+# 'X-Sendfile' (Apache, lighttpd) with the file path, or 'X-Accel-Redirect'
+# (nginx) with ACCEL_REDIRECT_PREFIX + the media path, an internal location
+# aliased to MEDIA_ROOT.
+
 # AUTH_USER_MODEL
 AUTH_USER_MODEL = 'customers.CustomerUser'
 
@@ -137,6 +146,19 @@ REST_FRAMEWORK = {
 }
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Keeps a per restaurant counter row (TableSummary) updated on every Table
+# status change, so the table summary is read in O(1).
+TABLE_SUMMARY_COUNTERS = False
+
+# CachedTokenAuthentication: in process LRU of authenticated tokens. Set
+# CACHE_ALIAS to one of CACHES to share the entries between workers and to
+# revoke them in every worker at once, for one cache read per request.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 60,
+    'CACHE_ALIAS': None,
+}
+
 
 
 # SPECTACULAR_SETTINGS = {
@@ -1,21 +1,26 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework.authtoken import views
 
+from core.media import media_view
+from core.metrics import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-token-auth/', views.obtain_auth_token),
     path('api/', include('core.restaurant.urls')),
     path('api/', include('core.customers.urls')),
     path('api/', include('core.reservations.urls')),
+    path('api/metrics', MetricsView.as_view(), name='metrics'),
 
     #   Docs api
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$', media_view, name='media'),
+]
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, JsonResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.customers.authentication import CachedTokenAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Base of the async read endpoints. DRF views can not run ``async def``
+    handlers, so this is a plain Django view that authenticates with
+    ``CachedTokenAuthentication.aauthenticate``, checks DRF permissions and
+    renders DRF serializer data as JSON. Handlers get a DRF ``Request`` so
+    the paginators can read ``query_params``.
+    """
+    http_method_names = ['get', 'head', 'options']
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            # Like DRF, honour the credentials forced by APIClient.force_authenticate.
+            user = getattr(request, '_force_auth_user', None)
+            token = getattr(request, '_force_auth_token', None)
+            if user is None and token is None:
+                user, token = await self.authenticate(request)
+            request = Request(request, authenticators=())
+            request.user, request.auth = user, token
+            for permission in [permission() for permission in self.permission_classes]:
+                if not permission.has_permission(request, self):
+                    if request.auth is None:
+                        raise exceptions.NotAuthenticated()
+                    raise exceptions.PermissionDenied()
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.response({'detail': str(exc)}, status=status.HTTP_404_NOT_FOUND)
+        except exceptions.APIException as exc:
+            response = self.response({'detail': exc.detail}, status=exc.status_code)
+            if isinstance(exc, exceptions.AuthenticationFailed | exceptions.NotAuthenticated):
+                response['WWW-Authenticate'] = self.authentication_classes[0]().authenticate_header(request)
+            return response
+
+    async def authenticate(self, request):
+        for authentication in [authentication() for authentication in self.authentication_classes]:
+            result = await authentication.aauthenticate(request)
+            if result is not None:
+                return result
+        return AnonymousUser(), None
+
+    def response(self, data, status=status.HTTP_200_OK):
+        return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
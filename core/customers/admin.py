@@ -6,12 +6,16 @@ from django.urls import reverse
 from django.utils.html import format_html
 from rest_framework.authtoken.models import Token
 
+from core.utilis import EstimatedCountPaginator
+
 
 class CustomerUserAdmin(UserAdmin):
     list_display = ('username', 'get_full_name', 'email', 'phone', 'get_groups', 'is_staff', 'show_token')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
     search_fields = ('username', 'first_name', 'last_name', 'email', 'phone')
     ordering = ('username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
@@ -30,6 +34,16 @@ class CustomerUserAdmin(UserAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('auth_token').prefetch_related('groups')
+
+    def get_token(self, obj):
+        # Tokens are created with the user (create_auth_token), never on a GET.
+        try:
+            return obj.auth_token
+        except Token.DoesNotExist:
+            return None
+
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip() or "-"
 
@@ -41,14 +55,16 @@ class CustomerUserAdmin(UserAdmin):
     get_groups.short_description = 'Groups'
 
     def show_token(self, obj):
-        token = Token.objects.get_or_create(user=obj)[0]
+        token = self.get_token(obj)
+        if token is None:
+            return '-'
         return format_html('<span title="{}">{}</span>', token.key, token.key[:10] + '...')
 
     show_token.short_description = 'Access Token'
 
     def view_token(self, obj):
-        token = Token.objects.get_or_create(user=obj)[0]
-        return token.key
+        token = self.get_token(obj)
+        return token.key if token is not None else '-'
 
     def get_readonly_fields(self, request, obj=None):
         if obj:  # editing an existing object
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.customers'
+
+    def ready(self):
+        from core.customers import authentication, summary  # noqa: F401
@@ -0,0 +1,159 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from core.customers.models import CustomerUser
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 60,
+    'CACHE_ALIAS': None,
+    **getattr(settings, 'TOKEN_AUTH_CACHE', {})
+}
+
+
+class TokenCache:
+    """
+    LRU of token key -> ``(user, token)`` with a TTL, kept in process and
+    optionally mirrored in a Django cache so other workers can share it.
+    With a shared cache every key has a generation there, bumped when the
+    key is deleted; local entries are only used while their generation is
+    the current one, so a deletion in any worker reaches all of them.
+    """
+
+    def __init__(self, max_size, timeout, alias=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, key):
+        return f'token-auth:{key}'
+
+    def _generation_key(self, key):
+        return f'token-auth:generation:{key}'
+
+    def get(self, key):
+        # One read of the shared cache per call, before the local entry is trusted.
+        generation = caches[self.alias].get(self._generation_key(key)) if self.alias is not None else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, entry_generation, value = entry
+                if expires > time.monotonic() and entry_generation == generation:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if generation is not None:
+            shared = caches[self.alias].get(self._cache_key(key))
+            if shared is not None and shared[0] == generation:
+                self._store(key, generation, shared[1])
+                return shared[1]
+        return None
+
+    def set(self, key, value):
+        generation = None
+        if self.alias is not None:
+            generation = caches[self.alias].get_or_set(self._generation_key(key), 0, None)
+            caches[self.alias].set(self._cache_key(key), (generation, value), self.timeout)
+        self._store(key, generation, value)
+
+    def _store(self, key, generation, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.alias is not None:
+            shared = caches[self.alias]
+            shared.delete_many([self._cache_key(key) for key in keys])
+            for key in keys:
+                try:
+                    shared.incr(self._generation_key(key))
+                except ValueError:
+                    shared.set(self._generation_key(key), 1, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    TOKEN_AUTH_CACHE['MAX_SIZE'],
+    TOKEN_AUTH_CACHE['TIMEOUT'],
+    TOKEN_AUTH_CACHE['CACHE_ALIAS']
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` that skips the token and user query while the key
+    is in ``token_cache``. Entries are dropped when the token is deleted or
+    its user is saved, so a password or ``is_active`` change takes effect on
+    the next request of this worker; other workers see it after ``TIMEOUT``
+    seconds at most, or on their next request when they share
+    ``CACHE_ALIAS``, which then costs one cache read per request.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        return copy.copy(user), token
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views, using the async ORM on a miss."""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain '
+                                                    'invalid characters.'))
+
+        cached = token_cache.get(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            cached = (token.user, token)
+            token_cache.set(key, cached)
+        user, token = cached
+        return copy.copy(user), token
+
+
+@receiver(post_delete, sender=Token)
+def forgetToken(sender, instance=None, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=CustomerUser)
+def forgetUserTokens(sender, instance=None, created=False, **kwargs):
+    if not created:
+        token_cache.delete(*Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
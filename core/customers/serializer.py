@@ -49,4 +49,33 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
         class Meta:
             model = CustomerUser
-            fields = ['username', 'email', 'first_name', 'last_name', 'phone']
\ No newline at end of file
+            fields = ['username', 'email', 'first_name', 'last_name', 'phone']
+
+class CustomerStatusCountsSerializer(serializers.Serializer):
+    confirmed = serializers.IntegerField()
+    pending = serializers.IntegerField()
+    cancell = serializers.IntegerField()
+    waiting_list = serializers.IntegerField()
+
+
+class FavouriteRestaurantSerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    name = serializers.CharField()
+    visits = serializers.IntegerField(help_text='Reservaciones confirmadas')
+    covers = serializers.IntegerField()
+    last_visit = serializers.DateField(allow_null=True)
+
+
+class WaitingListFrequencySerializer(serializers.Serializer):
+    reservations = serializers.IntegerField()
+    rate = serializers.FloatField(help_text='Parte de las reservaciones en lista de espera')
+
+
+class CustomerSummarySerializer(serializers.Serializer):
+    customer_id = serializers.IntegerField()
+    total_reservations = serializers.IntegerField()
+    by_status = CustomerStatusCountsSerializer()
+    total_covers = serializers.IntegerField(help_text='Comensales de las reservaciones confirmadas')
+    last_visit = serializers.DateField(allow_null=True)
+    favourite_restaurants = FavouriteRestaurantSerializer(many=True)
+    waiting_list = WaitingListFrequencySerializer()
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.reservations.models import Reservation
+
+SUMMARY_TIMEOUT = 60 * 15
+FAVOURITE_RESTAURANTS = 3
+CONFIRMED = 'confirmed'
+WAITING = 'waiting_list'
+
+
+def summary_key(customer_id, today):
+    # Keyed by day: a confirmed reservation becomes a visit once its date comes.
+    return f'customers:summary:{customer_id}:{today.isoformat()}'
+
+
+def customer_summary(customer_id, today):
+    """
+    Reservations of a customer by status, visits, covers and last visit of
+    the confirmed ones up to ``today``, favourite restaurants by those visits
+    and share of reservations on the waiting list, from a single query
+    grouped by restaurant and status.
+    """
+    visited = Q(date__lte=today)
+    by_status = dict.fromkeys((status for status, _ in Reservation.STATUS_RESERVATIONS), 0)
+    restaurants = {}
+    for row in Reservation.objects.filter(customer_id=customer_id).order_by().values(
+        'restaurant_id', 'restaurant__name', 'status'
+    ).annotate(
+        reservations=Count('id'),
+        visits=Count('id', filter=visited),
+        covers=Sum('party_size', filter=visited),
+        last_visit=Max('date', filter=visited),
+    ):
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['reservations']
+        if row['status'] == CONFIRMED and row['visits']:
+            restaurants[row['restaurant_id']] = {
+                'restaurant_id': row['restaurant_id'],
+                'name': row['restaurant__name'],
+                'visits': row['visits'],
+                'covers': row['covers'],
+                'last_visit': row['last_visit'],
+            }
+
+    total = sum(by_status.values())
+    visits = [restaurant['last_visit'] for restaurant in restaurants.values() if restaurant['last_visit']]
+    favourites = sorted(restaurants.values(), key=lambda restaurant: (
+        -restaurant['visits'], -(restaurant['last_visit'].toordinal() if restaurant['last_visit'] else 0),
+        restaurant['restaurant_id']
+    ))
+    return {
+        'customer_id': customer_id,
+        'total_reservations': total,
+        'by_status': by_status,
+        'total_covers': sum(restaurant['covers'] for restaurant in restaurants.values()),
+        'last_visit': max(visits, default=None),
+        'favourite_restaurants': favourites[:FAVOURITE_RESTAURANTS],
+        'waiting_list': {
+            'reservations': by_status[WAITING],
+            'rate': round(by_status[WAITING] / total, 4) if total else 0.0,
+        },
+    }
+
+
+def cached_customer_summary(customer_id, exists):
+    """
+    ``customer_summary`` from the cache, or computed and cached when
+    ``exists()`` confirms the customer. Returns None for unknown customers.
+    """
+    today = timezone.localdate()
+    key = summary_key(customer_id, today)
+    summary = cache.get(key)
+    if summary is None:
+        if not exists():
+            return None
+        summary = customer_summary(customer_id, today)
+        cache.set(key, summary, SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_summary(customer_id):
+    transaction.on_commit(lambda: cache.delete(summary_key(customer_id, timezone.localdate())))
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def customerReservationChanged(sender, instance=None, **kwargs):
+    previous = getattr(instance, '_loaded_customer_id', None)
+    if previous is not None and previous != instance.customer_id:
+        invalidate_summary(previous)
+    invalidate_summary(instance.customer_id)
+    instance._loaded_customer_id = instance.customer_id
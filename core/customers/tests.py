@@ -1,3 +1,186 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from core.customers.authentication import TokenCache, token_cache
+from core.customers.models import CustomerUser
+from core.reservations.models import Reservation, TableReservations
+from core.testing import QueryBudgetTestCase, make_customer, make_reservations, make_restaurant, make_tables
+from core.utilis import EstimatedCountPaginator
+
+
+class CustomerQueryBudgetTest(QueryBudgetTestCase):
+
+    def make_customers(self, total):
+        group, _ = Group.objects.get_or_create(name='customer')
+        for _ in range(total):
+            make_customer().groups.add(group)
+
+    def test_current_user(self):
+        self.assertQueryBudget('/api/get/current/user', 0)
+
+    def test_user_list(self):
+        self.assertQueryBudget('/api/users/', 2, grow=lambda: self.make_customers(4))
+
+    def test_customer_list(self):
+        self.assertQueryBudget('/api/users/customers/', 2, grow=lambda: self.make_customers(4))
+
+    def test_reservations_by_customer(self):
+        restaurant = make_restaurant()
+        self.assertQueryBudget(
+            f'/api/users/customers/{self.user.id}/reservations/', 3,
+            grow=lambda: make_reservations(4, customer=self.user, restaurant=restaurant)
+        )
+
+
+class CustomerSummaryTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.path = f'/api/users/customers/{self.user.id}/customer-summary/'
+        self.first, self.second = make_restaurant(), make_restaurant()
+        make_reservations(3, customer=self.user, restaurant=self.first, status='confirmed', party_size=2)
+        make_reservations(1, customer=self.user, restaurant=self.second, status='confirmed', party_size=5)
+        make_reservations(1, customer=self.user, restaurant=self.second, status='cancell')
+        self.waiting = make_reservations(1, customer=self.user, restaurant=self.second, status='waiting_list')[0]
+
+    def test_query_budget(self):
+        self.assertQueryBudget(
+            self.path, 2, grow=lambda: make_reservations(4, customer=self.user, restaurant=make_restaurant(),
+                                                         status='confirmed')
+        )
+
+    def test_summary(self):
+        data = self.client.get(self.path).data
+        self.assertEqual(data['total_reservations'], 6)
+        self.assertEqual(data['by_status'], {'confirmed': 4, 'pending': 0, 'cancell': 1, 'waiting_list': 1})
+        self.assertEqual(data['total_covers'], 11)
+        self.assertEqual(data['last_visit'], '2026-01-03')
+        self.assertEqual([(item['restaurant_id'], item['visits']) for item in data['favourite_restaurants']],
+                         [(self.first.id, 3), (self.second.id, 1)])
+        self.assertEqual(data['waiting_list'], {'reservations': 1, 'rate': 0.1667})
+        self.assertEqual(self.client.get('/api/users/customers/0/customer-summary/').status_code, 404)
+
+    def test_future_reservations_are_not_visits(self):
+        future = datetime.date.today() + datetime.timedelta(days=30)
+        upcoming = make_reservations(2, customer=self.user, restaurant=self.first, status='confirmed', party_size=6)
+        upcoming += make_reservations(1, customer=self.user, restaurant=make_restaurant(), status='confirmed')
+        Reservation.objects.filter(pk__in=[reservation.pk for reservation in upcoming]).update(date=future)
+        cache.clear()
+
+        data = self.client.get(self.path).data
+        self.assertEqual(data['by_status']['confirmed'], 7)
+        self.assertEqual(data['total_covers'], 11)
+        self.assertEqual(data['last_visit'], '2026-01-03')
+        self.assertEqual([(item['restaurant_id'], item['visits'], item['covers'])
+                          for item in data['favourite_restaurants']],
+                         [(self.first.id, 3, 6), (self.second.id, 1, 5)])
+
+    def test_cached_until_a_reservation_of_the_customer_changes(self):
+        self.client.get(self.path)
+        with self.assertNumQueries(0):
+            self.client.get(self.path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_reservations(1, restaurant=self.first, status='confirmed')[0].save()
+        with self.assertNumQueries(0):
+            self.client.get(self.path)
+
+        self.waiting.status = 'confirmed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.waiting.save()
+        self.assertEqual(self.client.get(self.path).data['by_status']['waiting_list'], 0)
+
+
+class CachedTokenAuthenticationTest(APITestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = make_customer()
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_token_skips_the_query(self):
+        self.assertEqual(self.client.get('/api/get/current/user').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/get/current/user')
+        self.assertEqual(response.data['username'], self.user.username)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/get/current/user')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/get/current/user').status_code, 401)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get('/api/get/current/user')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/get/current/user').status_code, 401)
+
+
+    def test_shared_cache_deletion_reaches_other_workers(self):
+        first, second = TokenCache(10, 60, 'default'), TokenCache(10, 60, 'default')
+        first.set(self.token.key, (self.user, self.token))
+        self.assertEqual(second.get(self.token.key), (self.user, self.token))
+        first.delete(self.token.key)
+        # The second worker still holds the entry locally, the generation check drops it.
+        self.assertIsNone(second.get(self.token.key))
+        first.set(self.token.key, (self.user, self.token))
+        self.assertEqual(second.get(self.token.key), (self.user, self.token))
+
+
+class AdminChangelistTest(TestCase):
+
+    def setUp(self):
+        self.admin = make_customer(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.group = Group.objects.create(name='customer')
+        self.restaurant = make_restaurant()
+
+    def grow(self, total):
+        table = make_tables(self.restaurant, 1)[0]
+        for _ in range(total):
+            customer = make_customer()
+            customer.groups.add(self.group)
+            for reservation in make_reservations(1, customer=customer, restaurant=self.restaurant):
+                TableReservations.objects.create(reservation=reservation, table=table)
+
+    def count_queries(self, path):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return len(context.captured_queries)
+
+    def test_changelists_issue_no_queries_per_row(self):
+        self.grow(1)
+        for path in ('/admin/customers/customeruser/', '/admin/reservations/reservation/',
+                     '/admin/reservations/tablereservations/', '/admin/restaurant/table/'):
+            queries = self.count_queries(path)
+            self.grow(3)
+            self.assertEqual(self.count_queries(path), queries, path)
+
+    def test_changelist_does_not_create_tokens(self):
+        Token.objects.filter(user=make_customer()).delete()
+        tokens = Token.objects.count()
+        self.assertEqual(self.client.get('/admin/customers/customeruser/').status_code, 200)
+        self.assertEqual(Token.objects.count(), tokens)
 
-# Create your tests here.
+    def test_estimated_count(self):
+        self.grow(3)
+        total = CustomerUser.objects.count()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        with mock.patch('core.utilis.ESTIMATED_COUNT_THRESHOLD', 1):
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(EstimatedCountPaginator(CustomerUser.objects.order_by('id'), 10).count, total)
+            self.assertFalse([query for query in context.captured_queries if 'COUNT(' in query['sql'].upper()])
+            self.assertEqual(EstimatedCountPaginator(CustomerUser.objects.filter(is_staff=True).order_by('id'),
+                                                     10).count, 1)
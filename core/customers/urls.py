@@ -9,6 +9,9 @@ urlpatterns = [
     path('get/current/user', UserProfileView.as_view(), name='current_user'),
     path('users/', UserListView.as_view(), name='all_user'),
     path('users/customers/', CustomerUserListView.as_view(), name='Customers_user'),
-    path('users/customers/<int:customer_id>/customer-summary/', GetReservationCustomers.as_view()),
+    path('users/customers/<int:customer_id>/customer-summary/', CustomerSummaryView.as_view(),
+         name='customer-summary'),
+    path('users/customers/<int:customer_id>/reservations/', GetReservationCustomers.as_view()),
+    path('async/users/customers/<int:customer_id>/reservations/', AsyncReservationsByCustomer.as_view()),
 
 ]
\ No newline at end of file
@@ -1,12 +1,17 @@
+from django.shortcuts import aget_object_or_404
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication, SessionAuthentication
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.filters import SearchFilter
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView, ListAPIView, GenericAPIView, get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.customers.serializer import (RegisterSerializer, UserProfileSerializer)
+from core.async_views import AsyncAPIView
+from core.customers.authentication import CachedTokenAuthentication
+from core.customers.serializer import (RegisterSerializer, UserProfileSerializer, CustomerSummarySerializer)
+from core.customers.summary import cached_customer_summary
 from ..reservations.serializers import *
 from ..utilis import LargeResultsSetPagination
 
@@ -29,7 +34,7 @@ class RegisterView(CreateAPIView):
 class UserProfileView(RetrieveUpdateAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    authentication_classes = (CachedTokenAuthentication, SessionAuthentication)
 
     def get_object(self):
         return self.request.user
@@ -61,7 +66,7 @@ class CustomerUserListView(ListAPIView):
     queryset = CustomerUser.objects.filter(groups__name__icontains='customer')
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
     filter_backends = [SearchFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
 
@@ -78,7 +83,7 @@ class UserListView(ListAPIView):
     queryset = CustomerUser.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
     filter_backends = [SearchFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
 
@@ -92,10 +97,10 @@ class UserListView(ListAPIView):
 
 @extend_schema(tags=['Customers'])
 class GetReservationCustomers(GenericAPIView):
-    queryset = Reservation.objects.all().order_by('id')
+    queryset = Reservation.objects.select_related('restaurant').order_by('date', 'time', 'id')
     serializer_class = ResevationsByCustomersSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     pagination_class = LargeResultsSetPagination
 
     @extend_schema(
@@ -104,12 +109,52 @@ class GetReservationCustomers(GenericAPIView):
     )
     def get(self, request, customer_id):
         customer = get_object_or_404(CustomerUser, pk=customer_id)
-        reservations = self.get_queryset().filter(customer=customer)
-        if not reservations:
+        page = self.paginate_queryset(self.get_queryset().filter(customer=customer))
+        if not page:
             return Response({'message': "this client no has reservations"},status=status.HTTP_404_NOT_FOUND)
-        serializer = self.get_serializer(reservations, many=True)
+        serializer = self.get_serializer(page, many=True)
         data = {
-            'total_reservations': reservations.count(),
+            'total_reservations': self.paginator.page.paginator.count,
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
             "reservations": serializer.data
         }
         return Response(data, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=['Customers'])
+class CustomerSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedTokenAuthentication]
+
+    @extend_schema(
+        summary="Resumen de un cliente",
+        description="Reservaciones por status, comensales, ultima visita, restaurantes favoritos y frecuencia en "
+                    "lista de espera de un cliente. Se calcula con una sola consulta agrupada y se guarda en la cache "
+                    "compartida hasta 15 minutos; los cambios en las reservaciones del cliente la descartan antes.",
+        responses={200: CustomerSummarySerializer}
+    )
+    def get(self, request, customer_id):
+        summary = cached_customer_summary(customer_id, CustomerUser.objects.filter(pk=customer_id).exists)
+        if summary is None:
+            return Response({'detail': 'No CustomerUser matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CustomerSummarySerializer(summary).data)
+
+
+class AsyncReservationsByCustomer(AsyncAPIView):
+    """Async mirror of ``GetReservationCustomers``."""
+
+    async def get(self, request, customer_id):
+        customer = await aget_object_or_404(CustomerUser, pk=customer_id)
+        paginator = LargeResultsSetPagination()
+        page = await paginator.apaginate_queryset(
+            GetReservationCustomers.queryset.filter(customer=customer), request, view=self
+        )
+        if not page:
+            return self.response({'message': "this client no has reservations"}, status=status.HTTP_404_NOT_FOUND)
+        return self.response({
+            'total_reservations': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'reservations': ResevationsByCustomersSerializer(page, many=True).data
+        })
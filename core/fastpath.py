@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+FAST_PATH_BATCH_SIZE = 500
+
+# Fields whose database value is already the JSON value.
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _temporal(field, setting):
+    output_format = getattr(field, 'format', serializers.empty)
+    if output_format is serializers.empty:
+        output_format = getattr(api_settings, setting)
+    if output_format is None:
+        return None
+    if output_format.lower() == ISO_8601:
+        return lambda value: value.isoformat()
+    return lambda value: value.strftime(output_format)
+
+
+def _converter(field):
+    """``value -> JSON value`` of a serializer field, None when it is the value itself."""
+    if isinstance(field, serializers.DateTimeField):
+        return field.to_representation
+    if isinstance(field, serializers.DateField):
+        return _temporal(field, 'DATE_FORMAT')
+    if isinstance(field, serializers.TimeField):
+        return _temporal(field, 'TIME_FORMAT')
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField, serializers.ManyRelatedField)):
+        raise ImproperlyConfigured(f'{type(field).__name__} {field.field_name!r} has no fast path.')
+    return field.to_representation
+
+
+class RowTransform:
+    """
+    The readable fields of a serializer compiled into one function that
+    turns a ``.values()`` row into the serializer output: ``sources`` are
+    the ``.values()`` names to project, related sources like
+    ``restaurant.name`` become ``restaurant__name``.
+    """
+
+    def __init__(self, serializer_class):
+        self.keys, self.sources = [], []
+        items, namespace = [], {}
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                raise ImproperlyConfigured(f'{field.field_name!r} has no fast path.')
+            key, source = field.field_name, '__'.join(field.source_attrs)
+            self.keys.append(key)
+            self.sources.append(source)
+            convert = _converter(field)
+            if convert is None:
+                items.append(f'{key!r}: row[{source!r}]')
+            else:
+                name = f'_convert_{len(namespace)}'
+                namespace[name] = convert
+                items.append(f'{key!r}: None if (value := row[{source!r}]) is None else {name}(value)')
+        code = 'def transform(row):\n    return {' + ', '.join(items) + '}\n'
+        exec(compile(code, f'<fast path of {serializer_class.__name__}>', 'exec'), namespace)
+        self.transform = namespace['transform']
+
+    def __call__(self, row):
+        return self.transform(row)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    return RowTransform(serializer_class)
+
+
+class StreamingJSONRenderer:
+    """
+    Encodes a page of rows in batches while it is sent, so the response never
+    holds the serialized page, the per row ``OrderedDict``s or the whole
+    document. Output matches ``JSONRenderer`` with its default settings.
+    """
+    media_type = 'application/json'
+    batch_size = FAST_PATH_BATCH_SIZE
+
+    def __init__(self):
+        self.encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+    @staticmethod
+    def escape(chunk):
+        # Like JSONRenderer: U+2028 and U+2029 are valid JSON but end lines in JavaScript.
+        return chunk.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+    def stream(self, rows, transform, envelope=None):
+        """
+        Chunks of ``rows`` as a JSON array of ``transform(row)``, inside
+        ``envelope`` as its last ``results`` key when given.
+        """
+        encode = self.encoder.encode
+        if envelope is not None:
+            head = encode({key: value for key, value in envelope.items() if key != 'results'})
+            yield self.escape(head[:-1] + (',' if len(head) > 2 else '') + '"results":[')
+        else:
+            yield b'['
+        for start in range(0, len(rows), self.batch_size):
+            chunk = encode([transform(row) for row in rows[start:start + self.batch_size]])[1:-1]
+            yield self.escape((',' if start else '') + chunk)
+        yield b']}' if envelope is not None else b']'
+
+
+class FastListMixin:
+    """
+    Opt in read fast path of list views: the page is read with ``.values()``
+    of the serializer sources and streamed by ``StreamingJSONRenderer``
+    through the compiled ``RowTransform`` of the serializer class, skipping
+    model instances and ``to_representation``. Serializers must not depend on
+    ``to_representation`` overrides or on fields without a fast path. The
+    browsable API and ``fast_path = False`` keep the regular list.
+    """
+    fast_path = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_path or not isinstance(request.accepted_renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        transform = compile_serializer(self.get_serializer_class())
+        queryset = self.filter_queryset(self.get_queryset()).values(*transform.sources)
+        # Pagination reads the page here, the stream only encodes it.
+        page = self.paginate_queryset(queryset)
+        renderer = StreamingJSONRenderer()
+        if page is None:
+            chunks = renderer.stream(list(queryset), transform)
+        else:
+            chunks = renderer.stream(page, transform, self.paginator.get_paginated_response(None).data)
+        return StreamingHttpResponse(chunks, content_type=renderer.media_type)
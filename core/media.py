@@ -0,0 +1,155 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from core.restaurant.renditions import RENDITION_DIRECTORY
+
+MEDIA_SERVING = {
+    'SENDFILE': None,
+    'ACCEL_REDIRECT_PREFIX': '/protected-media/',
+    'IMMUTABLE_MAX_AGE': 60 * 60 * 24 * 365,
+}
+# The logo renditions, named with a hex digest of their content. Uploads
+# keep the name they came with, which may look like a digest too.
+HASHED_NAME = re.compile(rf'^{re.escape(RENDITION_DIRECTORY)}/(?P<digest>[0-9a-f]{{32}})\.\w+$')
+RANGE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def media_serving():
+    return {**MEDIA_SERVING, **getattr(settings, 'MEDIA_SERVING', {})}
+
+
+def file_validators(path, stat_result):
+    """
+    ``(etag, last_modified, immutable)`` of a media file. Renditions are
+    named with the hash of their content, which is their own strong ETag, and
+    never change; other files are tagged by inode, size and modification time.
+    """
+    match = HASHED_NAME.search(path)
+    if match:
+        return f'"{match["digest"]}"', stat_result.st_mtime, True
+    return (f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"',
+            stat_result.st_mtime, False)
+
+
+def byte_range(request, size, etag, last_modified):
+    """
+    ``(start, end)`` inclusive of a single range ``Range`` header, None to
+    send the whole file, or ``False`` when the range can not be satisfied.
+    Several ranges, and a stale ``If-Range``, fall back to the whole file.
+    """
+    header = request.headers.get('Range')
+    if not header or request.method != 'GET':
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range is not None and if_range != etag:
+        date = parse_http_date_safe(if_range)
+        if date is None or date != int(last_modified):
+            return None
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None or not (match['start'] or match['end']):
+        return None
+    if not match['start']:
+        # Suffix range: the last N bytes.
+        length = int(match['end'])
+        if not length or not size:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(match['start'])
+    end = min(int(match['end']), size - 1) if match['end'] else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def media_view(request, path):
+    """
+    Serves ``MEDIA_ROOT``: strong ETags and ``Last-Modified`` answered with
+    304, single ``Range`` requests answered with 206 (416 when out of the
+    file), and ``Cache-Control: immutable`` for content hashed names. With
+    ``MEDIA_SERVING['SENDFILE']`` set to ``'X-Sendfile'`` or
+    ``'X-Accel-Redirect'`` the body and the ranges are left to the web
+    server, so the file bytes never pass through the worker.
+    """
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('El archivo no existe.')
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('El archivo no existe.')
+
+    options = media_serving()
+    etag, last_modified, immutable = file_validators(path, stat_result)
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        response = build_response(request, fullpath, path, stat_result, etag, last_modified, options)
+
+    if response.status_code in (200, 206, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if immutable:
+            patch_cache_control(response, public=True, max_age=options['IMMUTABLE_MAX_AGE'], immutable=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def build_response(request, fullpath, path, stat_result, etag, last_modified, options):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    size = stat_result.st_size
+
+    sendfile = options['SENDFILE']
+    if sendfile:
+        # Streaming, so no Content-Length is added: the web server sends its own.
+        response = StreamingHttpResponse((), content_type=content_type)
+        if sendfile.lower() == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = options['ACCEL_REDIRECT_PREFIX'] + quote(path)
+        else:
+            response['X-Sendfile'] = fullpath
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        selected = byte_range(request, size, etag, last_modified)
+        if selected is False:
+            response = HttpResponse(status=416, content_type=content_type)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if selected is None:
+            response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+        else:
+            start, end = selected
+            response = StreamingHttpResponse(read_range(open(fullpath, 'rb'), start, end - start + 1),
+                                             status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,201 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from core.customers.authentication import CachedTokenAuthentication
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative Prometheus style histogram: bucket counts, sum and count."""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    In process registry of the per view histograms. Every worker process
+    keeps its own, so a scraper sees the requests served by that worker.
+    """
+    histograms = {
+        'dineeasy_request_duration_seconds': ('Wall time of the request by view.', LATENCY_BUCKETS),
+        'dineeasy_db_duration_seconds': ('Time spent in database queries by view.', LATENCY_BUCKETS),
+        'dineeasy_db_queries': ('Database queries issued per request by view.', QUERY_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.series = {name: {} for name in self.histograms}
+            self.responses = {}
+
+    def observe(self, view, method, status, duration, db_duration, db_queries):
+        labels = (view, method)
+        with self._lock:
+            for name, value in (
+                ('dineeasy_request_duration_seconds', duration),
+                ('dineeasy_db_duration_seconds', db_duration),
+                ('dineeasy_db_queries', db_queries),
+            ):
+                series = self.series[name]
+                if labels not in series:
+                    series[labels] = Histogram(self.histograms[name][1])
+                series[labels].observe(value)
+            key = (view, method, str(status))
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self):
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (description, buckets) in self.histograms.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for (view, method), histogram in sorted(self.series[name].items()):
+                    labels = f'view="{view}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip((*buckets, '+Inf'), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+            lines.append('# HELP dineeasy_responses_total Responses by view and status code.')
+            lines.append('# TYPE dineeasy_responses_total counter')
+            for (view, method, status), count in sorted(self.responses.items()):
+                lines.append(f'dineeasy_responses_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts the queries and adds up their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# Timer of the request being served. Context variables follow the request
+# into the sync_to_async threads that run the ORM under ASGI.
+request_timer = ContextVar('request_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """``execute_wrapper`` of every connection, timing for ``request_timer``."""
+    timer = request_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(install_timer)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view = getattr(match.func, 'view_class', match.func)
+    return f'{view.__module__}.{view.__qualname__}'
+
+
+class PerformanceMiddleware:
+    """
+    Measures the wall time, the number of queries and the time spent in the
+    database of every request. The figures are sent back in a
+    ``Server-Timing`` header and added to the histograms of the resolved view.
+    Async capable, so the async views are not pushed to a thread under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer, token = self.start_timer()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timer.reset(token)
+        return self.record(request, response, timer, start)
+
+    async def __acall__(self, request):
+        timer, token = self.start_timer()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timer.reset(token)
+        return self.record(request, response, timer, start)
+
+    def start_timer(self):
+        # Connections opened later get the wrapper from connection_created.
+        for connection in connections.all(initialized_only=True):
+            install_timer(connection)
+        timer = QueryTimer()
+        return timer, request_timer.set(timer)
+
+    def record(self, request, response, timer, start):
+        duration = time.perf_counter() - start
+        metrics.observe(view_label(request), request.method, response.status_code, duration, timer.duration,
+                        timer.count)
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.2f}, db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"'
+        )
+        return response
+
+
+@extend_schema(exclude=True)
+class MetricsView(APIView):
+    """The Prometheus exposition, for staff tokens only: it names every view and its traffic."""
+    permission_classes = [IsAdminUser]
+    authentication_classes = [CachedTokenAuthentication]
+
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,5 +1,25 @@
 from django.contrib import admin
 from .models import *
+from core.utilis import EstimatedCountPaginator
 
-admin.site.register(Reservation)
-admin.site.register(TableReservations)
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'date', 'time', 'customer', 'restaurant', 'party_size', 'status')
+    list_filter = ('status',)
+    list_select_related = ('customer', 'restaurant')
+    search_fields = ('=id', 'customer__username', 'restaurant__name')
+    autocomplete_fields = ('customer', 'restaurant')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(TableReservations)
+class TableReservationsAdmin(admin.ModelAdmin):
+    list_display = ('id', 'reservation', 'table')
+    list_select_related = ('reservation', 'table__restaurant')
+    autocomplete_fields = ('reservation', 'table')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,97 @@
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.reservations.models import Reservation, TableReservations
+from core.reservations.seating import best_fit
+from core.restaurant.models import Table
+
+CLAIM_BATCH_SIZE = 5
+
+
+def _candidates(restaurant_id, party_size):
+    tables = Table.objects.filter(
+        restaurant_id=restaurant_id,
+        capacity__gte=party_size,
+        status=Table.Status.FREE
+    ).order_by('capacity', 'number')
+    if connection.features.has_select_for_update_skip_locked:
+        tables = tables.select_for_update(skip_locked=True, of=('self',))
+    return list(tables[:CLAIM_BATCH_SIZE])
+
+
+def claim(table):
+    """
+    Move the table from free to occupied. The row is locked before it is
+    read, so only one caller finds it free; SQLite holds the write lock for
+    the whole IMMEDIATE transaction instead.
+    """
+    with transaction.atomic():
+        locked = Table.objects.select_for_update().filter(pk=table.pk, status=Table.Status.FREE).first()
+        if locked is None:
+            return False
+        locked.status = Table.Status.OCCUPIED
+        locked.save(update_fields=['status'])
+    table.status = Table.Status.OCCUPIED
+    return True
+
+
+def claim_table(restaurant_id, party_size):
+    while True:
+        candidates = _candidates(restaurant_id, party_size)
+        if not candidates:
+            return None
+        for table in candidates:
+            if claim(table):
+                return table
+
+
+class ClaimConflict(Exception):
+    pass
+
+
+def claim_combination(restaurant_id, party_size):
+    """
+    Claim the run of adjacent free tables that seats the party wasting the
+    fewest seats, for parties no single free table fits. A run is claimed
+    whole or not at all: when another caller wins one of its tables the
+    savepoint is rolled back and the free tables are read again.
+    """
+    while True:
+        tables = Table.objects.filter(restaurant_id=restaurant_id, status=Table.Status.FREE).order_by()
+        run = best_fit(list(tables), party_size)
+        if run is None:
+            return []
+        try:
+            with transaction.atomic():
+                for table in run:
+                    if not claim(table):
+                        raise ClaimConflict
+        except ClaimConflict:
+            continue
+        return list(run)
+
+
+def allocate_table(reservation):
+    """
+    Assign the smallest free table that fits the reservation, or else the
+    best run of adjacent free tables, or move it to the waiting list when
+    none is left. Runs in a single transaction and returns the tables.
+    """
+    with transaction.atomic():
+        table = claim_table(reservation.restaurant_id, reservation.party_size)
+        tables = [table] if table is not None else claim_combination(reservation.restaurant_id,
+                                                                     reservation.party_size)
+        if not tables:
+            reservation.status = 'waiting_list'
+            reservation.save(update_fields=['status'])
+            return []
+        for table in tables:
+            TableReservations.objects.create(table=table, reservation=reservation)
+    return tables
+
+
+@receiver(post_save, sender=Reservation)
+def assignTable(sender, instance=None, created=False, **kwargs):
+    if created and instance.status == 'confirmed':
+        allocate_table(instance)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReservationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.reservations'
+
+    def ready(self):
+        from core.reservations import allocation, availability, promotion, rollups  # noqa: F401
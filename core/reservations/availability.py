@@ -0,0 +1,179 @@
+import datetime
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.reservations.models import Reservation, TableReservations
+from core.restaurant.models import Restaurant, Table
+from core.restaurant.signals import tables_bulk_created
+
+SLOT_INTERVAL = 30
+INDEX_TIMEOUT = 60 * 60
+MINUTES_PER_DAY = 24 * 60
+
+
+def _to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _to_time(minutes):
+    minutes %= MINUTES_PER_DAY
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+class TableIntervals:
+    """
+    Sorted, non overlapping booking intervals of a single table, in minutes
+    since midnight. Overlapping bookings are merged when the index is built so
+    a conflict check is a single bisect over the interval ends.
+    """
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+                continue
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def is_free(self, start, end):
+        position = bisect_right(self.ends, start)
+        return position == len(self.starts) or self.starts[position] >= end
+
+
+class AvailabilityIndex:
+    """
+    Interval index over the ``TableReservations`` of one restaurant for one day.
+    When the restaurant closes after midnight the window runs into the next
+    day, whose early bookings are indexed past ``MINUTES_PER_DAY``.
+
+    Tables are kept sorted by capacity, so the candidates for a party are a
+    bisect away, and each table answers "is it free between ``start`` and
+    ``end``" in logarithmic time over its bookings of the day.
+    """
+
+    def __init__(self, restaurant, date, tables, bookings):
+        self.restaurant_id = restaurant.id
+        self.restaurant_name = restaurant.name
+        self.date = date
+        self.opening = _to_minutes(restaurant.opening_time)
+        self.closing = _to_minutes(restaurant.closing_time)
+        if self.closing <= self.opening:
+            self.closing += MINUTES_PER_DAY
+
+        self.tables = [table_id for table_id, capacity in tables]
+        self.capacities = [capacity for table_id, capacity in tables]
+
+        intervals = {table_id: [] for table_id in self.tables}
+        for table_id, start, duration in bookings:
+            if table_id in intervals:
+                intervals[table_id].append((start, start + duration))
+        self.intervals = {table_id: TableIntervals(items) for table_id, items in intervals.items()}
+
+    def candidates(self, party_size):
+        return self.tables[bisect_left(self.capacities, party_size):]
+
+    def slots(self, party_size, duration, interval=SLOT_INTERVAL):
+        candidates = self.candidates(party_size)
+        if not candidates:
+            return []
+
+        slots = []
+        for start in range(self.opening, self.closing - duration + 1, interval):
+            end = start + duration
+            tables = [table_id for table_id in candidates if self.intervals[table_id].is_free(start, end)]
+            if tables:
+                slots.append({'time': _to_time(start), 'tables': tables})
+        return slots
+
+
+def _generation_key(restaurant_id):
+    return f'availability:{restaurant_id}:generation'
+
+
+def _index_key(restaurant_id, date):
+    generation = cache.get_or_set(_generation_key(restaurant_id), 0, None)
+    return f'availability:{restaurant_id}:{generation}:{date.isoformat()}'
+
+
+def build_index(restaurant_id, date):
+    restaurant = Restaurant.objects.filter(pk=restaurant_id).only(
+        'id', 'name', 'opening_time', 'closing_time'
+    ).first()
+    if restaurant is None:
+        return None
+
+    # A restaurant has few tables: sorting them here lets the query walk the
+    # (restaurant, number) index instead of sorting in the database.
+    tables = sorted(
+        Table.objects.filter(restaurant_id=restaurant_id).values_list('capacity', 'number', 'id')
+    )
+    days = Q(reservation__date=date)
+    if restaurant.closing_time <= restaurant.opening_time:
+        # Open past midnight: the next day's bookings before closing share the window.
+        days |= Q(reservation__date=date + datetime.timedelta(days=1),
+                  reservation__time__lt=restaurant.closing_time)
+    bookings = TableReservations.objects.filter(
+        days,
+        reservation__restaurant_id=restaurant_id
+    ).exclude(
+        reservation__status='cancell'
+    ).order_by().values_list('table_id', 'reservation__date', 'reservation__time', 'reservation__duration')
+
+    return AvailabilityIndex(
+        restaurant,
+        date,
+        [(table_id, capacity) for capacity, number, table_id in tables],
+        ((table_id, (day - date).days * MINUTES_PER_DAY + _to_minutes(time), duration)
+         for table_id, day, time, duration in bookings)
+    )
+
+
+def get_index(restaurant_id, date):
+    key = _index_key(restaurant_id, date)
+    index = cache.get(key)
+    if index is None:
+        index = build_index(restaurant_id, date)
+        if index is not None:
+            cache.set(key, index, INDEX_TIMEOUT)
+    return index
+
+
+def invalidate_availability(restaurant_id):
+    key = _generation_key(restaurant_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def restaurantAvailabilityChanged(sender, instance=None, **kwargs):
+    invalidate_availability(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Table)
+def tableAvailabilityChanged(sender, instance=None, **kwargs):
+    invalidate_availability(instance.restaurant_id)
+
+
+@receiver(tables_bulk_created, sender=Table)
+def tablesAvailabilityChanged(sender, restaurant_ids=(), **kwargs):
+    for restaurant_id in restaurant_ids:
+        invalidate_availability(restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def reservationAvailabilityChanged(sender, instance=None, **kwargs):
+    invalidate_availability(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=TableReservations)
+def tableReservationAvailabilityChanged(sender, instance=None, **kwargs):
+    invalidate_availability(instance.reservation.restaurant_id)
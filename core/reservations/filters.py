@@ -0,0 +1,24 @@
+from django_filters import rest_framework as filters
+
+from core.reservations.models import Reservation
+
+
+class ReservationFilter(filters.FilterSet):
+    """
+    Equality and range filters only, so every predicate can be served by the
+    (status, date, time, id), (restaurant, date, time, id) and
+    (customer, date, time, id) indexes. ``search`` is kept as an alias of
+    ``status`` for the clients of the former SearchFilter.
+    """
+    status = filters.ChoiceFilter(choices=Reservation.STATUS_RESERVATIONS)
+    search = filters.ChoiceFilter(field_name='status', choices=Reservation.STATUS_RESERVATIONS)
+    date_from = filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = filters.DateFilter(field_name='date', lookup_expr='lte')
+    restaurant = filters.NumberFilter(field_name='restaurant_id')
+    customer = filters.NumberFilter(field_name='customer_id')
+    party_size_min = filters.NumberFilter(field_name='party_size', lookup_expr='gte')
+    party_size_max = filters.NumberFilter(field_name='party_size', lookup_expr='lte')
+
+    class Meta:
+        model = Reservation
+        fields = ['status', 'date_from', 'date_to', 'restaurant', 'customer', 'party_size_min', 'party_size_max']
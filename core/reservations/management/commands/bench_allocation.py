@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+import uuid
+from itertools import count
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from django.db.models import Count
+
+from core.customers.models import CustomerUser
+from core.reservations.models import Reservation, TableReservations
+from core.restaurant.models import Restaurant, Table
+
+
+class Command(BaseCommand):
+    help = 'Reserva mesas desde varios hilos a la vez y verifica que ninguna mesa se asigne dos veces.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=50)
+        parser.add_argument('--reservations', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--keep', action='store_true', help='No elimina los datos generados.')
+
+    def handle(self, *args, **options):
+        tables, reservations, threads = options['tables'], options['reservations'], options['threads']
+        restaurant, customer = self.seed(tables)
+
+        pending = count()
+        conflicts = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while next(pending) < reservations:
+                    try:
+                        Reservation.objects.create(
+                            customer=customer,
+                            restaurant=restaurant,
+                            party_size=random.randint(1, 4),
+                            status='confirmed'
+                        )
+                    except OperationalError as e:
+                        with lock:
+                            conflicts.append(str(e))
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        try:
+            self.report(restaurant, tables, reservations, threads, elapsed, conflicts)
+        finally:
+            if not options['keep']:
+                restaurant.delete()
+                customer.delete()
+
+    def seed(self, tables):
+        suffix = uuid.uuid4().int
+        restaurant = Restaurant.objects.create(
+            rnc=str(suffix)[:11],
+            name=f'bench-allocation-{suffix}',
+            address='bench',
+            phone=str(suffix)[-10:],
+            email=f'bench-{suffix}@dineeasy.com',
+            capacity=tables * 4
+        )
+        Table.objects.bulk_create(
+            Table(restaurant=restaurant, number=number, capacity=4) for number in range(1, tables + 1)
+        )
+        customer = CustomerUser.objects.create(username=f'bench-allocation-{suffix}')
+        return restaurant, customer
+
+    def report(self, restaurant, tables, reservations, threads, elapsed, conflicts):
+        assignments = TableReservations.objects.filter(reservation__restaurant=restaurant)
+        assigned = assignments.count()
+        doubled = assignments.values('table').annotate(total=Count('id')).filter(total__gt=1).count()
+        waiting = Reservation.objects.filter(restaurant=restaurant, status='waiting_list').count()
+        created = Reservation.objects.filter(restaurant=restaurant).count()
+
+        self.stdout.write(f'threads: {threads}')
+        self.stdout.write(f'reservations: {created}/{reservations}')
+        self.stdout.write(f'conflicts: {len(conflicts)}')
+        self.stdout.write(f'tables assigned: {assigned}/{tables}')
+        self.stdout.write(f'waiting list: {waiting}')
+        self.stdout.write(f'double assignments: {doubled}')
+        self.stdout.write(f'elapsed: {elapsed:.3f}s')
+        self.stdout.write(f'reservations/s: {created / elapsed:.1f}')
+        self.stdout.write(f'assignments/s: {assigned / elapsed:.1f}')
+
+        if doubled:
+            raise CommandError(f'{doubled} tables were assigned to more than one reservation.')
+        if assigned + waiting != created or assigned != min(tables, created):
+            raise CommandError('Every reservation must end up with a table or on the waiting list.')
+        self.stdout.write(self.style.SUCCESS('No double assignments.'))
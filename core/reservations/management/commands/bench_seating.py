@@ -0,0 +1,83 @@
+import json
+import random
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reservations.availability import _to_minutes
+from core.reservations.models import Reservation
+from core.reservations.seating import Booking, Seat, plan_allocation, plan_smallest_table
+from core.restaurant.models import Table
+
+LOCATIONS = ('Salon', 'Terraza', 'Barra')
+CAPACITIES = (2, 2, 2, 4, 4, 4, 6, 8)
+PARTY_SIZES = (1, 2, 2, 2, 2, 3, 4, 4, 4, 5, 6, 6, 7, 8, 10, 12)
+POLICIES = {
+    'smallest_table': plan_smallest_table,
+    'allocate_table': plan_allocation,
+}
+
+
+def random_evening(rng, tables, reservations):
+    # Consecutive numbers split in one block per location.
+    seats = [Seat(number, number, rng.choice(CAPACITIES), LOCATIONS[(number - 1) * len(LOCATIONS) // tables])
+             for number in range(1, tables + 1)]
+    # Bookings every 15 minutes between 18:00 and 22:30, of 90 or 120 minutes.
+    bookings = [
+        Booking(pk, 18 * 60 + 15 * rng.randrange(19), rng.choice((90, 90, 120)), rng.choice(PARTY_SIZES))
+        for pk in range(1, reservations + 1)
+    ]
+    return seats, bookings
+
+
+def restaurant_evening(restaurant_id, date):
+    seats = [Seat(*row) for row in Table.objects.filter(restaurant_id=restaurant_id).order_by()
+             .values_list('id', 'number', 'capacity', 'location')]
+    bookings = [
+        Booking(pk, _to_minutes(time), duration, party_size)
+        for pk, time, duration, party_size in Reservation.objects.filter(restaurant_id=restaurant_id, date=date)
+        .exclude(status='cancell').order_by('id').values_list('id', 'time', 'duration', 'party_size')
+    ]
+    return seats, bookings
+
+
+class Command(BaseCommand):
+    help = ('Compara la asignacion de mesas solo con la mesa libre mas pequena que cabe con la de allocate_table, que '
+            'ademas combina mesas contiguas de la misma ubicacion cuando ninguna mesa sola cabe, reservacion por '
+            'reservacion en el orden en que se hicieron: aprovechamiento de asientos, grupos sin mesa y tiempo de '
+            'calculo. Usa noches generadas al azar o las reservaciones de un restaurante y fecha.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=30)
+        parser.add_argument('--reservations', type=int, default=120, help='Reservaciones por noche.')
+        parser.add_argument('--evenings', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--restaurant', type=int, help='Usa las mesas y reservaciones de este restaurante.')
+        parser.add_argument('--date', help='Fecha de las reservaciones, con --restaurant.')
+        parser.add_argument('--output', default='bench_seating.json')
+
+    def handle(self, *args, **options):
+        if options['restaurant'] is not None:
+            if not options['date']:
+                raise CommandError('--date is required with --restaurant.')
+            evenings = [restaurant_evening(options['restaurant'], options['date'])]
+        else:
+            rng = random.Random(options['seed'])
+            evenings = [random_evening(rng, options['tables'], options['reservations'])
+                        for _ in range(options['evenings'])]
+
+        results = {}
+        for name, policy in POLICIES.items():
+            stats = [policy(tables, bookings).stats() for tables, bookings in evenings]
+            results[name] = {key: round(statistics.fmean(item[key] for item in stats), 4) for key in stats[0]}
+            self.stdout.write(
+                f'{name:<18} utilization={results[name]["seat_utilization"]:.3f} '
+                f'seated={results[name]["seated_guests"]:.1f} unseated={results[name]["unseated_guests"]:.1f} '
+                f'wasted={results[name]["wasted_seat_hours"]:.1f}h solve={results[name]["solve_ms"]:.2f}ms'
+            )
+
+        report = {'evenings': len(evenings), 'options': {key: options[key] for key in (
+            'tables', 'reservations', 'seed', 'restaurant', 'date')}, 'policies': results}
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.reservations.models import Reservation
+from core.reservations.promotion import WAITING, promote_waiting, waiting_lists
+
+
+class Command(BaseCommand):
+    help = ('Recarga las listas de espera desde la base de datos y confirma las reservaciones que caben en las mesas '
+            'libres de cada restaurante.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurants',
+                            help='Restaurante a procesar. Se puede repetir; por defecto todos los que tienen espera.')
+
+    def handle(self, *args, **options):
+        restaurant_ids = options['restaurants'] or sorted(set(
+            Reservation.objects.filter(status=WAITING).order_by().values_list('restaurant_id', flat=True)
+        ))
+        waiting_lists.clear()
+        promoted = 0
+        for restaurant_id in restaurant_ids:
+            reservations = promote_waiting(restaurant_id)
+            promoted += len(reservations)
+            if reservations:
+                self.stdout.write(f'restaurant {restaurant_id}: {len(reservations)} promoted')
+        self.stdout.write(self.style.SUCCESS(f'{promoted} reservations promoted in {len(restaurant_ids)} restaurants'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-18 14:34
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(default=datetime.datetime.now, verbose_name='Fecha de la reservacion')),
+                ('time', models.TimeField(default=datetime.datetime.now, verbose_name='Fecha de la reservacion')),
+                ('party_size', models.IntegerField(verbose_name='Cantidad de personas')),
+                ('special_request', models.CharField(blank=True, max_length=255, null=True, verbose_name='Peticion especial')),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmado'), ('pending', 'Pendiente'), ('cancell', 'Cancelada'), ('waiting_list', 'Lista de espera')], default='pending', max_length=15)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Cliente')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='restaurant.restaurant', verbose_name='Restaurante')),
+            ],
+            options={
+                'verbose_name': 'Reservacion',
+                'verbose_name_plural': 'Reservaciones',
+                'db_table': 'reservations',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TableReservations',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reservations.reservation', verbose_name='Reservaciones')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='restaurant.table', verbose_name='Mesa')),
+            ],
+            options={
+                'verbose_name': 'Mesa reservada',
+                'verbose_name_plural': 'Mesas reservadas',
+                'db_table': 'mesas_reservations',
+                'ordering': ['table'],
+            },
+        ),
+    ]
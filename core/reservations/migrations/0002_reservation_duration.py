@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 14:35
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='duration',
+            field=models.PositiveIntegerField(default=90, validators=[django.core.validators.MinValueValidator(15)], verbose_name='Duracion de la reservacion (minutos)'),
+        ),
+    ]
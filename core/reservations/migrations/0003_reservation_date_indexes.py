@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-18 14:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_reservation_duration'),
+        ('restaurant', '0002_table_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['restaurant', 'date', 'time', 'id'], name='reservation_restaurant_date'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['customer', 'date', 'time', 'id'], name='reservation_customer_date'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-18 14:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_date_indexes'),
+        ('restaurant', '0003_table_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reservation',
+            name='customer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Cliente'),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='restaurant',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='restaurant.restaurant', verbose_name='Restaurante'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'id'], name='reservation_status'),
+        ),
+    ]
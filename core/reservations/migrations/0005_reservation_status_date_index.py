@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-18 14:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_reservation_indexes'),
+        ('restaurant', '0003_table_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='reservation_status',
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'date', 'time', 'id'], name='reservation_status_date'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 15:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_reservation_status_date_index'),
+        ('restaurant', '0004_restaurant_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('hour', models.PositiveSmallIntegerField(verbose_name='Hora')),
+                ('party_size', models.IntegerField(verbose_name='Cantidad de personas')),
+                ('reservations', models.IntegerField(default=0, verbose_name='Reservaciones activas')),
+                ('guests', models.IntegerField(default=0, verbose_name='Comensales')),
+                ('cancelled', models.IntegerField(default=0, verbose_name='Reservaciones canceladas')),
+                ('tables', models.IntegerField(default=0, verbose_name='Mesas asignadas')),
+                ('restaurant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='restaurant.restaurant', verbose_name='Restaurante')),
+            ],
+            options={
+                'verbose_name': 'Ocupacion por hora',
+                'verbose_name_plural': 'Ocupacion por hora',
+                'db_table': 'reservations_occupancy',
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'date', 'hour', 'party_size'), name='occupancy_slot')],
+            },
+        ),
+    ]
@@ -1,10 +1,9 @@
 from datetime import datetime
+from django.core.validators import MinValueValidator
 from django.db import models
-from django.dispatch import receiver
 from django.forms import model_to_dict
 from core.customers.models import CustomerUser
 from core.restaurant.models import Restaurant, Table
-from django.db.models.signals import post_save
 
 
 class Reservation(models.Model):
@@ -15,11 +14,16 @@ class Reservation(models.Model):
         ('waiting_list', 'Lista de espera')
     ]
 
-    customer = models.ForeignKey(CustomerUser, on_delete=models.CASCADE, verbose_name='Cliente')
-    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, verbose_name='Restaurante')
+    customer = models.ForeignKey(CustomerUser, on_delete=models.CASCADE, verbose_name='Cliente', db_index=False)
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, verbose_name='Restaurante', db_index=False)
     date = models.DateField(verbose_name='Fecha de la reservacion', default=datetime.now)
     time = models.TimeField(verbose_name='Fecha de la reservacion', default=datetime.now)
     party_size = models.IntegerField(verbose_name='Cantidad de personas')
+    duration = models.PositiveIntegerField(
+        verbose_name='Duracion de la reservacion (minutos)',
+        default=90,
+        validators=[MinValueValidator(15)]
+    )
     special_request = models.CharField(max_length=255, null=True, blank=True, verbose_name='Peticion especial')
     status = models.CharField(max_length=15, choices=STATUS_RESERVATIONS, default='pending')
 
@@ -31,13 +35,40 @@ class Reservation(models.Model):
         return item
 
     def __str__(self):
-        return self.toJSON()['date']
+        return str(self.date)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_slot = instance.occupancy_slot()
+        instance._loaded_customer_id = instance.__dict__.get('customer_id')
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_status = self.status
+        self._loaded_slot = self.occupancy_slot()
+        self._loaded_customer_id = self.customer_id
+
+    def occupancy_slot(self):
+        """``(restaurant_id, date, hour, party_size, status)``, or None when a field is deferred."""
+        values = [self.__dict__.get(field) for field in ('restaurant_id', 'date', 'time', 'party_size', 'status')]
+        if None in values:
+            return None
+        restaurant_id, date, time, party_size, status = values
+        return restaurant_id, date, time.hour, party_size, status
 
     class Meta:
         verbose_name = 'Reservacion'
         verbose_name_plural = 'Reservaciones'
         ordering = ['date']
         db_table = 'reservations'
+        indexes = [
+            models.Index(fields=['restaurant', 'date', 'time', 'id'], name='reservation_restaurant_date'),
+            models.Index(fields=['customer', 'date', 'time', 'id'], name='reservation_customer_date'),
+            models.Index(fields=['status', 'date', 'time', 'id'], name='reservation_status_date'),
+        ]
 
 
 class TableReservations(models.Model):
@@ -54,20 +85,28 @@ class TableReservations(models.Model):
         ordering = ['table']
 
 
-@receiver(post_save, sender=Reservation)
-def assignTable(sender, instance=None, created=False, **kwargs):
-    if created and instance.status == 'confirmed':
-        avaible_tables = Table.objects.filter(
-            restaurant=instance.restaurant,
-            capacity__gte=instance.party_size,
-            status='F'
-        ).order_by('capacity')
-
-        if avaible_tables.exists():
-            table = avaible_tables.first()
-            TableReservations.objects.create(table=table, reservation=instance)
-            table.status = 'O'
-            table.save()
-        else:
-            instance.status = 'waiting_list'
-            instance.save()
\ No newline at end of file
+
+class OccupancyRollup(models.Model):
+    """
+    Reservations, guests, cancellations and seated tables of a restaurant
+    per date, hour and party size, kept up to date by the reservation
+    signals so the analytics never scan ``reservations``.
+    """
+    FIELDS = ('reservations', 'guests', 'cancelled', 'tables')
+
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, verbose_name='Restaurante', db_index=False)
+    date = models.DateField(verbose_name='Fecha')
+    hour = models.PositiveSmallIntegerField(verbose_name='Hora')
+    party_size = models.IntegerField(verbose_name='Cantidad de personas')
+    reservations = models.IntegerField(default=0, verbose_name='Reservaciones activas')
+    guests = models.IntegerField(default=0, verbose_name='Comensales')
+    cancelled = models.IntegerField(default=0, verbose_name='Reservaciones canceladas')
+    tables = models.IntegerField(default=0, verbose_name='Mesas asignadas')
+
+    class Meta:
+        verbose_name = 'Ocupacion por hora'
+        verbose_name_plural = 'Ocupacion por hora'
+        db_table = 'reservations_occupancy'
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'date', 'hour', 'party_size'], name='occupancy_slot'),
+        ]
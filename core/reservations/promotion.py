@@ -0,0 +1,237 @@
+import datetime
+import heapq
+import threading
+
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.reservations.models import Reservation, TableReservations
+from core.reservations.seating import best_fit
+from core.restaurant.models import Table
+from core.restaurant.signals import tables_bulk_created
+
+WAITING = 'waiting_list'
+CANCELLED = 'cancell'
+# How long after its booked time a waiting party can still be seated.
+PROMOTION_GRACE = datetime.timedelta(minutes=30)
+
+
+class WaitingList:
+    """
+    Heap of the waiting reservations of one restaurant, ordered by date,
+    time and party size. Reservations that leave the waiting list are only
+    forgotten by id and skipped when the heap is walked; the heap is rebuilt
+    once it holds twice as many entries as live reservations.
+    """
+
+    def __init__(self, entries=()):
+        self.heap = list(entries)
+        heapq.heapify(self.heap)
+        self.ids = {entry[-1] for entry in self.heap}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def push(self, reservation):
+        with self._lock:
+            if reservation.pk in self.ids:
+                return
+            self.ids.add(reservation.pk)
+            # An unsaved default is still the datetime.now() the model gave it.
+            date = Reservation._meta.get_field('date').to_python(reservation.date)
+            time = Reservation._meta.get_field('time').to_python(reservation.time)
+            heapq.heappush(self.heap, (date, time, reservation.party_size, reservation.pk))
+
+    def discard(self, reservation_ids):
+        with self._lock:
+            self.ids.difference_update(reservation_ids)
+            if len(self.heap) > 2 * len(self.ids):
+                self.heap = [entry for entry in self.heap if entry[-1] in self.ids]
+                heapq.heapify(self.heap)
+
+    def ordered(self, date, earliest=datetime.time.min):
+        """
+        ``(party_size, reservation_id)`` of the live entries booked on
+        ``date`` from ``earliest`` on, by priority.
+        """
+        with self._lock:
+            heap = list(self.heap)
+            ids = set(self.ids)
+        while heap:
+            entry = heapq.heappop(heap)
+            if entry[0] > date:
+                return
+            if entry[:2] >= (date, earliest) and entry[-1] in ids:
+                yield entry[2], entry[-1]
+
+
+class WaitingLists:
+    """
+    In process registry of the ``WaitingList`` of each restaurant, loaded
+    from the database the first time a restaurant is promoted and kept up to
+    date by the reservation signals. Every worker process keeps its own: the
+    entries are checked against the database before a promotion, and
+    ``manage.py promote_waiting_list`` reloads them all.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lists = {}
+
+    def clear(self):
+        with self._lock:
+            self._lists = {}
+
+    def get(self, restaurant_id):
+        with self._lock:
+            waiting = self._lists.get(restaurant_id)
+        if waiting is None:
+            waiting = WaitingList(Reservation.objects.filter(
+                restaurant_id=restaurant_id, status=WAITING, date__gte=timezone.localdate()
+            ).order_by().values_list('date', 'time', 'party_size', 'id'))
+            with self._lock:
+                waiting = self._lists.setdefault(restaurant_id, waiting)
+        return waiting
+
+    def loaded(self, restaurant_id):
+        with self._lock:
+            return self._lists.get(restaurant_id)
+
+
+waiting_lists = WaitingLists()
+
+
+def match(waiting, tables):
+    """
+    Pair waiting reservations, by priority, with the free table, or run of
+    adjacent free tables, that seats each of them wasting the fewest seats.
+    The matched tables are taken out of ``tables``. Returns
+    ``[(reservation_id, tables), ...]``.
+    """
+    matches = []
+    free_seats = sum(table.capacity for table in tables)
+    for party_size, reservation_id in waiting:
+        if not tables:
+            break
+        run = best_fit(tables, party_size) if party_size <= free_seats else None
+        if run is None:
+            continue
+        for table in run:
+            tables.remove(table)
+            free_seats -= table.capacity
+        matches.append((reservation_id, run))
+    return matches
+
+
+def _free_tables(restaurant_id):
+    tables = Table.objects.filter(restaurant_id=restaurant_id, status=Table.Status.FREE).order_by()
+    if connection.features.has_select_for_update_skip_locked:
+        tables = tables.select_for_update(skip_locked=True, of=('self',))
+    return list(tables)
+
+
+def _send_post_save(instances):
+    for instance in instances:
+        post_save.send(sender=type(instance), instance=instance, created=False, update_fields=frozenset(['status']),
+                       raw=False, using=instance._state.db)
+
+
+def promote_waiting(restaurant_id):
+    """
+    Confirm the waiting reservations of a restaurant that fit its free
+    tables, in priority order, in a single transaction: one query for the
+    free tables, one for the matched reservations and one batched write per
+    model. Only today's reservations booked at most ``PROMOTION_GRACE`` ago
+    or later are promoted: a table free now says nothing about other days.
+    Returns the promoted reservations.
+    """
+    waiting = waiting_lists.get(restaurant_id)
+    if not waiting:
+        return []
+    now = timezone.localtime()
+    earliest = now - PROMOTION_GRACE
+    earliest = earliest.time() if earliest.date() == now.date() else datetime.time.min
+
+    with transaction.atomic():
+        tables = _free_tables(restaurant_id)
+        while True:
+            matches = match(waiting.ordered(now.date(), earliest), list(tables))
+            if not matches:
+                return []
+            reservations = Reservation.objects.select_for_update().filter(
+                pk__in=[reservation_id for reservation_id, run in matches], status=WAITING, date=now.date()
+            ).order_by().in_bulk()
+            stale = [reservation_id for reservation_id, run in matches if reservation_id not in reservations]
+            if not stale:
+                break
+            waiting.discard(stale)
+
+        claimed = [table for reservation_id, run in matches for table in run]
+        Table.objects.filter(pk__in=[table.pk for table in claimed]).update(status=Table.Status.OCCUPIED)
+        Reservation.objects.filter(pk__in=reservations).update(status='confirmed')
+        assignments = TableReservations.objects.bulk_create(
+            TableReservations(table=table, reservation=reservations[reservation_id])
+            for reservation_id, run in matches for table in run
+        )
+        for table in claimed:
+            table.status = Table.Status.OCCUPIED
+        for reservation in reservations.values():
+            reservation.status = 'confirmed'
+        _send_post_save(claimed)
+        _send_post_save(reservations.values())
+        for assignment in assignments:
+            post_save.send(sender=TableReservations, instance=assignment, created=True, update_fields=None, raw=False,
+                           using=assignment._state.db)
+
+    waiting.discard(reservations)
+    return list(reservations.values())
+
+
+def schedule_promotion(restaurant_id):
+    transaction.on_commit(lambda: promote_waiting(restaurant_id))
+
+
+def release_tables(reservation):
+    """Free the occupied tables of a cancelled reservation."""
+    tables = list(Table.objects.filter(tablereservations__reservation=reservation, status=Table.Status.OCCUPIED))
+    if not tables:
+        return
+    Table.objects.filter(pk__in=[table.pk for table in tables]).update(status=Table.Status.FREE)
+    for table in tables:
+        table.status = Table.Status.FREE
+    _send_post_save(tables)
+
+
+@receiver(post_save, sender=Table)
+def tableFreed(sender, instance=None, created=False, **kwargs):
+    if instance.status != Table.Status.FREE:
+        return
+    if created or getattr(instance, '_previous_status', None) != Table.Status.FREE:
+        schedule_promotion(instance.restaurant_id)
+
+
+@receiver(tables_bulk_created, sender=Table)
+def tablesAdded(sender, restaurant_ids=(), **kwargs):
+    for restaurant_id in restaurant_ids:
+        schedule_promotion(restaurant_id)
+
+
+@receiver(post_save, sender=Reservation)
+def reservationStatusChanged(sender, instance=None, created=False, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if previous == instance.status:
+        return
+
+    waiting = waiting_lists.loaded(instance.restaurant_id)
+    if instance.status == WAITING:
+        if waiting is not None:
+            transaction.on_commit(lambda: waiting.push(instance))
+    elif previous == WAITING and waiting is not None:
+        waiting.discard([instance.pk])
+
+    if instance.status == CANCELLED and not created:
+        release_tables(instance)
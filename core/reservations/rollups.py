@@ -0,0 +1,173 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractHour
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.reservations.models import OccupancyRollup, Reservation, TableReservations
+
+CANCELLED = 'cancell'
+BACKFILL_BATCH_SIZE = 1000
+
+
+def slot_counts(slot):
+    """Counters a reservation in ``slot`` adds to its rollup row."""
+    restaurant_id, date, hour, party_size, status = slot
+    if status == CANCELLED:
+        return {'cancelled': 1}
+    return {'reservations': 1, 'guests': party_size}
+
+
+def apply(key, **deltas):
+    """Add ``deltas`` to the rollup row of ``key``, creating it when missing."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    restaurant_id, date, hour, party_size = key
+    rows = OccupancyRollup.objects.filter(restaurant_id=restaurant_id, date=date, hour=hour, party_size=party_size)
+    if rows.update(**{field: F(field) + delta for field, delta in deltas.items()}) or max(deltas.values()) < 0:
+        return
+    try:
+        with transaction.atomic():
+            OccupancyRollup.objects.create(restaurant_id=restaurant_id, date=date, hour=hour, party_size=party_size,
+                                           **deltas)
+    except IntegrityError:
+        # Created by a concurrent request in between.
+        rows.update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def move(previous, current, tables=0):
+    """
+    Move a reservation, and ``tables`` of its tables, from the ``previous``
+    slot to the ``current`` one. Either can be None.
+    """
+    deltas = defaultdict(Counter)
+    if previous is not None:
+        deltas[previous[:4]].subtract(slot_counts(previous))
+        deltas[previous[:4]]['tables'] -= tables
+    if current is not None:
+        deltas[current[:4]].update(slot_counts(current))
+        deltas[current[:4]]['tables'] += tables
+    for key, counts in deltas.items():
+        apply(key, **counts)
+
+
+def _tables_of(reservation):
+    return TableReservations.objects.filter(reservation=reservation).count()
+
+
+@receiver(post_save, sender=Reservation)
+def rollupReservation(sender, instance=None, created=False, **kwargs):
+    current = instance.occupancy_slot()
+    if created:
+        move(None, current)
+    else:
+        previous = getattr(instance, '_loaded_slot', None)
+        # Instances not read from the database carry no previous slot: left
+        # for manage.py backfill_occupancy.
+        if previous is not None and previous != current:
+            tables = _tables_of(instance) if previous[:4] != current[:4] else 0
+            move(previous, current, tables)
+    instance._loaded_slot = current
+
+
+@receiver(post_delete, sender=Reservation)
+def rollupReservationDeleted(sender, instance=None, **kwargs):
+    # Its TableReservations were deleted first and took their tables along.
+    previous = getattr(instance, '_loaded_slot', None) or instance.occupancy_slot()
+    move(previous, None)
+
+
+def _table_slot(instance):
+    reservation = instance.reservation
+    slot = getattr(reservation, '_loaded_slot', None) or reservation.occupancy_slot()
+    return slot[:4] if slot is not None else None
+
+
+@receiver(post_save, sender=TableReservations)
+def rollupTableAssigned(sender, instance=None, created=False, **kwargs):
+    key = _table_slot(instance) if created else None
+    if key is not None:
+        apply(key, tables=1)
+
+
+@receiver(post_delete, sender=TableReservations)
+def rollupTableReleased(sender, instance=None, **kwargs):
+    key = _table_slot(instance)
+    if key is not None:
+        apply(key, tables=-1)
+
+
+def backfill(restaurant_ids=None, date_from=None, date_to=None):
+    """
+    Rebuild the rollup rows in scope from ``reservations`` with two grouped
+    queries, one for the reservations and one for their tables. Returns the
+    number of rows written.
+    """
+    reservations = Reservation.objects.order_by()
+    if restaurant_ids is not None:
+        reservations = reservations.filter(restaurant_id__in=restaurant_ids)
+    if date_from is not None:
+        reservations = reservations.filter(date__gte=date_from)
+    if date_to is not None:
+        reservations = reservations.filter(date__lte=date_to)
+    key = ('restaurant_id', 'date', 'hour', 'party_size')
+    active = ~Q(status=CANCELLED)
+
+    rows = defaultdict(dict)
+    for row in reservations.annotate(hour=ExtractHour('time')).values(*key).annotate(
+        reservations=Count('id', filter=active),
+        guests=Sum('party_size', filter=active, default=0),
+        cancelled=Count('id', filter=Q(status=CANCELLED)),
+    ):
+        rows[tuple(row.pop(field) for field in key)].update(row)
+    for row in TableReservations.objects.filter(reservation__in=reservations).order_by().annotate(
+        restaurant_id=F('reservation__restaurant_id'), date=F('reservation__date'),
+        hour=ExtractHour('reservation__time'), party_size=F('reservation__party_size'),
+    ).values(*key).annotate(tables=Count('id')):
+        rows[tuple(row.pop(field) for field in key)].update(row)
+
+    existing = OccupancyRollup.objects.all()
+    if restaurant_ids is not None:
+        existing = existing.filter(restaurant_id__in=restaurant_ids)
+    if date_from is not None:
+        existing = existing.filter(date__gte=date_from)
+    if date_to is not None:
+        existing = existing.filter(date__lte=date_to)
+    with transaction.atomic():
+        existing.delete()
+        OccupancyRollup.objects.bulk_create(
+            (OccupancyRollup(restaurant_id=restaurant_id, date=date, hour=hour, party_size=party_size, **counts)
+             for (restaurant_id, date, hour, party_size), counts in rows.items()),
+            batch_size=BACKFILL_BATCH_SIZE
+        )
+    return len(rows)
+
+
+def occupancy(restaurant_id, date_from, date_to):
+    """
+    Totals of the rollup rows of a restaurant between two dates, by date,
+    hour, weekday (0 is Monday) and party size, from a single query.
+    """
+    fields = OccupancyRollup.FIELDS
+    totals = dict.fromkeys(fields, 0)
+    groups = {name: defaultdict(lambda: dict.fromkeys(fields, 0))
+              for name in ('by_date', 'by_hour', 'by_weekday', 'by_party_size')}
+    for date, hour, party_size, *counts in OccupancyRollup.objects.filter(
+        restaurant_id=restaurant_id, date__gte=date_from, date__lte=date_to
+    ).order_by().values_list('date', 'hour', 'party_size', *fields):
+        for name, value in (('by_date', date), ('by_hour', hour), ('by_weekday', date.weekday()),
+                            ('by_party_size', party_size)):
+            group = groups[name][value]
+            for field, count in zip(fields, counts):
+                group[field] += count
+        for field, count in zip(fields, counts):
+            totals[field] += count
+
+    result = {'totals': totals}
+    for name, group in groups.items():
+        key = name[3:]
+        result[name] = [{key: value, **group[value]} for value in sorted(group)]
+    return result
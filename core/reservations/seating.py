@@ -0,0 +1,138 @@
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+MAX_COMBINED_TABLES = 3
+
+Seat = namedtuple('Seat', 'id number capacity location')
+Booking = namedtuple('Booking', 'id start duration party_size')
+
+
+def table_runs(tables, max_tables=MAX_COMBINED_TABLES):
+    """
+    Every single table and every run of up to ``max_tables`` adjacent ones:
+    consecutive numbers in the same location. ``tables`` are objects with
+    ``number``, ``capacity`` and ``location``, like ``Table`` or ``Seat``.
+    """
+    ordered = sorted(tables, key=lambda table: (table.location or '', table.number))
+    for start, first in enumerate(ordered):
+        run = [first]
+        yield tuple(run)
+        for table in ordered[start + 1:start + max_tables]:
+            previous = run[-1]
+            if (table.location or '') != (previous.location or '') or table.number != previous.number + 1:
+                break
+            run.append(table)
+            yield tuple(run)
+
+
+def seating_key(run, party_size):
+    """Fewest wasted seats, then fewest tables, then lowest numbers."""
+    return sum(table.capacity for table in run) - party_size, len(run), run[0].number
+
+
+def best_fit(tables, party_size, max_tables=MAX_COMBINED_TABLES):
+    """The run of ``table_runs`` that seats the party wasting the fewest seats, or None."""
+    best, best_key = None, None
+    for run in table_runs(tables, max_tables):
+        key = seating_key(run, party_size)
+        if key[0] >= 0 and (best_key is None or key < best_key):
+            best, best_key = run, key
+    return best
+
+
+class Schedule:
+    """Sorted, non overlapping bookings of one table, in minutes."""
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def is_free(self, start, end):
+        position = bisect_right(self.ends, start)
+        return position == len(self.starts) or self.starts[position] >= end
+
+    def book(self, start, end):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+
+
+class SeatingPlan:
+    """Tables given to each booking of an evening, and the bookings left unseated."""
+
+    def __init__(self, tables, bookings, assignments, solve_time):
+        self.tables = tables
+        self.bookings = bookings
+        self.assignments = assignments
+        self.unseated = [booking for booking in bookings if booking.id not in assignments]
+        self.solve_time = solve_time
+
+    def stats(self):
+        """Seated parties and guests, seat utilization and wasted seat hours."""
+        capacities = {table.id: table.capacity for table in self.tables}
+        seated = [booking for booking in self.bookings if booking.id in self.assignments]
+        used = sum(booking.party_size * booking.duration for booking in seated)
+        assigned = sum(
+            sum(capacities[table_id] for table_id in self.assignments[booking.id]) * booking.duration
+            for booking in seated
+        )
+        return {
+            'seated_parties': len(seated),
+            'unseated_parties': len(self.unseated),
+            'seated_guests': sum(booking.party_size for booking in seated),
+            'unseated_guests': sum(booking.party_size for booking in self.unseated),
+            'combined_parties': sum(len(self.assignments[booking.id]) > 1 for booking in seated),
+            'seat_utilization': round(used / assigned, 4) if assigned else 0.0,
+            'wasted_seat_hours': round((assigned - used) / 60, 2),
+            'solve_ms': round(self.solve_time * 1000, 3),
+        }
+
+
+def _plan(tables, bookings, order, runs, key=seating_key):
+    start_time = time.perf_counter()
+    schedules = {table.id: Schedule() for table in tables}
+    assignments = {}
+    for booking in sorted(bookings, key=order):
+        end = booking.start + booking.duration
+        best, best_key = None, None
+        # ``runs`` are sorted by the first item of ``key``: past the best one nothing can beat it.
+        for run in runs:
+            run_key = key(run, booking.party_size)
+            if best_key is not None and run_key[0] > best_key[0]:
+                break
+            if seating_key(run, booking.party_size)[0] < 0 or (best_key is not None and run_key >= best_key):
+                continue
+            if all(schedules[table.id].is_free(booking.start, end) for table in run):
+                best, best_key = run, run_key
+        if best is not None:
+            for table in best:
+                schedules[table.id].book(booking.start, end)
+            assignments[booking.id] = [table.id for table in best]
+    return SeatingPlan(tables, bookings, assignments, time.perf_counter() - start_time)
+
+
+def allocation_key(run, party_size):
+    """Any single table before a run, then ``seating_key``."""
+    return (len(run) > 1,) + seating_key(run, party_size)
+
+
+def plan_allocation(tables, bookings, max_tables=MAX_COMBINED_TABLES):
+    """
+    The evening as ``allocate_table`` seats it: each booking, in the order it
+    was made, takes the smallest single table free during its slot, or else
+    the ``best_fit`` run of adjacent free tables.
+    """
+    runs = sorted(table_runs(tables, max_tables), key=lambda run: len(run) > 1)
+    return _plan(tables, bookings, lambda booking: booking.id, runs, allocation_key)
+
+
+def plan_smallest_table(tables, bookings):
+    """
+    The allocation without combinations: each booking, in the order it was
+    made, takes the smallest single table free during its slot, like
+    ``order_by('capacity').first()`` at booking time.
+    """
+    runs = sorted(((table,) for table in tables), key=lambda run: (run[0].capacity, run[0].number))
+    return _plan(tables, bookings, lambda booking: booking.id, runs)
@@ -1,4 +1,5 @@
-from datetime import datetime
+import calendar
+from datetime import datetime, timedelta
 
 from rest_framework import serializers
 
@@ -13,8 +14,8 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Reservation
-        fields = ['id', 'customer', 'restaurant', 'restaurant_name', 'date', 'time', 'party_size', 'special_request',
-                  'status']
+        fields = ['id', 'customer', 'restaurant', 'restaurant_name', 'date', 'time', 'duration', 'party_size',
+                  'special_request', 'status']
         extra_kwargs = {
             'special_request': {'required': False}
         }
@@ -26,12 +27,12 @@ class ResevationsByRestaurantsSerializer(serializers.ModelSerializer):
         queryset=Restaurant.objects.all(),
         write_only=True
     )
-    restaurant_id = serializers.IntegerField(source='restaurant.id', read_only=True)
+    restaurant_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Reservation
-        fields = ['id', 'customer', 'restaurant', 'restaurant_id', 'restaurant_name', 'date', 'time', 'party_size',
-                  'special_request',
+        fields = ['id', 'customer', 'restaurant', 'restaurant_id', 'restaurant_name', 'date', 'time', 'duration',
+                  'party_size', 'special_request',
                   'status']
 
 
@@ -41,10 +42,85 @@ class ResevationsByCustomersSerializer(serializers.ModelSerializer):
         queryset=CustomerUser.objects.all(),
         write_only=True
     )
-    customer_id = serializers.IntegerField(source='customer.id', read_only=True)
+    customer_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Reservation
-        fields = ['id', 'customer', 'customer_id', 'restaurant_name', 'date', 'time', 'party_size',
+        fields = ['id', 'customer', 'customer_id', 'restaurant_name', 'date', 'time', 'duration', 'party_size',
                   'special_request',
                   'status']
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    party_size = serializers.IntegerField(min_value=1)
+    duration = serializers.IntegerField(min_value=15, default=90)
+
+
+class AvailabilitySlotSerializer(serializers.Serializer):
+    time = serializers.TimeField(format='%H:%M')
+    tables = serializers.ListField(child=serializers.IntegerField())
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    restaurant_name = serializers.CharField()
+    date = serializers.DateField()
+    party_size = serializers.IntegerField()
+    duration = serializers.IntegerField()
+    slots = AvailabilitySlotSerializer(many=True)
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    month = serializers.DateField(input_formats=['%Y-%m'], required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        month = attrs.pop('month', None)
+        if month is not None:
+            attrs['date_from'] = month
+            attrs['date_to'] = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+        if 'date_from' not in attrs or 'date_to' not in attrs:
+            raise serializers.ValidationError("Indique 'month' o 'date_from' y 'date_to'.")
+        if attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError("'date_to' debe ser posterior a 'date_from'.")
+        if attrs['date_to'] - attrs['date_from'] >= timedelta(days=self.MAX_DAYS):
+            raise serializers.ValidationError(f"El rango no puede superar {self.MAX_DAYS} dias.")
+        return attrs
+
+
+class OccupancyCountsSerializer(serializers.Serializer):
+    reservations = serializers.IntegerField()
+    guests = serializers.IntegerField()
+    cancelled = serializers.IntegerField()
+    tables = serializers.IntegerField()
+
+
+class OccupancyByDateSerializer(OccupancyCountsSerializer):
+    date = serializers.DateField()
+
+
+class OccupancyByHourSerializer(OccupancyCountsSerializer):
+    hour = serializers.IntegerField()
+
+
+class OccupancyByWeekdaySerializer(OccupancyCountsSerializer):
+    weekday = serializers.IntegerField(help_text='0 es lunes')
+
+
+class OccupancyByPartySizeSerializer(OccupancyCountsSerializer):
+    party_size = serializers.IntegerField()
+
+
+class OccupancySerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField()
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    totals = OccupancyCountsSerializer()
+    by_date = OccupancyByDateSerializer(many=True)
+    by_hour = OccupancyByHourSerializer(many=True)
+    by_weekday = OccupancyByWeekdaySerializer(many=True)
+    by_party_size = OccupancyByPartySizeSerializer(many=True)
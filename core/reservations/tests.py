@@ -1,3 +1,347 @@
-from django.test import TestCase
+import datetime
+import threading
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.reservations.models import OccupancyRollup, Reservation, TableReservations
+from core.reservations.promotion import promote_waiting, waiting_lists
+from core.reservations.rollups import backfill
+from core.reservations.seating import Booking, Seat, best_fit, plan_allocation, plan_smallest_table
+from core.restaurant.models import Restaurant, Table
+from core.testing import QueryBudgetTestCase, make_reservations, make_restaurant, make_customer, make_tables
+from core.utilis import SmallKeysetPagination
+
+
+class ReservationQueryBudgetTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+
+    def test_reservation_list(self):
+        self.assertQueryBudget(
+            '/api/reservations/', 2,
+            grow=lambda: make_reservations(4, customer=self.user, restaurant=self.restaurant)
+        )
+
+    def test_reservation_detail(self):
+        reservation = make_reservations(1, customer=self.user, restaurant=self.restaurant)[0]
+        self.assertQueryBudget(f'/api/reservations/{reservation.id}/', 1)
+
+    def test_reservations_by_status(self):
+        self.assertQueryBudget(
+            '/api/reservations/status/?status=confirmed', 2,
+            grow=lambda: make_reservations(4, customer=self.user, restaurant=self.restaurant, status='confirmed')
+        )
+
+
+class ReservationFilterTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+        make_reservations(3, customer=self.user, restaurant=self.restaurant, status='confirmed', party_size=4)
+        make_reservations(2, restaurant=self.restaurant, status='pending')
+
+    def get_ids(self, query):
+        response = self.client.get(f'/api/reservations/status/?{query}')
+        return response.status_code, [reservation['id'] for reservation in response.data.get('results', [])]
+
+    def test_filters(self):
+        confirmed = list(Reservation.objects.filter(status='confirmed').order_by('date').values_list('id', flat=True))
+        self.assertEqual(self.get_ids('status=confirmed'), (200, confirmed))
+        self.assertEqual(self.get_ids('search=confirmed'), (200, confirmed))
+        self.assertEqual(self.get_ids(f'customer={self.user.id}&date_from=2026-01-02'), (200, confirmed[1:]))
+        self.assertEqual(self.get_ids(f'restaurant={self.restaurant.id}&party_size_min=3&date_to=2026-01-01'),
+                         (200, confirmed[:1]))
+
+    def test_no_results_and_invalid_status(self):
+        self.assertEqual(self.get_ids('status=waiting_list')[0], 404)
+        self.assertEqual(self.get_ids('status=confirm')[0], 400)
+
+
+class AvailabilityTest(QueryBudgetTestCase):
+    date = datetime.date(2026, 3, 10)
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant(opening_time=datetime.time(18, 0), closing_time=datetime.time(23, 0))
+        self.small = make_tables(self.restaurant, 1, capacity=2)[0]
+        self.large = make_tables(self.restaurant, 1, capacity=4)[0]
+
+    def book(self, table, time, date=None, duration=90):
+        reservation = Reservation.objects.create(customer=self.user, restaurant=self.restaurant, party_size=2,
+                                                 date=date or self.date, time=time, duration=duration)
+        TableReservations.objects.create(table=table, reservation=reservation)
+        return reservation
+
+    def slots(self, party_size=2, date=None):
+        response = self.client.get(f'/api/restaurant/{self.restaurant.id}/availability/',
+                                   {'date': (date or self.date).isoformat(), 'party_size': party_size})
+        self.assertEqual(response.status_code, 200)
+        return {slot['time']: slot['tables'] for slot in response.data['slots']}
+
+    def test_overlapping_bookings_remove_slots(self):
+        self.book(self.large, datetime.time(20, 0))
+        slots = self.slots()
+        self.assertEqual(slots['18:30'], [self.small.id, self.large.id])
+        # 19:00 to 20:30 and 20:30 to 22:00 overlap the booking, 21:30 starts when it ends.
+        for time in ('19:00', '20:00', '21:00'):
+            self.assertEqual(slots[time], [self.small.id])
+        self.assertEqual(slots['21:30'], [self.small.id, self.large.id])
+        self.assertNotIn('22:00', slots)
+
+    def test_capacity(self):
+        self.assertEqual(set(map(tuple, self.slots(party_size=3).values())), {(self.large.id,)})
+        self.assertEqual(self.slots(party_size=5), {})
+
+    def test_changes_invalidate_the_cached_index(self):
+        self.assertEqual(self.slots(party_size=5), {})
+        # A warm poll is answered from the cache.
+        with self.assertNumQueries(0):
+            self.slots(party_size=5)
+
+        self.large.capacity = 6
+        self.large.save()
+        self.assertEqual(self.slots(party_size=5)['20:00'], [self.large.id])
+
+        reservation = Reservation.objects.create(customer=self.user, restaurant=self.restaurant, party_size=5,
+                                                 date=self.date, time=datetime.time(20, 0))
+        self.slots(party_size=5)
+        TableReservations.objects.create(table=self.large, reservation=reservation)
+        self.assertNotIn('20:00', self.slots(party_size=5))
+
+        reservation.status = 'cancell'
+        reservation.save()
+        self.assertEqual(self.slots(party_size=5)['20:00'], [self.large.id])
+
+    def test_overnight_window_includes_next_day_bookings(self):
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(closing_time=datetime.time(2, 0))
+        self.book(self.large, datetime.time(0, 30), date=self.date + datetime.timedelta(days=1))
+        slots = self.slots()
+        self.assertEqual(slots['23:00'], [self.small.id, self.large.id])
+        self.assertEqual(slots['00:00'], [self.small.id])
+        self.assertEqual(slots['00:30'], [self.small.id])
+        # Those early hours belong to the evening before, not to the next day's window.
+        self.assertEqual(self.slots(date=self.date + datetime.timedelta(days=1))['18:00'],
+                         [self.small.id, self.large.id])
+
+
+class KeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        customer, restaurant = make_customer(), make_restaurant()
+        for day in range(5):
+            for hour in (20, 20, 21):
+                Reservation.objects.create(customer=customer, restaurant=restaurant, party_size=2,
+                                           date=datetime.date(2026, 1, 1 + day), time=datetime.time(hour, 0))
+        self.expected = list(Reservation.objects.order_by('-date', 'time', 'id').values_list('id', flat=True))
+
+    def get_page(self, url):
+        view = SimpleNamespace(keyset_ordering=('-date', 'time'))
+        paginator = SmallKeysetPagination()
+        request = Request(APIRequestFactory().get(url))
+        page = paginator.paginate_queryset(Reservation.objects.all(), request, view=view)
+        return [reservation.id for reservation in page], paginator.get_paginated_response([]).data
+
+    def test_walks_every_page_forward_and_back(self):
+        url, pages = '/api/reservations/?count=true', []
+        while url:
+            ids, data = self.get_page(url)
+            self.assertEqual(data['count'], len(self.expected))
+            pages.append(ids)
+            url = data['next']
+        self.assertEqual([pk for ids in pages for pk in ids], self.expected)
+
+        url = self.get_page(f'/api/reservations/?page_size={len(self.expected) - 1}')[1]['next']
+        ids, data = self.get_page(url)
+        ids, data = self.get_page(data['previous'])
+        self.assertEqual(ids, self.expected[:-1])
+        self.assertIsNone(data['previous'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.get_page('/api/reservations/?cursor=bm90LWEtY3Vyc29y')
+
+
+class WaitingListPromotionTest(TestCase):
+
+    date = datetime.date(2026, 1, 1)
+
+    def setUp(self):
+        waiting_lists.clear()
+        now = mock.patch('django.utils.timezone.now',
+                         return_value=datetime.datetime(2026, 1, 1, 17, 0, tzinfo=datetime.timezone.utc))
+        now.start()
+        self.addCleanup(now.stop)
+        self.customer, self.restaurant = make_customer(), make_restaurant()
+        self.table = make_tables(self.restaurant, 1, capacity=4)[0]
+
+    def reserve(self, party_size, hour, date=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(customer=self.customer, restaurant=self.restaurant, status='confirmed',
+                                              party_size=party_size, date=date or self.date,
+                                              time=datetime.time(hour, 0))
+
+    def statuses(self, *reservations):
+        return [Reservation.objects.get(pk=reservation.pk).status for reservation in reservations]
+
+    def test_cancellation_promotes_first_waiting_that_fits(self):
+        seated, too_big, first, second = self.reserve(4, 19), self.reserve(6, 18), self.reserve(2, 20), \
+            self.reserve(3, 21)
+        self.assertEqual(self.statuses(too_big, first, second), ['waiting_list'] * 3)
+
+        seated = Reservation.objects.get(pk=seated.pk)
+        seated.status = 'cancell'
+        with self.captureOnCommitCallbacks(execute=True):
+            seated.save()
+
+        self.assertEqual(self.statuses(seated, too_big, first, second),
+                         ['cancell', 'waiting_list', 'confirmed', 'waiting_list'])
+        self.assertEqual(TableReservations.objects.get(reservation=first).table, self.table)
+        self.assertEqual(Table.objects.get(pk=self.table.pk).status, Table.Status.OCCUPIED)
+
+    def test_freed_table_promotes_in_one_batch(self):
+        self.reserve(4, 19)
+        waiting = self.reserve(2, 20)
+        make_tables(self.restaurant, 2, capacity=2)
+        Table.objects.filter(restaurant=self.restaurant).update(status=Table.Status.OCCUPIED)
+        self.assertEqual(self.statuses(waiting), ['waiting_list'])
+
+        waiting_lists.get(self.restaurant.id)
+        Table.objects.filter(restaurant=self.restaurant).update(status=Table.Status.FREE)
+        # Savepoint, free tables, matched reservations, one write per model, the occupancy rollup and release.
+        with self.assertNumQueries(8):
+            promoted = promote_waiting(self.restaurant.id)
+        self.assertEqual(promoted, [waiting])
+        self.assertEqual(TableReservations.objects.get(reservation=waiting).table.capacity, 2)
+
+
+    def test_only_todays_reservations_are_promoted(self):
+        seated = self.reserve(4, 19)
+        tomorrow = self.reserve(2, 18, date=self.date + datetime.timedelta(days=1))
+        missed = self.reserve(2, 16)
+        later = self.reserve(2, 21)
+        self.assertEqual(self.statuses(tomorrow, missed, later), ['waiting_list'] * 3)
+
+        seated.status = 'cancell'
+        with self.captureOnCommitCallbacks(execute=True):
+            seated.save()
+
+        # 16:00 is past the grace period at 17:00, tomorrow's table may be free by then.
+        self.assertEqual(self.statuses(tomorrow, missed, later), ['waiting_list', 'waiting_list', 'confirmed'])
+
+class SeatingTest(TestCase):
+
+    def test_best_fit_combines_adjacent_tables_of_a_location(self):
+        tables = [Seat(1, 1, 4, 'Salon'), Seat(2, 2, 2, 'Salon'), Seat(3, 3, 4, 'Terraza'), Seat(5, 5, 4, 'Terraza')]
+        self.assertEqual([table.number for table in best_fit(tables, 2)], [2])
+        self.assertEqual([table.number for table in best_fit(tables, 6)], [1, 2])
+        self.assertIsNone(best_fit(tables, 8))
+
+    def test_allocation_plan_combines_when_no_table_fits(self):
+        tables = [Seat(1, 1, 4, 'Salon'), Seat(2, 2, 4, 'Salon'), Seat(3, 3, 4, 'Salon'), Seat(4, 4, 2, 'Salon'),
+                  Seat(5, 5, 2, 'Salon')]
+        bookings = [Booking(1, 1200, 90, 4), Booking(2, 1200, 90, 8), Booking(3, 1200, 90, 2)]
+        self.assertEqual(plan_smallest_table(tables, bookings).stats()['seated_guests'], 6)
+        plan = plan_allocation(tables, bookings)
+        self.assertEqual(plan.assignments[1], [1])
+        self.assertEqual(plan.assignments[2], [2, 3])
+        self.assertEqual(plan.assignments[3], [4])
+        self.assertEqual(plan.stats()['seated_guests'], 14)
+
+    def test_allocation_claims_a_run_when_no_table_fits(self):
+        restaurant = make_restaurant()
+        make_tables(restaurant, 2, capacity=4)
+        reservation = Reservation.objects.create(customer=make_customer(), restaurant=restaurant, party_size=7,
+                                                 status='confirmed')
+        self.assertEqual(Reservation.objects.get(pk=reservation.pk).status, 'confirmed')
+        self.assertEqual(TableReservations.objects.filter(reservation=reservation).count(), 2)
+
+
+class ConcurrentAllocationTest(TransactionTestCase):
+    THREADS = 8
+
+    def test_one_table_is_assigned_once(self):
+        customer, restaurant = make_customer(), make_restaurant()
+        make_tables(restaurant, 1, capacity=4)
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def reserve():
+            try:
+                barrier.wait()
+                Reservation.objects.create(customer=customer, restaurant=restaurant, party_size=2,
+                                           status='confirmed')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(TableReservations.objects.filter(reservation__restaurant=restaurant).count(), 1)
+        self.assertEqual(Reservation.objects.filter(restaurant=restaurant, status='waiting_list').count(),
+                         self.THREADS - 1)
+
+
+class OccupancyRollupTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+        make_tables(self.restaurant, 1, capacity=4)
+
+    def reserve(self, **kwargs):
+        data = {'customer': self.user, 'restaurant': self.restaurant, 'party_size': 2,
+                'date': datetime.date(2026, 1, 5), 'time': datetime.time(20, 30)}
+        data.update(kwargs)
+        return Reservation.objects.create(**data)
+
+    def rollup(self):
+        return sorted(OccupancyRollup.objects.exclude(reservations=0, guests=0, cancelled=0, tables=0)
+                      .values_list('date', 'hour', 'party_size', *OccupancyRollup.FIELDS))
+
+    def test_signals_match_backfill(self):
+        self.reserve(status='confirmed', party_size=3)
+        moved, cancelled, deleted = self.reserve(), self.reserve(), self.reserve(party_size=6)
+        moved = Reservation.objects.get(pk=moved.pk)
+        moved.time = datetime.time(21, 0)
+        moved.save()
+        cancelled = Reservation.objects.get(pk=cancelled.pk)
+        cancelled.status = 'cancell'
+        cancelled.save()
+        Reservation.objects.get(pk=deleted.pk).delete()
+
+        incremental = self.rollup()
+        self.assertEqual(incremental, [
+            (datetime.date(2026, 1, 5), 20, 2, 0, 0, 1, 0),
+            (datetime.date(2026, 1, 5), 20, 3, 1, 3, 0, 1),
+            (datetime.date(2026, 1, 5), 21, 2, 1, 2, 0, 0),
+        ])
+        backfill()
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_occupancy_endpoint(self):
+        self.reserve(party_size=4, date=datetime.date(2026, 1, 5))
+        self.reserve(party_size=2, date=datetime.date(2026, 1, 6), time=datetime.time(13, 0))
+        self.reserve(party_size=2, date=datetime.date(2026, 2, 1))
+        path = f'/api/restaurant/{self.restaurant.id}/occupancy/?month=2026-01'
+        self.assertQueryBudget(path, 2)
+
+        data = self.client.get(path).data
+        self.assertEqual(data['totals'], {'reservations': 2, 'guests': 6, 'cancelled': 0, 'tables': 0})
+        self.assertEqual([row['hour'] for row in data['by_hour']], [13, 20])
+        self.assertEqual([(row['weekday'], row['guests']) for row in data['by_weekday']], [(0, 4), (1, 2)])
+        self.assertEqual(self.client.get(f'/api/restaurant/{self.restaurant.id}/occupancy/').status_code, 400)
@@ -6,5 +6,6 @@ urlpatterns = [
     path('reservations/', ReservationListAPIView.as_view(), name='reservation'),
     path('reservations/<int:pk>/', ReservationDetailAPIView.as_view(), name='reservation-detail'),
     path('reservations/status/', GetReservationStatus.as_view(), name='reservation-status'),
+    path('async/reservations/', AsyncReservationListView.as_view()),
 
 ]
\ No newline at end of file
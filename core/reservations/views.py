@@ -1,22 +1,26 @@
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView, GenericAPIView,  get_object_or_404
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
+from core.async_views import AsyncAPIView
+from core.customers.authentication import CachedTokenAuthentication
+from core.fastpath import FastListMixin
+from core.reservations.filters import ReservationFilter
 from core.reservations.serializers import *
 from core.restaurant.models import Restaurant
-from core.utilis import LargeResultsSetPagination
+from core.utilis import LargeResultsSetPagination, LargeKeysetPagination
 
 
 @extend_schema(tags=['Reservations'])
-class ReservationListAPIView(ListCreateAPIView):
-    queryset = Reservation.objects.all().order_by('id')
+class ReservationListAPIView(FastListMixin, ListCreateAPIView):
+    queryset = Reservation.objects.select_related('restaurant').order_by('id')
     serializer_class = ReservationSerializer
     permission_classes = [AllowAny]
-    pagination_class = LargeResultsSetPagination
+    pagination_class = LargeKeysetPagination
+    keyset_ordering = ('id',)
 
     @extend_schema(
         summary='Listar las reservaciones',
@@ -34,32 +38,48 @@ class ReservationListAPIView(ListCreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
+class AsyncReservationListView(AsyncAPIView):
+    """Async mirror of the listing of ``ReservationListAPIView``."""
+    permission_classes = [AllowAny]
+    keyset_ordering = ReservationListAPIView.keyset_ordering
+
+    async def get(self, request):
+        paginator = LargeKeysetPagination()
+        page = await paginator.apaginate_queryset(ReservationListAPIView.queryset.all(), request, view=self)
+        return self.response(paginator.get_paginated_response(ReservationSerializer(page, many=True).data).data)
+
+
 @extend_schema(tags=['Reservations'])
 class GetReservationStatus(ListAPIView):
-    queryset = Reservation.objects.all().order_by('id')
+    queryset = Reservation.objects.select_related('restaurant').order_by('date', 'time', 'id')
     serializer_class = ReservationSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     pagination_class = LargeResultsSetPagination
-    filter_backends = [SearchFilter]
-    search_fields = ['status']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ReservationFilter
 
     @extend_schema(
         summary="Lista las Reservaciones por su status",
-        description="Obtiene una lista de todas las reservaciones por el status que se ingreso",
+        description="Obtiene una lista de las reservaciones filtradas por status, rango de fechas, restaurante, "
+                    "cliente y cantidad de personas. 'search' se acepta como alias de 'status'.",
     )
     def get(self, request, *args, **kwargs):
-        term = self.request.query_params.get('search', '')
-        reservation = self.get_queryset().filter(status=term)
-        if not reservation:
+        return self.list(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        if not page:
+            term = request.query_params.get('status', request.query_params.get('search', ''))
             return Response({"message": f"No se encontraron reservaciones con el status '{term}'"},
                             status=status.HTTP_404_NOT_FOUND)
-        return super().get(request, *args, **kwargs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 @extend_schema(tags=['Reservations'])
 class ReservationDetailAPIView(RetrieveUpdateDestroyAPIView):
-    queryset = Reservation.objects.all().order_by('id')
+    queryset = Reservation.objects.select_related('restaurant').order_by('id')
     serializer_class = ReservationSerializer
     permission_classes = [AllowAny]
     pagination_class = LargeResultsSetPagination
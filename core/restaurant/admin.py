@@ -1,5 +1,24 @@
 from django.contrib import admin
 from core.restaurant.models import Restaurant,Table
-# Register your models here.
-admin.site.register(Restaurant)
-admin.site.register(Table)
\ No newline at end of file
+from core.utilis import EstimatedCountPaginator
+
+
+@admin.register(Restaurant)
+class RestaurantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'rnc', 'email', 'phone', 'capacity')
+    search_fields = ('name', 'rnc', 'email')
+
+
+@admin.register(Table)
+class TableAdmin(admin.ModelAdmin):
+    list_display = ('id', 'restaurant', 'number', 'capacity', 'location', 'status')
+    list_filter = ('status',)
+    search_fields = ('restaurant__name', '=number')
+    autocomplete_fields = ('restaurant',)
+    ordering = ('restaurant', 'number')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Table.__str__ reads the restaurant name, also in the autocomplete results.
+        return super().get_queryset(request).select_related('restaurant')
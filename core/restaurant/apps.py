@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RestaurantConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core.restaurant'
+
+    def ready(self):
+        from core.restaurant import caching, renditions, search, stream  # noqa: F401
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from core.restaurant.models import Restaurant, Table
+from core.restaurant.serializers import TableSerializer
+from core.restaurant.signals import tables_bulk_created
+
+BULK_BATCH_SIZE = 500
+
+
+class TableBulkItemSerializer(TableSerializer):
+    """
+    Validates the fields of a single row. The restaurant and the
+    ``(restaurant, number)`` uniqueness are checked for the whole batch at
+    once by ``bulk_create_tables``.
+    """
+    restaurant = serializers.IntegerField(write_only=True, min_value=1)
+
+    class Meta(TableSerializer.Meta):
+        validators = []
+
+
+def bulk_create_tables(items, batch_size=BULK_BATCH_SIZE):
+    """
+    Create the valid rows of ``items`` with ``bulk_create`` and return the
+    created tables and a ``{index: errors}`` map for the rejected rows.
+    """
+    errors = {}
+    rows = []
+    for index, item in enumerate(items):
+        serializer = TableBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            rows.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+
+    restaurant_ids = {data['restaurant'] for _, data in rows}
+    restaurants = Restaurant.objects.only('id', 'name').order_by().in_bulk(restaurant_ids)
+    taken = set(Table.objects.filter(
+        restaurant_id__in=restaurant_ids,
+        number__in={data['number'] for _, data in rows}
+    ).order_by().values_list('restaurant_id', 'number'))
+
+    tables = []
+    for index, data in rows:
+        restaurant_id = data.pop('restaurant')
+        key = (restaurant_id, data['number'])
+        if restaurant_id not in restaurants:
+            errors[index] = {'restaurant': [_('Invalid pk "{pk_value}" - object does not exist.').format(
+                pk_value=restaurant_id
+            )]}
+        elif key in taken:
+            errors[index] = {'non_field_errors': [_("Ya existe una mesa con este número en este restaurante.")]}
+        else:
+            taken.add(key)
+            tables.append(Table(restaurant=restaurants[restaurant_id], **data))
+
+    if tables:
+        with transaction.atomic():
+            Table.objects.bulk_create(tables, batch_size=batch_size)
+        tables_bulk_created.send(sender=Table, restaurant_ids={table.restaurant_id for table in tables})
+
+    return tables, errors
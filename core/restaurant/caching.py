@@ -0,0 +1,94 @@
+import hashlib
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+from core.restaurant.models import Restaurant, Table
+from core.restaurant.signals import restaurants_bulk_created, tables_bulk_created
+
+DIRECTORY_TIMEOUT = 60 * 60
+DIRECTORY_GENERATION_KEY = 'restaurants:directory:generation'
+# Backends whose entries live in one process: every worker would keep, and
+# invalidate, its own copy of the directory, availability and summary caches.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Warning(
+        f'The default cache {backend} is not shared between processes.',
+        hint='Invalidations only reach the process that made them, so run a single worker or use a shared '
+             'backend like config.cache.REDIS.',
+        id='restaurant.W001',
+    )]
+
+
+def restaurant_validators(restaurant):
+    """``(etag, last_modified)`` of a single restaurant, from ``update_at``."""
+    return quote_etag(f'{restaurant.pk}-{restaurant.update_at.timestamp()}'), restaurant.update_at
+
+
+def directory_validators(queryset):
+    """
+    ``(etag, last_modified)`` of a restaurant list, from the number of rows
+    and the latest ``update_at`` among them, so both edits and deletions
+    change the tag. Issues a single aggregate query.
+    """
+    state = queryset.order_by().aggregate(total=Count('id'), last_modified=Max('update_at'))
+    last_modified = state['last_modified']
+    stamp = last_modified.timestamp() if last_modified else 0
+    return quote_etag(f'{state["total"]}-{stamp}'), last_modified
+
+
+def conditional_response(request, etag, last_modified, build, private=False):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with a 304 before the
+    payload is built; otherwise call ``build`` for the response. Either way
+    the validators are attached and clients are told to revalidate.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, no_cache=True, **({'private': True} if private else {'public': True}))
+    return response
+
+
+def directory_key(request):
+    generation = cache.get_or_set(DIRECTORY_GENERATION_KEY, 0, None)
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'restaurants:directory:{generation}:{url}'
+
+
+def invalidate_directory():
+    try:
+        cache.incr(DIRECTORY_GENERATION_KEY)
+    except ValueError:
+        cache.set(DIRECTORY_GENERATION_KEY, 1, None)
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=Table)
+def directoryChanged(sender, **kwargs):
+    invalidate_directory()
+
+
+@receiver(restaurants_bulk_created, sender=Restaurant)
+@receiver(tables_bulk_created, sender=Table)
+def directoryBulkChanged(sender, **kwargs):
+    invalidate_directory()
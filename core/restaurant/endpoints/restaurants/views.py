@@ -1,14 +1,27 @@
-from drf_spectacular.utils import extend_schema
+import codecs
+
+from django.core.cache import cache
+from django.shortcuts import aget_object_or_404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView, get_object_or_404
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core.async_views import AsyncAPIView
+from core.customers.authentication import CachedTokenAuthentication
+from core.reservations.availability import get_index
 from core.reservations.models import Reservation
-from core.reservations.serializers import ResevationsByRestaurantsSerializer
+from core.reservations.rollups import occupancy
+from core.reservations.serializers import ResevationsByRestaurantsSerializer, AvailabilityQuerySerializer, \
+    AvailabilitySerializer, OccupancyQuerySerializer, OccupancySerializer
+from core.restaurant.caching import DIRECTORY_TIMEOUT, conditional_response, directory_key, directory_validators, \
+    restaurant_validators
 from core.restaurant.models import Restaurant
+from core.restaurant.onboarding import Onboarding, read_rows
+from core.restaurant.search import SEARCH_LIMIT, RestaurantSearchFilter
 from core.restaurant.serializers import RestaurantSerializers
 from core.utilis import *
 
@@ -18,42 +31,109 @@ class RestaurantListAPIView(ListCreateAPIView):
     queryset = Restaurant.objects.all().order_by('id')
     serializer_class = RestaurantSerializers
     permission_classes = [AllowAny]
-    authentication_classes = [TokenAuthentication]
-    filter_backends = [SearchFilter]
+    authentication_classes = [CachedTokenAuthentication]
+    filter_backends = [RestaurantSearchFilter]
     search_fields = ['rnc', 'name', 'email', 'phone']
     pagination_class = LargeResultsSetPagination
 
     @extend_schema(
         summary="Listar restaurantes",
-        description="Obtiene una lista de todos los restaurantes.",
+        description="Obtiene una lista de todos los restaurantes. Con 'search' devuelve solo los "
+                    f"{SEARCH_LIMIT} restaurantes mejor clasificados, en orden de relevancia. Responde 304 si el "
+                    "ETag o la fecha enviados en If-None-Match / If-Modified-Since siguen vigentes.",
     )
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        key = directory_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, last_modified, data = cached
+            return conditional_response(request, etag, last_modified, lambda: Response(data))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = directory_validators(queryset)
+
+        def build():
+            page = self.paginate_queryset(queryset)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            cache.set(key, (etag, last_modified, response.data), DIRECTORY_TIMEOUT)
+            return response
+
+        return conditional_response(request, etag, last_modified, build)
+
     @extend_schema(
         summary="Crear restaurante",
-        description="Crea un nuevo restaurante o varios restaurantes si se proporciona una lista.",
+        description="Crea un nuevo restaurante o varios restaurantes si se proporciona una lista. Con una lista "
+                    "responde los ids creados en 'created' y las filas invalidas con su indice en 'errors'.",
     )
     def post(self, request, *args, **kwargs):
         is_many = isinstance(request.data, list)
         if is_many:
-            serializer = self.get_serializer(data=request.data, many=True)
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+            # Open to anonymous clients: passwords are hashed in this process,
+            # the process pool is only for the staff endpoint and the command.
+            with Onboarding(workers=1) as onboarding:
+                onboarding.run(request.data)
+            return onboarding_response(onboarding)
         return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save()
 
 
+def onboarding_response(onboarding):
+    """201 when every row was created, 207 when some were and 400 when none was."""
+    data = {
+        'created': onboarding.created,
+        'errors': [{'index': index, 'errors': onboarding.errors[index]} for index in sorted(onboarding.errors)]
+    }
+    if not onboarding.created:
+        return Response(data, status=status.HTTP_400_BAD_REQUEST)
+    if onboarding.errors:
+        return Response(data, status=status.HTTP_207_MULTI_STATUS)
+    return Response(data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=['Restaurantes'])
+class RestaurantOnboardingApiView(APIView):
+    permission_classes = [IsAdminUser]
+    authentication_classes = [CachedTokenAuthentication]
+    parser_classes = []
+    formats = {
+        'text/csv': 'csv',
+        'application/x-ndjson': 'jsonl',
+        'application/jsonl': 'jsonl',
+    }
+
+    @extend_schema(
+        summary="Registrar restaurantes en lote",
+        description="Registra restaurantes leyendo el cuerpo de la peticion como CSV (text/csv) o JSON Lines "
+                    "(application/x-ndjson) a medida que llega. Cada fila crea el restaurante, su usuario, su "
+                    "grupo y su token. Responde los ids creados en 'created' y las filas invalidas con su "
+                    "indice en 'errors'.",
+        request={'text/csv': str, 'application/x-ndjson': str},
+        responses={201: OpenApiTypes.OBJECT, 207: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    )
+    def post(self, request, *args, **kwargs):
+        format = self.formats.get(request.content_type.split(';')[0].strip())
+        if format is None:
+            return Response({'detail': f"Unsupported media type \"{request.content_type}\"."},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        if request.stream is None:
+            return Response({'detail': "Empty request body."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with Onboarding() as onboarding:
+            onboarding.run(read_rows(codecs.getreader('utf-8-sig')(request.stream), format))
+        return onboarding_response(onboarding)
+
+
 @extend_schema(tags=['Restaurantes'])
 class GetReservationRestaurant(GenericAPIView):
-    queryset = Reservation.objects.all().order_by('id')
+    queryset = Reservation.objects.select_related('restaurant').order_by('date', 'time', 'id')
     serializer_class = ResevationsByRestaurantsSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     pagination_class = LargeResultsSetPagination
 
     @extend_schema(
@@ -62,31 +142,72 @@ class GetReservationRestaurant(GenericAPIView):
     )
     def get(self, request, restaurant_id):
         restaurant = get_object_or_404(Restaurant, pk=restaurant_id)
-        reservations = self.get_queryset().filter(restaurant=restaurant)
-        if not reservations:
+        page = self.paginate_queryset(self.get_queryset().filter(restaurant=restaurant))
+        if not page:
             return Response({"message": "No reservatios founds"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = self.get_serializer(reservations, many=True)
+        serializer = self.get_serializer(page, many=True)
         data = {
-            'total_reservations': reservations.count(),
+            'total_reservations': self.paginator.page.paginator.count,
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
             "reservations": serializer.data
         }
         return Response(data, status=status.HTTP_200_OK)
 
 
+class AsyncReservationsByRestaurant(AsyncAPIView):
+    """Async mirror of ``GetReservationRestaurant``."""
+
+    async def get(self, request, restaurant_id):
+        restaurant = await aget_object_or_404(Restaurant, pk=restaurant_id)
+        paginator = LargeResultsSetPagination()
+        page = await paginator.apaginate_queryset(
+            GetReservationRestaurant.queryset.filter(restaurant=restaurant), request, view=self
+        )
+        if not page:
+            return self.response({"message": "No reservatios founds"}, status=status.HTTP_404_NOT_FOUND)
+        return self.response({
+            'total_reservations': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'reservations': ResevationsByRestaurantsSerializer(page, many=True).data
+        })
+
+
+class AsyncRestaurantDetail(AsyncAPIView):
+    """Async mirror of ``RestaurantRetrieveAPIView.get``, with the same 304 handling."""
+    queryset = Restaurant.objects.all()
+
+    async def get(self, request, pk):
+        restaurant = await aget_object_or_404(self.queryset, pk=pk)
+        etag, last_modified = restaurant_validators(restaurant)
+        return conditional_response(
+            request, etag, last_modified, lambda: self.response(RestaurantSerializers(restaurant).data), private=True
+        )
+
+
 @extend_schema(tags=['Restaurantes'])
 class RestaurantRetrieveAPIView(RetrieveUpdateDestroyAPIView):
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializers
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     @extend_schema(
         summary="Obtener restaurante",
-        description="Obtiene los detalles de un restaurante específico.",
+        description="Obtiene los detalles de un restaurante específico. Responde 304 si el ETag o la fecha "
+                    "enviados en If-None-Match / If-Modified-Since siguen vigentes.",
     )
     def get(self, request, *args, **kwargs):
         return self.retrieve(request, *args, **kwargs)
 
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = restaurant_validators(instance)
+        return conditional_response(
+            request, etag, last_modified, lambda: Response(self.get_serializer(instance).data), private=True
+        )
+
     @extend_schema(
         summary="Actualizar restaurante",
         description="Actualiza todos los campos de un restaurante específico.",
@@ -115,3 +236,72 @@ class RestaurantRetrieveAPIView(RetrieveUpdateDestroyAPIView):
 
     def perform_destroy(self, instance):
         instance.delete()
+
+
+@extend_schema(tags=['Restaurantes'])
+class RestaurantAvailabilityApiView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = [CachedTokenAuthentication]
+
+    @extend_schema(
+        summary="Disponibilidad de mesas",
+        description="Obtiene los horarios con mesas disponibles de un restaurante para una fecha y cantidad de "
+                    "personas.",
+        parameters=[
+            OpenApiParameter('date', str, description='Fecha de la reservacion (YYYY-MM-DD)', required=True),
+            OpenApiParameter('party_size', int, description='Cantidad de personas', required=True),
+            OpenApiParameter('duration', int, description='Duracion de la reservacion en minutos'),
+        ],
+        responses={200: AvailabilitySerializer}
+    )
+    def get(self, request, restaurant_id):
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        date = query.validated_data['date']
+        party_size = query.validated_data['party_size']
+        duration = query.validated_data['duration']
+
+        index = get_index(restaurant_id, date)
+        if index is None:
+            return Response({'error': "Restaurant does not exist"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = AvailabilitySerializer({
+            'restaurant_id': index.restaurant_id,
+            'restaurant_name': index.restaurant_name,
+            'date': date,
+            'party_size': party_size,
+            'duration': duration,
+            'slots': index.slots(party_size, duration)
+        })
+        return Response(serializer.data)
+
+
+@extend_schema(tags=['Restaurantes'])
+class RestaurantOccupancyApiView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedTokenAuthentication]
+
+    @extend_schema(
+        summary="Ocupacion del restaurante",
+        description="Reservaciones, comensales, cancelaciones y mesas asignadas de un restaurante por fecha, hora, "
+                    "dia de la semana y cantidad de personas, leidas de la tabla de ocupacion por hora.",
+        parameters=[
+            OpenApiParameter('month', str, description='Mes (YYYY-MM)'),
+            OpenApiParameter('date_from', str, description='Fecha inicial (YYYY-MM-DD), en lugar de month'),
+            OpenApiParameter('date_to', str, description='Fecha final (YYYY-MM-DD), en lugar de month'),
+        ],
+        responses={200: OccupancySerializer}
+    )
+    def get(self, request, restaurant_id):
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        date_from, date_to = query.validated_data['date_from'], query.validated_data['date_to']
+        get_object_or_404(Restaurant.objects.only('id'), pk=restaurant_id)
+
+        serializer = OccupancySerializer({
+            'restaurant_id': restaurant_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            **occupancy(restaurant_id, date_from, date_to)
+        })
+        return Response(serializer.data)
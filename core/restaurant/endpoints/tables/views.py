@@ -1,29 +1,36 @@
 import json
 
-from django.shortcuts import get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, aget_object_or_404
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.filters import SearchFilter
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.async_views import AsyncAPIView
+from core.customers.authentication import CachedTokenAuthentication
+from core.fastpath import FastListMixin
+from core.restaurant.bulk import bulk_create_tables
 from core.restaurant.models import Table, Restaurant
 from core.restaurant.serializers import TableSerializer, TableSummarySerializer
+from core.restaurant.stream import table_events
 from core.utilis import *
 
 
 @extend_schema(tags=['Mesas'])
-class TableListCreateView(ListCreateAPIView):
-    queryset = Table.objects.all().order_by('id')
+class TableListCreateView(FastListMixin, ListCreateAPIView):
+    queryset = Table.objects.select_related('restaurant').order_by('id')
     serializer_class = TableSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     search_fields = ['capacity', 'location', 'status']
     filter_backends = [SearchFilter]
-    pagination_class = LargeResultsSetPagination
+    pagination_class = LargeKeysetPagination
+    keyset_ordering = ('id',)
 
     @extend_schema(
         summary="Listar Mesas",
@@ -34,11 +41,14 @@ class TableListCreateView(ListCreateAPIView):
 
     @extend_schema(
         summary="Crear Mesas",
-        description="Crea una nueva mesa o varias mesa si se proporciona una lista",
+        description="Crea una nueva mesa o varias mesas si se proporciona una lista. En una lista, las filas "
+                    "validas se crean en lote y las invalidas se reportan con su indice en 'errors'.",
     )
     def post(self, request, *args, **kwargs):
-        is_many = isinstance(request.data, list)
-        serializer = self.get_serializer(data=request.data, many=is_many)
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+
+        serializer = self.get_serializer(data=request.data)
 
         if not serializer.is_valid():
 
@@ -60,13 +70,25 @@ class TableListCreateView(ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save()
 
+    def bulk_create(self, request):
+        tables, errors = bulk_create_tables(request.data)
+        data = {
+            'created': self.get_serializer(tables, many=True).data,
+            'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+        }
+        if not tables:
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        if errors:
+            return Response(data, status=status.HTTP_207_MULTI_STATUS)
+        return Response(data, status=status.HTTP_201_CREATED)
+
 
 @extend_schema(tags=['Mesas'])
 class TableByRestaurant(GenericAPIView):
     serializer_class = TableSerializer
-    queryset = Table.objects.all()
+    queryset = Table.objects.select_related('restaurant')
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     @extend_schema(
         summary="Obtener una Mesa por restaurante",
@@ -84,10 +106,10 @@ class TableByRestaurant(GenericAPIView):
 
     def get(self, request, pk):
         restaurant = get_object_or_404(Restaurant, pk=pk)
-        tables = self.get_queryset().filter(restaurant=restaurant)
+        tables = list(self.get_queryset().filter(restaurant=restaurant))
         serializer = self.get_serializer(tables, many=True)
         data = {
-            'total_tables': tables.count(),
+            'total_tables': len(tables),
             "tables": serializer.data
         }
         return Response(data)
@@ -95,10 +117,10 @@ class TableByRestaurant(GenericAPIView):
 
 @extend_schema(tags=['Mesas'])
 class TableRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
-    queryset = Table.objects.all()
+    queryset = Table.objects.select_related('restaurant')
     serializer_class = TableSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     @extend_schema(
         summary="Obtener una Mesa",
@@ -140,7 +162,7 @@ class TableRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
 @extend_schema(tags=['Mesas'])
 class TableSummaryApiView(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     @extend_schema(
         summary="Resumen de Mesas",
@@ -148,21 +170,68 @@ class TableSummaryApiView(APIView):
         responses={200: TableSummarySerializer}
     )
     def get(self, request, restaurant_id):
-        try:
-            restaurant = Restaurant.objects.get(id=restaurant_id)
-        except Restaurant.DoesNotExist:
+        summary = Table.get_restaurant_summary(restaurant_id)
+        if summary is None:
             return Response({'error': "Restaurant does not exist"}, status=status.HTTP_404_NOT_FOUND)
 
-        table_summary = Table.get_summary(restaurant_id)
-
         data = {
             'restaurant_id': restaurant_id,
-            'restaurant_name': restaurant.name,
-            'summary': table_summary
+            'restaurant_name': summary.pop('restaurant_name'),
+            'summary': summary
         }
 
-        serializer = TableSummarySerializer(data=data)
-        if serializer.is_valid():
-            return Response(serializer.data)
-        else:
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer = TableSummarySerializer(data)
+        return Response(serializer.data)
+
+
+class AsyncTableByRestaurant(AsyncAPIView):
+    """Async mirror of ``TableByRestaurant``. ``pk`` is the restaurant."""
+    queryset = Restaurant.objects.all()
+
+    async def get(self, request, pk):
+        restaurant = await aget_object_or_404(self.queryset, pk=pk)
+        tables = [table async for table in Table.objects.select_related('restaurant').filter(restaurant=restaurant)]
+        return self.response({
+            'total_tables': len(tables),
+            'tables': TableSerializer(tables, many=True).data
+        })
+
+
+class AsyncTableSummaryView(AsyncAPIView):
+    """Async mirror of ``TableSummaryApiView``."""
+
+    async def get(self, request, restaurant_id):
+        summary = await Table.aget_restaurant_summary(restaurant_id)
+        if summary is None:
+            return self.response({'error': "Restaurant does not exist"}, status=status.HTTP_404_NOT_FOUND)
+
+        data = {
+            'restaurant_id': restaurant_id,
+            'restaurant_name': summary.pop('restaurant_name'),
+            'summary': summary
+        }
+        return self.response(TableSummarySerializer(data).data)
+
+
+class TableStreamView(AsyncAPIView):
+    """
+    Server-Sent Events of the table changes of a restaurant: a ``snapshot``
+    of its tables, then ``table`` and ``table-deleted`` events. Resumes after
+    the ``Last-Event-ID`` header (or ``last_event_id`` parameter). The stream
+    stays open under ASGI; under WSGI it ends after the pending events and
+    the client reconnects, which still spares the polling queries.
+    """
+
+    async def get(self, request, restaurant_id):
+        if not await Restaurant.objects.filter(pk=restaurant_id).aexists():
+            raise Http404("Restaurant does not exist")
+        last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+        follow = isinstance(request._request, ASGIRequest)
+        events = table_events(restaurant_id, last_event_id, follow=follow)
+        if not follow:
+            # WSGI servers can only iterate synchronously over the content.
+            events = [chunk async for chunk in events]
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,160 @@
+import json
+import re
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, URLPattern, URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.customers.models import CustomerUser
+from core.reservations.models import Reservation
+from core.restaurant.models import Restaurant, Table
+from core.seeding import seeded_test_database, SEED_START_DATE
+
+SKIPPED_PREFIXES = ('admin/',)
+IDS_BY_MODEL = {Restaurant: 'restaurants', Table: 'tables', Reservation: 'reservations', CustomerUser: 'customers'}
+IDS_BY_KWARG = {'restaurant_id': 'restaurants', 'customer_id': 'customers'}
+QUERY_STRINGS = {
+    'restaurant-availability': f'?date={SEED_START_DATE}&party_size=2',
+    'reservation-status': '?status=confirmed',
+    'restaurant-occupancy': f'?month={SEED_START_DATE:%Y-%m}',
+}
+
+
+def iter_routes(patterns, prefix=''):
+    """Yield ``(route, pattern)`` for every path() route, with its full prefix."""
+    for pattern in patterns:
+        if not isinstance(pattern.pattern, RoutePattern):
+            continue
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route, pattern
+
+
+def view_model(pattern):
+    queryset = getattr(getattr(pattern.callback, 'view_class', None), 'queryset', None)
+    return queryset.model if queryset is not None else None
+
+
+def build_path(route, pattern, ids):
+    """
+    Fill the converters of ``route`` with seeded ids: ``restaurant_id`` and
+    ``customer_id`` by name and ``pk`` from the model of the view queryset.
+    Returns None when a converter can not be filled.
+    """
+    def fill(match):
+        name = match[2]
+        key = IDS_BY_KWARG.get(name) or (IDS_BY_MODEL.get(view_model(pattern)) if name == 'pk' else None)
+        if key is None:
+            raise LookupError(name)
+        return str(ids[key][0])
+
+    try:
+        path = '/' + re.sub(r'<(?:(\w+):)?(\w+)>', fill, route)
+    except LookupError:
+        return None
+    return path + QUERY_STRINGS.get(pattern.name, '')
+
+
+def percentile(quantiles, n):
+    return round(quantiles[n - 1] * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = ('Pobla una base de datos de prueba y mide cada ruta GET de la API: latencia p50/p95/p99, consultas por '
+            'peticion y memoria pico. Escribe los resultados en un archivo JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=50)
+        parser.add_argument('--tables', type=int, default=20, help='Mesas por restaurante.')
+        parser.add_argument('--reservations', type=int, default=20000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=100, help='Peticiones medidas por ruta.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--cold', action='store_true', help='Limpia la cache antes de cada peticion.')
+        parser.add_argument('--output', default='bench.json')
+
+    def handle(self, *args, **options):
+        sizes = {size: options[size] for size in ('restaurants', 'tables', 'reservations', 'customers')}
+        started_at = timezone.now()
+
+        with seeded_test_database(**sizes) as ids:
+            client = APIClient()
+            client.force_authenticate(CustomerUser.objects.create(username='bench', is_staff=True, is_superuser=True))
+            results = []
+            for route, pattern in iter_routes(get_resolver().url_patterns):
+                if route.startswith(SKIPPED_PREFIXES):
+                    continue
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if view_class is not None and not hasattr(view_class, 'get'):
+                    continue
+                path = build_path(route, pattern, ids)
+                if path is None:
+                    self.stderr.write(f'skipped {route}: no seeded id for its parameters')
+                    continue
+                results.append(self.measure(client, route, path, options))
+
+        report = {
+            'started_at': started_at.isoformat(),
+            'database': connection.vendor,
+            'seed': sizes,
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'routes': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def request(self, client, path, cold):
+        if cold:
+            cache.clear()
+        return client.get(path)
+
+    def measure(self, client, route, path, options):
+        for _ in range(options['warmup']):
+            self.request(client, path, options['cold'])
+
+        timings = []
+        queries = []
+        for _ in range(options['requests']):
+            # The log keeps the last 9000 queries: once full, a capture would count none.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = self.request(client, path, options['cold'])
+                timings.append(time.perf_counter() - start)
+            queries.append(len(context.captured_queries))
+
+        # Measured apart, as tracing allocations slows every request down.
+        tracemalloc.start()
+        self.request(client, path, options['cold'])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        quantiles = statistics.quantiles(timings, n=100, method='inclusive')
+        result = {
+            'route': route,
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': percentile(quantiles, 50),
+            'p95_ms': percentile(quantiles, 95),
+            'p99_ms': percentile(quantiles, 99),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+            'queries': round(statistics.fmean(queries), 2),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+        self.stdout.write(
+            f'{path:<70} {result["status"]} p50={result["p50_ms"]:.2f}ms p95={result["p95_ms"]:.2f}ms '
+            f'p99={result["p99_ms"]:.2f}ms queries={result["queries"]:g} peak={result["peak_memory_kb"]:.0f}KB'
+        )
+        return result
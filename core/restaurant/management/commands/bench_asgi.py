@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.customers.models import CustomerUser
+from core.seeding import seeded_test_database
+
+# Sync route and its async mirror, filled with the seeded ids.
+ROUTES = (
+    'restaurant/{restaurant}/',
+    'restaurant/{restaurant}/reservation-summary/',
+    'table/{restaurant}/restaurant/',
+    'table/{restaurant}/table-summary/',
+    'reservations/',
+    'users/customers/{customer}/reservations/',
+)
+
+
+class Command(BaseCommand):
+    help = ('Pobla una base de datos de prueba y compara el rendimiento (peticiones por segundo) de las rutas de '
+            'lectura sincronas, servidas por WSGI en un pool de hilos, con sus espejos asincronos en /api/async/, '
+            'servidos por ASGI con el mismo numero de peticiones concurrentes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=50)
+        parser.add_argument('--tables', type=int, default=20, help='Mesas por restaurante.')
+        parser.add_argument('--reservations', type=int, default=20000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=64, help='Peticiones simultaneas.')
+        parser.add_argument('--requests', type=int, default=500, help='Peticiones medidas por ruta.')
+        parser.add_argument('--output', default='bench_asgi.json')
+
+    def handle(self, *args, **options):
+        sizes = {size: options[size] for size in ('restaurants', 'tables', 'reservations', 'customers')}
+        started_at = timezone.now()
+
+        with seeded_test_database(**sizes) as ids:
+            user = CustomerUser.objects.create(username='bench', is_staff=True, is_superuser=True)
+            headers = {'Authorization': f'Token {Token.objects.get_or_create(user=user)[0].key}'}
+            results = []
+            for route in ROUTES:
+                path = route.format(restaurant=ids['restaurants'][0], customer=ids['customers'][0])
+                wsgi = self.measure_wsgi(f'/api/{path}', headers, options)
+                asgi = asyncio.run(self.measure_asgi(f'/api/async/{path}', headers, options))
+                result = {
+                    'route': path,
+                    'wsgi': wsgi,
+                    'asgi': asgi,
+                    'asgi_wsgi_ratio': round(asgi['requests_per_second'] / wsgi['requests_per_second'], 2),
+                }
+                results.append(result)
+                self.stdout.write(
+                    f'{path:<50} wsgi={wsgi["requests_per_second"]:.0f}/s asgi={asgi["requests_per_second"]:.0f}/s '
+                    f'ratio={result["asgi_wsgi_ratio"]:.2f}'
+                )
+
+        report = {
+            'started_at': started_at.isoformat(),
+            'database': connection.vendor,
+            'seed': sizes,
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'routes': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def measure_wsgi(self, path, headers, options):
+        def request(_):
+            client = Client(headers=headers)
+            try:
+                return client.get(path).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            start = time.perf_counter()
+            statuses = list(executor.map(request, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+        return summary(statuses, elapsed)
+
+    async def measure_asgi(self, path, headers, options):
+        # AsyncClient puts its default headers in the scope instead of the request headers.
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with semaphore:
+                return (await client.get(path, headers=headers)).status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - start
+        return summary(statuses, elapsed)
+
+
+def summary(statuses, elapsed):
+    return {
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(statuses) / elapsed, 1),
+        'errors': sum(status >= 400 for status in statuses),
+    }
@@ -0,0 +1,88 @@
+import json
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.customers.models import CustomerUser
+from core.reservations.views import ReservationListAPIView
+from core.restaurant.endpoints.tables.views import TableListCreateView
+from core.seeding import seeded_test_database
+
+VIEWS = (
+    ('table/', TableListCreateView),
+    ('reservations/', ReservationListAPIView),
+)
+
+
+class Command(BaseCommand):
+    help = ('Pobla una base de datos de prueba y compara las filas por segundo de los listados de mesas y '
+            'reservaciones servidos con el serializador de DRF y con la ruta rapida (.values(), transformacion '
+            'precompilada y JSON por partes).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=50)
+        parser.add_argument('--tables', type=int, default=20, help='Mesas por restaurante.')
+        parser.add_argument('--reservations', type=int, default=20000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=50, help='Peticiones medidas por ruta y modo.')
+        parser.add_argument('--output', default='bench_fastpath.json')
+
+    def handle(self, *args, **options):
+        sizes = {size: options[size] for size in ('restaurants', 'tables', 'reservations', 'customers')}
+        started_at = timezone.now()
+
+        with seeded_test_database(**sizes):
+            user = CustomerUser.objects.create(username='bench', is_staff=True, is_superuser=True)
+            client = Client(headers={'Authorization': f'Token {Token.objects.get_or_create(user=user)[0].key}'})
+            results = []
+            for route, view in VIEWS:
+                path = f'/api/{route}?page_size={options["page_size"]}'
+                with mock.patch.object(view, 'fast_path', False):
+                    serializer = self.measure(client, path, options['requests'])
+                fast = self.measure(client, path, options['requests'])
+                result = {
+                    'route': route,
+                    'serializer': serializer,
+                    'fast_path': fast,
+                    'speedup': round(fast['rows_per_second'] / serializer['rows_per_second'], 2),
+                }
+                results.append(result)
+                self.stdout.write(
+                    f'{route:<16} serializer={serializer["rows_per_second"]:.0f} rows/s '
+                    f'fast_path={fast["rows_per_second"]:.0f} rows/s speedup={result["speedup"]:.2f}x'
+                )
+
+        report = {
+            'started_at': started_at.isoformat(),
+            'database': connection.vendor,
+            'seed': sizes,
+            'page_size': options['page_size'],
+            'requests': options['requests'],
+            'routes': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def measure(self, client, path, requests):
+        # One warm up request, then the whole body of each response is read.
+        client.get(path)
+        rows, size = 0, 0
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(path)
+            content = b''.join(response) if response.streaming else response.content
+            rows += len(json.loads(content)['results'])
+            size += len(content)
+        elapsed = time.perf_counter() - start
+        return {
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed, 1),
+            'bytes_per_response': size // requests,
+        }
@@ -0,0 +1,172 @@
+import datetime
+import re
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.customers.models import CustomerUser
+from core.reservations.models import OccupancyRollup, Reservation
+from core.restaurant.models import Restaurant, Table
+from core.seeding import seeded_test_database, SEED_START_DATE
+
+
+def explain_sqlite(cursor, sql):
+    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+    lines = [row[-1] for row in cursor.fetchall()]
+    problems = []
+    for line in lines:
+        if line.startswith('SCAN ') and not line.startswith('SCAN CONSTANT ROW') and 'VIRTUAL TABLE' not in line:
+            problems.append(('full scan', line.split()[1]))
+        elif line.startswith('USE TEMP B-TREE'):
+            problems.append((TEMP_SORT, None))
+    return lines, problems
+
+
+def explain_postgresql(cursor, sql):
+    # With sequential scans and sorts disabled the planner only falls back to
+    # them when no index can serve the query, whatever the size of the tables.
+    with transaction.atomic():
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute(f'EXPLAIN {sql}')
+        lines = [row[0] for row in cursor.fetchall()]
+    problems = []
+    for line in lines:
+        if match := re.search(r'Seq Scan on "?(\w+)"?', line):
+            problems.append(('full scan', match[1]))
+        elif re.search(r'\bSort\s+\(', line):
+            problems.append((TEMP_SORT, None))
+    return lines, problems
+
+
+def explain_mysql(cursor, sql):
+    cursor.execute(f'EXPLAIN {sql}')
+    columns = [column[0].lower() for column in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    lines = [f"{row['table']}: type={row['type']} key={row['key']} extra={row['extra']}" for row in rows]
+    problems = []
+    for row in rows:
+        if row['type'] in ('ALL', 'index'):
+            problems.append(('full scan', row['table']))
+        if row['extra'] and ('Using filesort' in row['extra'] or 'Using temporary' in row['extra']):
+            problems.append((TEMP_SORT, None))
+    return lines, problems
+
+
+TEMP_SORT = 'temp sort'
+
+EXPLAIN = {
+    'sqlite': explain_sqlite,
+    'postgresql': explain_postgresql,
+    'mysql': explain_mysql,
+}
+
+
+def probes(ids):
+    """
+    ``(name, path, allowances)`` for every endpoint. Allowances are models
+    whose table may be scanned, or ``TEMP_SORT``. Only unfiltered lists may
+    scan, as they walk the primary key under a LIMIT.
+    """
+    restaurant, customer = ids['restaurants'][0], ids['customers'][0]
+    table, reservation = ids['tables'][0], ids['reservations'][0]
+    return [
+        ('restaurant list', '/api/restaurant/', {Restaurant}),
+        # The SEARCH_LIMIT best matches come from the full-text index, then
+        # are put back in rank order.
+        ('restaurant search', f'/api/restaurant/?search=seed rest {ids["restaurants"][-1]}', {TEMP_SORT}),
+        ('restaurant detail', f'/api/restaurant/{restaurant}/', ()),
+        ('reservations by restaurant', f'/api/restaurant/{restaurant}/reservation-summary/', ()),
+        ('availability', f'/api/restaurant/{restaurant}/availability/?date={SEED_START_DATE}&party_size=2', ()),
+        ('occupancy', f'/api/restaurant/{restaurant}/occupancy/?month={SEED_START_DATE:%Y-%m}', ()),
+        ('table list', '/api/table/', {Table}),
+        ('tables by restaurant', f'/api/table/{restaurant}/restaurant/', ()),
+        ('table summary', f'/api/table/{restaurant}/table-summary/', ()),
+        ('table detail', f'/api/table/{table}/', ()),
+        ('reservation list', '/api/reservations/', {Reservation}),
+        ('reservation detail', f'/api/reservations/{reservation}/', ()),
+        ('reservations by status', '/api/reservations/status/?status=confirmed', ()),
+        ('reservations by restaurant and dates',
+         f'/api/reservations/status/?restaurant={restaurant}&date_from={SEED_START_DATE}'
+         f'&date_to={SEED_START_DATE + datetime.timedelta(days=6)}', ()),
+        ('reservations by customer and dates', f'/api/reservations/status/?customer={customer}'
+         f'&date_from={SEED_START_DATE}', ()),
+        ('reservations by customer', f'/api/users/customers/{customer}/reservations/', ()),
+        # Grouped by restaurant and status over the rows of one customer only.
+        ('customer summary', f'/api/users/customers/{customer}/customer-summary/', {TEMP_SORT}),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Ejecuta EXPLAIN sobre las consultas de cada endpoint en una base de datos de prueba poblada y falla '
+            'si aparece un recorrido completo de tabla o un ordenamiento temporal.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=50)
+        parser.add_argument('--tables', type=int, default=20, help='Mesas por restaurante.')
+        parser.add_argument('--reservations', type=int, default=20000)
+        parser.add_argument('--customers', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if connection.vendor not in EXPLAIN:
+            raise CommandError(f'EXPLAIN is not supported for {connection.vendor}.')
+
+        sizes = {size: options[size] for size in ('restaurants', 'tables', 'reservations', 'customers')}
+        with seeded_test_database(**sizes) as ids:
+            self.analyze()
+            failures = self.explain_probes(ids, options['verbosity'])
+
+        if failures:
+            raise CommandError(f'{failures} endpoints have queries with a full table scan or a temp sort.')
+        self.stdout.write(self.style.SUCCESS('Every endpoint query is served by an index.'))
+
+    def analyze(self):
+        tables = [model._meta.db_table for model in (Restaurant, Table, Reservation, CustomerUser, OccupancyRollup)]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f'ANALYZE TABLE {", ".join(map(connection.ops.quote_name, tables))}')
+            else:
+                cursor.execute('ANALYZE')
+
+    def explain_probes(self, ids, verbosity):
+        client = APIClient()
+        client.force_authenticate(CustomerUser.objects.get(pk=ids['customers'][0]))
+        explain = EXPLAIN[connection.vendor]
+
+        failures = 0
+        for name, path, allowed in probes(ids):
+            allowed = {item if item == TEMP_SORT else item._meta.db_table for item in allowed}
+            cache.clear()
+            # The log keeps the last 9000 queries: once full, a capture would count none.
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(path)
+            # A 404 is an empty result on a sparse seed: its queries still ran.
+            if response.status_code not in (200, 404):
+                raise CommandError(f'{name}: {path} returned {response.status_code}.')
+
+            problems = []
+            with connection.cursor() as cursor:
+                for query in context.captured_queries:
+                    if not query['sql'].lstrip().upper().startswith('SELECT'):
+                        continue
+                    lines, found = explain(cursor, query['sql'])
+                    found = [(kind, table) for kind, table in found
+                             if not (kind == TEMP_SORT and TEMP_SORT in allowed or table in allowed)]
+                    if found:
+                        problems.append((query['sql'], lines, found))
+                    elif verbosity > 1:
+                        self.stdout.write(f'  {query["sql"]}\n    ' + '\n    '.join(lines))
+
+            if not problems:
+                self.stdout.write(f'{name}: {len(context.captured_queries)} queries ok')
+                continue
+            failures += 1
+            self.stdout.write(self.style.ERROR(f'{name}: {path}'))
+            for sql, lines, found in problems:
+                kinds = ', '.join(f'{kind} of {table}' if table else kind for kind, table in found)
+                self.stdout.write(f'  {kinds}\n  {sql}\n    ' + '\n    '.join(lines))
+        return failures
@@ -0,0 +1,36 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.restaurant.onboarding import Onboarding, ONBOARDING_BATCH_SIZE, ONBOARDING_WORKERS, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Registra restaurantes en lote desde un archivo CSV o JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Formato del archivo. Por defecto se deduce de la extension.')
+        parser.add_argument('--workers', type=int, default=ONBOARDING_WORKERS)
+        parser.add_argument('--batch-size', type=int, default=ONBOARDING_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl')
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist.')
+
+        start = time.perf_counter()
+        with open(path, encoding='utf-8-sig', newline='') as stream, \
+                Onboarding(workers=options['workers'], batch_size=options['batch_size']) as onboarding:
+            onboarding.run(read_rows(stream, format))
+        elapsed = time.perf_counter() - start
+
+        for index in sorted(onboarding.errors):
+            self.stderr.write(f'row {index}: {json.dumps(onboarding.errors[index], ensure_ascii=False)}')
+        self.stdout.write(f'created: {len(onboarding.created)}')
+        self.stdout.write(f'errors: {len(onboarding.errors)}')
+        self.stdout.write(f'elapsed: {elapsed:.3f}s ({len(onboarding.created) / elapsed:.1f} restaurants/s)')
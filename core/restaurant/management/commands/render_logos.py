@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.restaurant.models import Restaurant
+from core.restaurant.renditions import needs_renditions, render_logo
+
+
+class Command(BaseCommand):
+    help = ('Genera las versiones WebP y JPEG de los logos que aun no las tienen o cuyo logo cambio, para todos los '
+            'restaurantes o los indicados. Con --force las regenera todas.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurants',
+                            help='Restaurante a procesar. Se puede repetir; por defecto todos.')
+        parser.add_argument('--force', action='store_true', help='Regenera tambien los logos al dia.')
+
+    def handle(self, *args, **options):
+        restaurants = Restaurant.objects.exclude(logo='').exclude(logo__isnull=True).only('id', 'logo', 'logo_variants')
+        if options['restaurants']:
+            restaurants = restaurants.filter(pk__in=options['restaurants'])
+        start, rendered = time.perf_counter(), 0
+        for restaurant in restaurants.order_by('id').iterator():
+            if options['force'] or needs_renditions(restaurant):
+                rendered += render_logo(restaurant.pk) is not None
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'{rendered} logos rendered in {elapsed:.2f}s'))
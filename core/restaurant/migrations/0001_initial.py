@@ -0,0 +1,59 @@
+# Generated by Django 5.1 on 2026-10-18 14:34
+
+import core.restaurant.models
+import datetime
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Restaurant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rnc', models.CharField(error_messages={'unique': 'Este RNC ya existe, por favor ingrese otro.'}, help_text='This fields is for the rnc of restaurant', max_length=15, unique=True, validators=[core.restaurant.models.validate_rnc], verbose_name='RNC')),
+                ('logo', models.ImageField(blank=True, null=True, upload_to='restaurant/%Y/%m/%d', verbose_name='Logo del restaurante')),
+                ('name', models.CharField(help_text='This is for name of restaurants', max_length=255, verbose_name='Nombre restaurant')),
+                ('address', models.CharField(help_text='This is for address of restaurants', max_length=255, verbose_name='Direccion restaurant')),
+                ('phone', models.CharField(help_text='This is for number of restaurants', max_length=20, unique=True, validators=[django.core.validators.RegexValidator('^\\+?1?\\d{9,10}$', message="El número de teléfono debe estar en el formato: '+999999999'. Se permiten hasta 10 dígitos.")], verbose_name='Numero del restaurant')),
+                ('email', models.EmailField(max_length=255, unique=True, validators=[django.core.validators.EmailValidator(message='Ingrese una dirección de email válida.')], verbose_name='Email del restaurants')),
+                ('capacity', models.PositiveIntegerField(help_text='Capacidad total del restaurante', verbose_name='Capacidad')),
+                ('opening_time', models.TimeField(default=datetime.time(0, 0), verbose_name='Hora de apertura')),
+                ('closing_time', models.TimeField(default=datetime.time(0, 0), verbose_name='Hora de cierre')),
+                ('status', models.CharField(choices=[('active', 'Activo'), ('inactive', 'Inactivo'), ('renovating', 'En Renovación')], default='active', max_length=20, verbose_name='Estado')),
+                ('create_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('update_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de modificacion')),
+            ],
+            options={
+                'verbose_name': 'Restaurante',
+                'verbose_name_plural': 'Restaurantes',
+                'db_table': 'restaurant',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Table',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Número de mesa')),
+                ('capacity', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Cantidad de asientos')),
+                ('location', models.CharField(blank=True, max_length=255, null=True, verbose_name='Ubicación')),
+                ('status', models.CharField(choices=[('O', 'Ocupada'), ('F', 'Libre'), ('U', 'Sin pagar')], default='F', max_length=1, verbose_name='Estado')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tables', to='restaurant.restaurant', verbose_name='Restaurante')),
+            ],
+            options={
+                'verbose_name': 'Mesa',
+                'verbose_name_plural': 'Mesas',
+                'db_table': 'Mesas',
+                'ordering': ['number'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 14:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableSummary',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='table_summary', serialize=False, to='restaurant.restaurant', verbose_name='Restaurante')),
+                ('total_tables', models.IntegerField(default=0)),
+                ('occupied_tables', models.IntegerField(default=0)),
+                ('free_tables', models.IntegerField(default=0)),
+                ('unpaid_tables', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen de mesas',
+                'verbose_name_plural': 'Resumenes de mesas',
+                'db_table': 'mesas_resumen',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0002_table_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='table',
+            index=models.Index(fields=['restaurant', 'number'], name='table_restaurant_number'),
+        ),
+        migrations.AddIndex(
+            model_name='table',
+            index=models.Index(fields=['restaurant', 'status', 'capacity', 'number'], name='table_restaurant_status'),
+        ),
+        migrations.AlterField(
+            model_name='table',
+            name='restaurant',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tables', to='restaurant.restaurant', verbose_name='Restaurante'),
+        ),
+    ]
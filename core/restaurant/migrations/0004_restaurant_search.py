@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# The full-text index as core.restaurant.search built it when this migration
+# was written, so later changes to that module do not change its history.
+CREATE_SEARCH_INDEX = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE restaurant_search USING fts5(name, rnc, email, phone, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+        "INSERT INTO restaurant_search(restaurant_search, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0, 2.0)')",
+        "INSERT INTO restaurant_search(rowid, name, rnc, email, phone) "
+        "SELECT id, name, rnc, email, phone FROM restaurant",
+    ],
+    'postgresql': [
+        "CREATE TABLE restaurant_search ("
+        "restaurant_id bigint PRIMARY KEY REFERENCES restaurant (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX restaurant_search_document ON restaurant_search USING gin (document)",
+        "INSERT INTO restaurant_search (restaurant_id, document) "
+        "SELECT id, setweight(to_tsvector('simple', name), 'A') || "
+        "setweight(to_tsvector('simple', concat_ws(' ', rnc, email, phone)), 'B') FROM restaurant",
+    ],
+}
+DROP_SEARCH_INDEX = 'DROP TABLE IF EXISTS restaurant_search'
+
+
+def create_search_index(apps, schema_editor):
+    for statement in CREATE_SEARCH_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SEARCH_INDEX:
+        schema_editor.execute(DROP_SEARCH_INDEX, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0003_table_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
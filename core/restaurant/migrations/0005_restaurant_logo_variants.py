@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0004_restaurant_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Archivos WebP y JPEG del logo por tamaño, generados por core.restaurant.renditions', verbose_name='Versiones reducidas del logo'),
+        ),
+    ]
@@ -1,6 +1,11 @@
 import datetime
 from typing import Iterable
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, EmailValidator
 from django.forms import model_to_dict
@@ -8,6 +13,7 @@ from config.settings import MEDIA_URL, STATIC_URL
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
+from core.restaurant.signals import tables_bulk_created
 
 
 def validate_rnc(value):
@@ -38,6 +44,13 @@ class Restaurant(models.Model):
         blank=True,
         verbose_name='Logo del restaurante'
     )
+    logo_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Versiones reducidas del logo',
+        help_text="Archivos WebP y JPEG del logo por tamaño, generados por core.restaurant.renditions",
+    )
     name = models.CharField(
         max_length=255,
         verbose_name='Nombre restaurant',
@@ -98,6 +111,15 @@ class Restaurant(models.Model):
             return f'{MEDIA_URL}{self.logo}'
         return f'{STATIC_URL}img/img.png'
 
+    def get_logo_variants(self):
+        """``{format: {size: url}}`` of the renditions of the current logo."""
+        if not self.logo or self.logo_variants.get('source') != self.logo.name:
+            return {}
+        return {
+            image_format: {size: f'{MEDIA_URL}{name}' for size, name in sizes.items()}
+            for image_format, sizes in self.logo_variants.items() if image_format != 'source'
+        }
+
     def is_open(self):
         now = timezone.localtime().time()
         return self.opening_time <= now <= self.closing_time
@@ -137,7 +159,8 @@ class Table(models.Model):
         'Restaurant',
         on_delete=models.CASCADE,
         verbose_name=_('Restaurante'),
-        related_name='tables'
+        related_name='tables',
+        db_index=False
     )
     number = models.PositiveIntegerField(
         verbose_name=_('Número de mesa'),
@@ -165,21 +188,211 @@ class Table(models.Model):
         verbose_name_plural = _('Mesas')
         ordering = ['number']
         db_table = _('Mesas')
+        indexes = [
+            models.Index(fields=['restaurant', 'number'], name='table_restaurant_number'),
+            models.Index(fields=['restaurant', 'status', 'capacity', 'number'], name='table_restaurant_status'),
+        ]
 
     def __str__(self):
         return f"{self.restaurant.name} - Mesa {self.number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_restaurant_id = instance.__dict__.get('restaurant_id')
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_restaurant_id = self.restaurant_id
+        self._loaded_status = self.status
+
+    def save(self, *args, **kwargs):
+        """
+        With counters enabled, the loaded status is first swapped for the new
+        one by an UPDATE guarded on the loaded status, so the ``TableSummary``
+        delta from that status is exact. When another writer changed it first
+        the row is saved anyway and ``_status_conflict`` tells the receiver to
+        rebuild the counters.
+        """
+        self._status_conflict = False
+        previous_status = getattr(self, '_loaded_status', None)
+        update_fields = kwargs.get('update_fields')
+        if (not settings.TABLE_SUMMARY_COUNTERS or previous_status is None or self._state.adding
+                or (update_fields is not None and 'status' not in update_fields)):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            self._status_conflict = not Table.objects.filter(pk=self.pk, status=previous_status).update(
+                status=self.status
+            )
+            return super().save(*args, **kwargs)
+
+    @classmethod
+    def summary_aggregates(cls, prefix=''):
+        return {
+            'total_tables': Count(f'{prefix}id'),
+            'occupied_tables': Count(f'{prefix}id', filter=Q(**{f'{prefix}status': cls.Status.OCCUPIED})),
+            'free_tables': Count(f'{prefix}id', filter=Q(**{f'{prefix}status': cls.Status.FREE})),
+            'unpaid_tables': Count(f'{prefix}id', filter=Q(**{f'{prefix}status': cls.Status.UNPAID})),
+        }
+
     @classmethod
     def get_summary(cls, restaurant_id):
-        tables = cls.objects.filter(restaurant_id=restaurant_id)
-        total_tables = tables.count()
-        occupied_tables = tables.filter(status=cls.Status.OCCUPIED).count()
-        free_tables = tables.filter(status=cls.Status.FREE).count()
-        unpaid_tables = tables.filter(status=cls.Status.UNPAID).count()
+        summary = cls.get_restaurant_summary(restaurant_id)
+        if summary is None:
+            return dict.fromkeys(TableSummary.FIELDS, 0)
+        summary.pop('restaurant_name')
+        return summary
+
+    @classmethod
+    def _counters_query(cls, restaurant_id):
+        return TableSummary.objects.filter(restaurant_id=restaurant_id).values('restaurant__name', *TableSummary.FIELDS)
+
+    @classmethod
+    def _aggregate_query(cls, restaurant_id):
+        # Sliced rather than first(), which would ORDER BY the grouped rows.
+        return Restaurant.objects.filter(pk=restaurant_id).order_by().annotate(
+            **cls.summary_aggregates('tables__')
+        ).values('name', *TableSummary.FIELDS)[:1]
+
+    @classmethod
+    def get_restaurant_summary(cls, restaurant_id):
+        """
+        Restaurant name and table counters in a single query. Reads the
+        ``TableSummary`` row when counters are enabled and rebuilds it when it
+        is missing. Returns None when the restaurant does not exist.
+        """
+        if not settings.TABLE_SUMMARY_COUNTERS:
+            summary = next(iter(cls._aggregate_query(restaurant_id)), None)
+            if summary is not None:
+                summary['restaurant_name'] = summary.pop('name')
+            return summary
+
+        summary = cls._counters_query(restaurant_id).first()
+        if summary is None and Restaurant.objects.filter(pk=restaurant_id).exists():
+            TableSummary.rebuild(restaurant_id)
+            summary = cls._counters_query(restaurant_id).first()
+        if summary is not None:
+            summary['restaurant_name'] = summary.pop('restaurant__name')
+        return summary
+
+    @classmethod
+    async def aget_restaurant_summary(cls, restaurant_id):
+        """``get_restaurant_summary`` for async views, using the async ORM."""
+        if not settings.TABLE_SUMMARY_COUNTERS:
+            summary = await anext(aiter(cls._aggregate_query(restaurant_id)), None)
+            if summary is not None:
+                summary['restaurant_name'] = summary.pop('name')
+            return summary
+
+        summary = await cls._counters_query(restaurant_id).afirst()
+        if summary is None and await Restaurant.objects.filter(pk=restaurant_id).aexists():
+            await TableSummary.arebuild(restaurant_id)
+            summary = await cls._counters_query(restaurant_id).afirst()
+        if summary is not None:
+            summary['restaurant_name'] = summary.pop('restaurant__name')
+        return summary
 
+
+class TableSummary(models.Model):
+    FIELDS = ('total_tables', 'occupied_tables', 'free_tables', 'unpaid_tables')
+    STATUS_FIELDS = {
+        Table.Status.OCCUPIED: 'occupied_tables',
+        Table.Status.FREE: 'free_tables',
+        Table.Status.UNPAID: 'unpaid_tables',
+    }
+
+    restaurant = models.OneToOneField(
+        Restaurant,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='table_summary',
+        verbose_name=_('Restaurante')
+    )
+    total_tables = models.IntegerField(default=0)
+    occupied_tables = models.IntegerField(default=0)
+    free_tables = models.IntegerField(default=0)
+    unpaid_tables = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Resumen de mesas')
+        verbose_name_plural = _('Resumenes de mesas')
+        db_table = 'mesas_resumen'
+
+    @classmethod
+    def apply(cls, restaurant_id, **deltas):
+        cls.objects.filter(restaurant_id=restaurant_id).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+    @classmethod
+    def _recount(cls):
+        tables = Table.objects.filter(restaurant_id=OuterRef('restaurant_id')).order_by().values('restaurant_id')
         return {
-            'total_tables': total_tables,
-            'occupied_tables': occupied_tables,
-            'free_tables': free_tables,
-            'unpaid_tables': unpaid_tables
+            field: Coalesce(Subquery(tables.annotate(value=aggregate).values('value')), 0)
+            for field, aggregate in Table.summary_aggregates().items()
         }
+
+    @classmethod
+    def rebuild(cls, restaurant_id):
+        """
+        Recount the row of a restaurant from its tables. The row is inserted
+        unless another writer already did, then every counter is set by a
+        single UPDATE, so racing rebuilds and deltas leave it consistent.
+        """
+        cls.objects.bulk_create([cls(restaurant_id=restaurant_id)], ignore_conflicts=True)
+        cls.objects.filter(restaurant_id=restaurant_id).update(**cls._recount())
+
+    @classmethod
+    async def arebuild(cls, restaurant_id):
+        """``rebuild`` using the async ORM."""
+        await cls.objects.abulk_create([cls(restaurant_id=restaurant_id)], ignore_conflicts=True)
+        await cls.objects.filter(restaurant_id=restaurant_id).aupdate(**cls._recount())
+
+    @classmethod
+    def invalidate(cls, restaurant_ids):
+        cls.objects.filter(restaurant_id__in=restaurant_ids).delete()
+
+
+@receiver(post_save, sender=Table)
+def updateTableSummary(sender, instance=None, created=False, **kwargs):
+    if settings.TABLE_SUMMARY_COUNTERS:
+        previous_restaurant = getattr(instance, '_loaded_restaurant_id', None)
+        previous_status = getattr(instance, '_loaded_status', None)
+        conflict = instance.__dict__.pop('_status_conflict', False)
+
+        if created:
+            TableSummary.apply(instance.restaurant_id, total_tables=1, **{
+                TableSummary.STATUS_FIELDS[instance.status]: 1
+            })
+        elif previous_restaurant is None or previous_status is None or conflict:
+            # A conflicting write may also have put back the loaded status.
+            TableSummary.invalidate([instance.restaurant_id])
+        elif previous_restaurant != instance.restaurant_id:
+            TableSummary.invalidate([previous_restaurant, instance.restaurant_id])
+        elif previous_status != instance.status:
+            TableSummary.apply(instance.restaurant_id, **{
+                TableSummary.STATUS_FIELDS[previous_status]: -1,
+                TableSummary.STATUS_FIELDS[instance.status]: 1
+            })
+
+    # Receivers connected later (the table stream) read what the save changed.
+    instance._previous_restaurant_id = getattr(instance, '_loaded_restaurant_id', None)
+    instance._previous_status = getattr(instance, '_loaded_status', None)
+    instance._loaded_restaurant_id = instance.restaurant_id
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Table)
+def discountTableSummary(sender, instance=None, **kwargs):
+    if settings.TABLE_SUMMARY_COUNTERS:
+        TableSummary.apply(instance.restaurant_id, total_tables=-1, **{
+            TableSummary.STATUS_FIELDS[instance.status]: -1
+        })
+
+
+@receiver(tables_bulk_created, sender=Table)
+def invalidateTableSummary(sender, restaurant_ids=(), **kwargs):
+    if settings.TABLE_SUMMARY_COUNTERS:
+        TableSummary.invalidate(restaurant_ids)
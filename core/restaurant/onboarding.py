@@ -0,0 +1,180 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework.authtoken.models import Token
+from rest_framework.validators import UniqueValidator
+
+from core.customers.models import CustomerUser
+from core.restaurant.models import Restaurant
+from core.restaurant.serializers import RestaurantSerializers
+from core.restaurant.signals import restaurants_bulk_created
+
+ONBOARDING_BATCH_SIZE = 200
+ONBOARDING_WORKERS = os.cpu_count() or 1
+
+
+class RestaurantBulkItemSerializer(RestaurantSerializers):
+    """
+    Validates the fields of a single row. Uniqueness of ``rnc``, ``phone``,
+    ``email`` and of the owner username is checked for the whole batch at
+    once by ``Onboarding``.
+    """
+
+    class Meta(RestaurantSerializers.Meta):
+        fields = [field for field in RestaurantSerializers.Meta.fields if field != 'logo']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [validator for validator in field.validators
+                                if not isinstance(validator, UniqueValidator)]
+        return fields
+
+
+def read_rows(stream, format):
+    """
+    Lazily parse a text stream of CSV or JSON Lines into dicts. A line that
+    is not valid JSON is yielded as the ``ValueError`` it raised.
+    """
+    if format == 'csv':
+        for row in csv.DictReader(stream):
+            yield {field: value for field, value in row.items() if value not in ('', None)}
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def _bulk_create(model, objs, key):
+    """
+    ``bulk_create`` that leaves the primary keys set on ``objs``. Backends
+    that cannot return rows from a bulk insert (MySQL, MariaDB < 10.5) get
+    them re-read by the unique ``key`` field.
+    """
+    model.objects.bulk_create(objs)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        ids = dict(model.objects.filter(
+            **{f'{key}__in': [getattr(obj, key) for obj in objs]}
+        ).order_by().values_list(key, 'pk'))
+        for obj in objs:
+            obj.pk = ids[getattr(obj, key)]
+    return objs
+
+
+def _setup_worker():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+class Onboarding:
+    """
+    Creates restaurants, their owner users, the ``restaurant`` group
+    membership and the auth tokens in batches of ``bulk_create`` inserts.
+    Owner passwords are hashed across a process pool, since PBKDF2 is
+    deliberately slow and is the bulk of the cost of a row.
+    """
+
+    def __init__(self, workers=ONBOARDING_WORKERS, batch_size=ONBOARDING_BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.created = []
+        self.errors = {}
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_setup_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def run(self, rows):
+        self.group, _ = Group.objects.get_or_create(name='restaurant')
+        rows = enumerate(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.create_batch(batch)
+        return self
+
+    def hash_passwords(self, passwords):
+        if self._executor is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    def validate_batch(self, batch):
+        rows = []
+        for index, row in batch:
+            if isinstance(row, Exception):
+                self.errors[index] = {'non_field_errors': [str(row)]}
+                continue
+            serializer = RestaurantBulkItemSerializer(data=row)
+            if serializer.is_valid():
+                rows.append((index, serializer.validated_data))
+            else:
+                self.errors[index] = serializer.errors
+
+        unique = {'rnc': set(), 'phone': set(), 'email': set()}
+        for field, values in unique.items():
+            values.update(data[field] for _, data in rows)
+        taken = {field: set() for field in unique}
+        for restaurant in Restaurant.objects.filter(
+            Q(rnc__in=unique['rnc']) | Q(phone__in=unique['phone']) | Q(email__in=unique['email'])
+        ).order_by().values('rnc', 'phone', 'email'):
+            for field in taken:
+                taken[field].add(restaurant[field])
+        usernames = set(CustomerUser.objects.filter(
+            username__in={data['name'] for _, data in rows}
+        ).values_list('username', flat=True))
+
+        valid = []
+        for index, data in rows:
+            errors = {field: [f'Ya existe un restaurante con este {field}.'] for field in taken
+                      if data[field] in taken[field]}
+            if data['name'] in usernames:
+                errors['name'] = ['Ya existe un usuario con este nombre.']
+            if errors:
+                self.errors[index] = errors
+                continue
+            for field in taken:
+                taken[field].add(data[field])
+            usernames.add(data['name'])
+            valid.append(data)
+        return valid
+
+    def create_batch(self, batch):
+        rows = self.validate_batch(batch)
+        if not rows:
+            return
+
+        passwords = self.hash_passwords([data.pop('user_password', None) or data['rnc'] for data in rows])
+        restaurants = [Restaurant(**data) for data in rows]
+        users = [
+            CustomerUser(username=data['name'], email=data['email'], phone=data['phone'], password=password)
+            for data, password in zip(rows, passwords)
+        ]
+
+        with transaction.atomic():
+            _bulk_create(Restaurant, restaurants, 'rnc')
+            _bulk_create(CustomerUser, users, 'username')
+            CustomerUser.groups.through.objects.bulk_create(
+                CustomerUser.groups.through(customeruser=user, group=self.group) for user in users
+            )
+            Token.objects.bulk_create(Token(key=Token.generate_key(), user=user) for user in users)
+
+        restaurants_bulk_created.send(sender=Restaurant, restaurant_ids=[restaurant.id for restaurant in restaurants])
+        self.created.extend(restaurant.id for restaurant in restaurants)
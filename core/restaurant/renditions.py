@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from core.restaurant.models import Restaurant
+
+RENDITION_DIRECTORY = 'restaurant/renditions'
+# Longest side of each rendition, in pixels.
+RENDITION_SIZES = {'thumb': 96, 'small': 256, 'large': 512}
+# Pillow format and save options of each rendition format.
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+RENDITION_WORKERS = 2
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """Thread pool that renders the logos, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=RENDITION_WORKERS, thread_name_prefix='logo-renditions')
+        return _executor
+
+
+def _encode(image, image_format, options):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha: flatten transparent logos on white.
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    output = BytesIO()
+    image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def render(source):
+    """
+    ``{format: {size: content}}`` of every rendition of the image file
+    ``source``. Logos are only scaled down, keeping their aspect ratio.
+    """
+    with Image.open(source) as original:
+        # JPEGs are decoded already scaled down, close to the largest rendition.
+        largest = max(RENDITION_SIZES.values())
+        original.draft('RGB', (largest, largest))
+        original = ImageOps.exif_transpose(original)
+        original = original.convert('RGBA' if 'A' in original.getbands() or original.mode == 'P' else 'RGB')
+        renditions = {}
+        for name, (image_format, options) in RENDITION_FORMATS.items():
+            renditions[name] = {}
+            for size, pixels in RENDITION_SIZES.items():
+                image = original.copy()
+                image.thumbnail((pixels, pixels), Image.Resampling.LANCZOS)
+                renditions[name][size] = _encode(image, image_format, options)
+    return renditions
+
+
+def store(content, extension, storage):
+    """
+    Save ``content`` under the hash of its bytes and return its name. Files
+    are never rewritten, so their URL can be cached forever.
+    """
+    name = f'{RENDITION_DIRECTORY}/{hashlib.sha256(content).hexdigest()[:32]}.{extension}'
+    if not storage.exists(name):
+        saved = storage.save(name, ContentFile(content))
+        if saved != name:
+            # Another render stored the same bytes first: keep the hashed name only.
+            storage.delete(saved)
+    return name
+
+
+def rendition_names(variants):
+    """Names of the rendition files in ``logo_variants``."""
+    return {name for image_format, sizes in variants.items() if image_format != 'source' for name in sizes.values()}
+
+
+def unreferenced(names, restaurant_id):
+    """The ``names`` that no restaurant but ``restaurant_id`` has among its renditions."""
+    shared = Q()
+    for image_format in RENDITION_FORMATS:
+        for size in RENDITION_SIZES:
+            shared |= Q(**{f'logo_variants__{image_format}__{size}__in': sorted(names)})
+    referenced = Restaurant.objects.filter(shared).exclude(pk=restaurant_id).values_list('logo_variants', flat=True)
+    return names - set().union(*map(rendition_names, referenced))
+
+
+def delete_renditions(names, storage):
+    for name in names:
+        storage.delete(name)
+
+
+def render_logo(restaurant_id):
+    """
+    Render and store the logo of a restaurant and save the names of the
+    renditions in ``logo_variants``, with the logo they were made from under
+    ``source``. A logo Pillow can not read gets no renditions. The files of
+    the previous renditions no other restaurant shares are deleted. Returns
+    the variants, or None when the logo changed or the restaurant was
+    deleted meanwhile.
+    """
+    restaurant = Restaurant.objects.filter(pk=restaurant_id).only('id', 'logo').first()
+    if restaurant is None:
+        return None
+    source = restaurant.logo.name or ''
+    storage = restaurant.logo.storage
+    variants = {'source': source}
+    if source:
+        try:
+            with storage.open(source) as file:
+                renditions = render(file)
+        except (OSError, Image.DecompressionBombError):
+            logger.warning('The logo %s of restaurant %s can not be rendered.', source, restaurant_id, exc_info=True)
+            renditions = {}
+        for name, sizes in renditions.items():
+            variants[name] = {size: store(content, name, storage) for size, content in sizes.items()}
+
+    with transaction.atomic():
+        restaurant = Restaurant.objects.select_for_update().filter(pk=restaurant_id).first()
+        # Only when the logo is still the rendered one.
+        if restaurant is None or (restaurant.logo.name or '') != source:
+            return None
+        stale = rendition_names(restaurant.logo_variants) - rendition_names(variants)
+        restaurant.logo_variants = variants
+        restaurant.save(update_fields=['logo_variants', 'update_at'])
+        if stale:
+            stale = unreferenced(stale, restaurant_id)
+            transaction.on_commit(lambda: delete_renditions(stale, storage))
+    return variants
+
+
+def _render_in_background(restaurant_id):
+    try:
+        render_logo(restaurant_id)
+    except Exception:
+        # Nobody waits on the future, its exception would be lost.
+        logger.exception('Rendering the logo of restaurant %s failed.', restaurant_id)
+    finally:
+        # Pool threads outlive requests, nothing else closes their connection.
+        connection.close()
+
+
+def needs_renditions(restaurant):
+    return (restaurant.logo.name or '') != restaurant.logo_variants.get('source', '')
+
+
+def schedule_renditions(restaurant_id):
+    transaction.on_commit(lambda: executor().submit(_render_in_background, restaurant_id))
+
+
+@receiver(post_save, sender=Restaurant)
+def renderLogo(sender, instance=None, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'logo' not in update_fields):
+        return
+    if needs_renditions(instance):
+        schedule_renditions(instance.pk)
@@ -0,0 +1,164 @@
+import re
+
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.filters import SearchFilter
+
+from core.restaurant.models import Restaurant
+from core.restaurant.signals import restaurants_bulk_created
+
+SEARCH_TABLE = 'restaurant_search'
+SEARCH_FIELDS = ('name', 'rnc', 'email', 'phone')
+SEARCH_LIMIT = 100
+INDEX_BATCH_SIZE = 500
+
+
+def _tokens(term):
+    return re.findall(r'\w+', term)
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), INDEX_BATCH_SIZE):
+        yield ids[start:start + INDEX_BATCH_SIZE]
+
+
+class SQLiteSearch:
+    """
+    FTS5 table keyed by the restaurant id (its rowid), ranked with bm25 so
+    a hit on the name weighs more than one on the rnc, email or phone.
+    The table is created by migration ``0004_restaurant_search``.
+    """
+
+    def index(self, cursor, ids=None):
+        columns = ', '.join(SEARCH_FIELDS)
+        select = f'SELECT id, {columns} FROM {Restaurant._meta.db_table}'
+        if ids is None:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            cursor.execute(f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) {select}')
+            return
+        for batch in _batches(ids):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', batch)
+            cursor.execute(f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) {select} WHERE id IN ({placeholders})', batch)
+
+    def remove(self, cursor, ids):
+        for batch in _batches(ids):
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(batch))})", batch)
+
+    def search(self, cursor, tokens, limit):
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        cursor.execute(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s',
+                       [query, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearch:
+    """
+    ``tsvector`` table under a GIN index, the name weighted 'A' and the rnc,
+    email and phone 'B', queried with prefix terms and ranked by ``ts_rank``.
+    The table is created by migration ``0004_restaurant_search``.
+    """
+
+    def _insert(self, where=''):
+        return (
+            f"INSERT INTO {SEARCH_TABLE} (restaurant_id, document) "
+            f"SELECT id, setweight(to_tsvector('simple', name), 'A') || "
+            f"setweight(to_tsvector('simple', concat_ws(' ', rnc, email, phone)), 'B') "
+            f"FROM {Restaurant._meta.db_table} {where} "
+            f"ON CONFLICT (restaurant_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+
+    def index(self, cursor, ids=None):
+        if ids is None:
+            cursor.execute(self._insert())
+            return
+        for batch in _batches(ids):
+            cursor.execute(self._insert('WHERE id = ANY(%s)'), [batch])
+
+    def remove(self, cursor, ids):
+        for batch in _batches(ids):
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE restaurant_id = ANY(%s)', [batch])
+
+    def search(self, cursor, tokens, limit):
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        cursor.execute(
+            f"SELECT restaurant_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query WHERE document @@ query "
+            f"ORDER BY ts_rank(document, query) DESC, restaurant_id LIMIT %s",
+            [query, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearch,
+    'postgresql': PostgreSQLSearch,
+}
+
+
+def get_backend(using=connection):
+    backend = BACKENDS.get(using.vendor)
+    return backend() if backend is not None else None
+
+
+def search_restaurants(term, limit=SEARCH_LIMIT):
+    """
+    Ids of the restaurants matching every word of ``term`` as a prefix, best
+    ranked first, or None when the database has no full-text backend.
+    """
+    backend = get_backend()
+    tokens = _tokens(term)
+    if backend is None or not tokens:
+        return None
+    with connection.cursor() as cursor:
+        return backend.search(cursor, tokens, limit)
+
+
+def index_restaurants(ids=None):
+    backend = get_backend()
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend.index(cursor, ids)
+
+
+def remove_restaurants(ids):
+    backend = get_backend()
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend.remove(cursor, ids)
+
+
+class RestaurantSearchFilter(SearchFilter):
+    """
+    ``SearchFilter`` answered by the full-text index: the ``SEARCH_LIMIT``
+    best ranked restaurants, in rank order. Falls back to the ``icontains``
+    search of ``search_fields`` on databases without a backend.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ids = search_restaurants(request.query_params.get(self.search_param, ''))
+        if ids is None:
+            return super().filter_queryset(request, queryset, view)
+        if not ids:
+            return queryset.none()
+        rank = Case(*(When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)),
+                    output_field=IntegerField())
+        return queryset.filter(pk__in=ids).order_by(rank)
+
+
+@receiver(post_save, sender=Restaurant)
+def indexRestaurant(sender, instance=None, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(SEARCH_FIELDS):
+        index_restaurants([instance.pk])
+
+
+@receiver(post_delete, sender=Restaurant)
+def unindexRestaurant(sender, instance=None, **kwargs):
+    remove_restaurants([instance.pk])
+
+
+@receiver(restaurants_bulk_created, sender=Restaurant)
+def indexRestaurants(sender, restaurant_ids=(), **kwargs):
+    index_restaurants(restaurant_ids)
@@ -45,6 +45,7 @@ class RestaurantSerializers(serializers.ModelSerializer):
         if instance.logo:
             representation['logo'] = instance.logo.url
         representation['logo'] = instance.get_logo()
+        representation['logo_variants'] = instance.get_logo_variants()
         return representation
 
     def create(self, validated_data):
@@ -72,7 +73,7 @@ class TableSerializer(serializers.ModelSerializer):
         queryset=Restaurant.objects.all(),
         write_only=True
     )
-    restaurant_id = serializers.IntegerField(source='restaurant.id', read_only=True)
+    restaurant_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Table
@@ -90,13 +91,13 @@ class TableSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['restaurant_id'] = instance.restaurant.id
+        representation['restaurant_id'] = instance.restaurant_id
         return representation
 
 
 class TableSummarySerializer(serializers.Serializer):
-    restaurant_id = serializers.IntegerField(source='restaurant.id', read_only=True)
-    restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
+    restaurant_id = serializers.IntegerField(read_only=True)
+    restaurant_name = serializers.CharField(read_only=True)
     summary = serializers.DictField(child=serializers.IntegerField())
 
     def to_representation(self, instance):
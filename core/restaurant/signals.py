@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent after tables are inserted with bulk_create, which skips post_save.
+# Receivers get ``restaurant_ids``, the restaurants that got new tables.
+tables_bulk_created = Signal()
+
+# Sent after restaurants are onboarded with bulk_create. Receivers get
+# ``restaurant_ids``, the restaurants that were created.
+restaurants_bulk_created = Signal()
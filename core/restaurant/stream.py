@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.restaurant.models import Table
+from core.restaurant.signals import tables_bulk_created
+
+STREAM_BUFFER_SIZE = 256
+STREAM_HEARTBEAT = 15
+STREAM_RETRY_MS = 3000
+STREAM_FIELDS = ('id', 'number', 'capacity', 'location', 'status')
+
+
+class Channel:
+    """Event ring buffer of a restaurant and the streams waiting on it."""
+    __slots__ = ('sequence', 'events', 'waiters')
+
+    def __init__(self, size):
+        self.sequence = 0
+        self.events = deque(maxlen=size)
+        self.waiters = set()
+
+
+class TableBroker:
+    """
+    In process publish/subscribe of the table changes of each restaurant.
+    Every restaurant keeps the last ``buffer_size`` events so a stream can
+    resume after ``Last-Event-ID``. Event ids are ``<epoch>:<sequence>``:
+    an id from another process or from before a restart never matches the
+    epoch, and the stream starts over from a snapshot.
+
+    Every worker process keeps its own broker, so a stream only sees the
+    changes saved by the worker that serves it.
+    """
+
+    def __init__(self, buffer_size=STREAM_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.epoch = format(time.time_ns(), 'x')
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def _channel(self, restaurant_id):
+        channel = self._channels.get(restaurant_id)
+        if channel is None:
+            channel = self._channels[restaurant_id] = Channel(self.buffer_size)
+        return channel
+
+    def publish(self, restaurant_id, event, data=None):
+        with self._lock:
+            channel = self._channel(restaurant_id)
+            channel.sequence += 1
+            channel.events.append((channel.sequence, event, data))
+            waiters = list(channel.waiters)
+        # Publishers run in request threads; wake each stream on its own loop.
+        for loop, wakeup in waiters:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def event_id(self, sequence):
+        return f'{self.epoch}:{sequence}'
+
+    def parse_id(self, event_id):
+        """The sequence of an id of this broker, or None."""
+        epoch, _, sequence = (event_id or '').partition(':')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def current(self, restaurant_id):
+        with self._lock:
+            return self._channel(restaurant_id).sequence
+
+    def since(self, restaurant_id, sequence):
+        """
+        Events published after ``sequence``, or None when some of them have
+        already left the ring buffer.
+        """
+        with self._lock:
+            channel = self._channel(restaurant_id)
+            if sequence > channel.sequence:
+                return None
+            if sequence == channel.sequence:
+                return []
+            events = list(channel.events)
+        if not events or events[0][0] > sequence + 1:
+            return None
+        return events[sequence + 1 - events[0][0]:]
+
+    def add_waiter(self, restaurant_id, waiter):
+        with self._lock:
+            self._channel(restaurant_id).waiters.add(waiter)
+
+    def remove_waiter(self, restaurant_id, waiter):
+        with self._lock:
+            self._channel(restaurant_id).waiters.discard(waiter)
+
+
+broker = TableBroker()
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def snapshot(restaurant_id):
+    """A ``snapshot`` event with every table of the restaurant."""
+    sequence = broker.current(restaurant_id)
+    tables = [table async for table in Table.objects.filter(restaurant_id=restaurant_id).order_by('number')
+              .values(*STREAM_FIELDS)]
+    return sequence, format_event('snapshot', {'tables': tables}, broker.event_id(sequence))
+
+
+async def table_events(restaurant_id, last_event_id=None, follow=True, heartbeat=STREAM_HEARTBEAT):
+    """
+    Server-Sent Events of the tables of a restaurant. Starts with the events
+    after ``last_event_id`` when they are still buffered, or with a snapshot
+    of the tables otherwise. With ``follow`` the stream then waits for new
+    events, sending a comment every ``heartbeat`` seconds; without it the
+    stream ends and the client reconnects after ``STREAM_RETRY_MS``.
+    """
+    yield f'retry: {STREAM_RETRY_MS}\n\n'
+    sequence = broker.parse_id(last_event_id)
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    broker.add_waiter(restaurant_id, waiter)
+    try:
+        while True:
+            waiter[1].clear()
+            events = broker.since(restaurant_id, sequence) if sequence is not None else None
+            if events is None:
+                sequence, chunk = await snapshot(restaurant_id)
+                yield chunk
+                continue
+            for event_sequence, event, data in events:
+                sequence = event_sequence
+                if event == 'reset':
+                    sequence, chunk = await snapshot(restaurant_id)
+                    yield chunk
+                    break
+                yield format_event(event, data, broker.event_id(event_sequence))
+            if events:
+                continue
+            if not follow:
+                return
+            try:
+                await asyncio.wait_for(waiter[1].wait(), heartbeat)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+    finally:
+        broker.remove_waiter(restaurant_id, waiter)
+
+
+def publish_on_commit(restaurant_id, event, data=None):
+    transaction.on_commit(lambda: broker.publish(restaurant_id, event, data))
+
+
+@receiver(post_save, sender=Table)
+def publishTable(sender, instance=None, created=False, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & {*STREAM_FIELDS, 'restaurant'}:
+        return
+    previous_restaurant_id = getattr(instance, '_previous_restaurant_id', None)
+    if not created and previous_restaurant_id not in (None, instance.restaurant_id):
+        publish_on_commit(previous_restaurant_id, 'table-deleted', {'id': instance.pk})
+    data = {field: getattr(instance, field) for field in STREAM_FIELDS}
+    data['previous_status'] = None if created else getattr(instance, '_previous_status', None)
+    publish_on_commit(instance.restaurant_id, 'table', data)
+
+
+@receiver(post_delete, sender=Table)
+def publishTableDeleted(sender, instance=None, **kwargs):
+    publish_on_commit(instance.restaurant_id, 'table-deleted', {'id': instance.pk})
+
+
+@receiver(tables_bulk_created, sender=Table)
+def publishTablesCreated(sender, restaurant_ids=(), **kwargs):
+    # Bulk inserts do not carry the rows, streams reload a snapshot instead.
+    for restaurant_id in restaurant_ids:
+        publish_on_commit(restaurant_id, 'reset')
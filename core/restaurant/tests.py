@@ -1,3 +1,606 @@
-from django.test import TestCase
+import asyncio
+import json
+import re
+import shutil
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from core.metrics import metrics
+from core.reservations.models import Reservation
+from core.reservations.views import ReservationListAPIView
+from core.restaurant.endpoints.tables.views import TableListCreateView
+from core.customers.models import CustomerUser
+from core.restaurant.caching import check_shared_cache
+from core.restaurant.models import Restaurant, Table, TableSummary
+from core.restaurant.onboarding import Onboarding, read_rows
+from core.restaurant.renditions import RENDITION_SIZES, render_logo, store
+from core.restaurant.stream import broker, table_events
+from core.testing import (QueryBudgetTestCase, make_restaurant, make_tables, make_reservations, make_customer,
+                          response_json)
+
+
+class RestaurantQueryBudgetTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+
+    def test_restaurant_list(self):
+        self.assertQueryBudget('/api/restaurant/', 3, grow=lambda: [make_restaurant() for _ in range(4)])
+
+    def test_restaurant_detail(self):
+        self.assertQueryBudget(f'/api/restaurant/{self.restaurant.id}/', 1)
+
+    def test_reservations_by_restaurant(self):
+        customer = make_customer()
+        self.assertQueryBudget(
+            f'/api/restaurant/{self.restaurant.id}/reservation-summary/', 3,
+            grow=lambda: make_reservations(4, customer=customer, restaurant=self.restaurant)
+        )
+
+    def test_availability(self):
+        self.assertQueryBudget(
+            f'/api/restaurant/{self.restaurant.id}/availability/?date=2026-01-01&party_size=2', 3,
+            grow=lambda: make_tables(self.restaurant, 4)
+        )
+
+
+class RestaurantConditionalGetTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+
+    def test_process_local_cache_is_reported(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['restaurant.W001'])
+
+    def test_detail_not_modified(self):
+        path = f'/api/restaurant/{self.restaurant.id}/'
+        etag = self.client.get(path)['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.restaurant.save()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_is_cached_until_a_restaurant_changes(self):
+        etag = self.client.get('/api/restaurant/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/restaurant/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get('/api/restaurant/').status_code, 200)
+
+        make_restaurant()
+        response = self.client.get('/api/restaurant/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class LogoRenditionTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Render on commit in the test thread instead of the pool.
+        executor = mock.patch('core.restaurant.renditions.executor')
+        executor.start().return_value.submit.side_effect = lambda function, restaurant_id: render_logo(restaurant_id)
+        self.addCleanup(executor.stop)
+        self.restaurant = make_restaurant()
+
+    def upload(self, color, size=(1200, 600), image_format='PNG'):
+        content = BytesIO()
+        image = Image.new('RGBA', size, color)
+        (image if image_format == 'PNG' else image.convert('RGB')).save(content, image_format)
+        self.restaurant.logo = SimpleUploadedFile(f'logo.{image_format.lower()}', content.getvalue(),
+                                                  content_type=f'image/{image_format.lower()}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.save()
+        self.restaurant.refresh_from_db()
+
+    def test_renditions_are_rendered_after_upload(self):
+        self.upload((200, 30, 30, 128))
+        variants = self.restaurant.logo_variants
+        self.assertEqual(variants['source'], self.restaurant.logo.name)
+        for image_format in ('webp', 'jpeg'):
+            for size, pixels in RENDITION_SIZES.items():
+                name = variants[image_format][size]
+                self.assertRegex(name, rf'^restaurant/renditions/[0-9a-f]{{32}}\.{image_format}$')
+                with default_storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(image.size, (pixels, pixels // 2))
+                    self.assertEqual(image.format, image_format.upper())
+
+        data = self.client.get(f'/api/restaurant/{self.restaurant.id}/').data
+        self.assertEqual(data['logo_variants']['webp']['thumb'], f'/media/{variants["webp"]["thumb"]}')
+
+    def test_same_content_same_name(self):
+        self.upload((10, 120, 40, 255))
+        first = self.restaurant.logo_variants
+        self.upload((10, 120, 40, 255))
+        self.assertNotEqual(self.restaurant.logo_variants['source'], first['source'])
+        self.assertEqual(self.restaurant.logo_variants['jpeg'], first['jpeg'])
+
+    def test_large_jpeg_is_drafted(self):
+        self.upload((90, 60, 30, 255), size=(4096, 2048), image_format='JPEG')
+        with default_storage.open(self.restaurant.logo_variants['webp']['large']) as file, Image.open(file) as image:
+            self.assertEqual(image.size, (512, 256))
+
+    def test_decompression_bomb_gets_no_renditions(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000), \
+                self.assertLogs('core.restaurant.renditions', 'WARNING'):
+            self.upload((0, 0, 0, 255))
+        self.assertEqual(self.restaurant.logo_variants, {'source': self.restaurant.logo.name})
+
+    def test_store_race_keeps_the_hashed_name(self):
+        name = store(b'logo', 'webp', default_storage)
+        # Another render saves the file between the check and the save.
+        exists = default_storage.exists
+        answers = iter([False])
+        with mock.patch.object(default_storage, 'exists', side_effect=lambda path: next(answers, exists(path))):
+            self.assertEqual(store(b'logo', 'webp', default_storage), name)
+        self.assertEqual(default_storage.listdir('restaurant/renditions')[1], [name.rsplit('/', 1)[1]])
+
+    def test_replaced_renditions_are_deleted_unless_shared(self):
+        self.upload((255, 0, 0, 255))
+        first = self.restaurant.logo_variants
+        make_restaurant(logo_variants={'source': 'restaurant/shared.png', 'webp': first['webp']})
+        self.upload((0, 255, 0, 255))
+        for name in first['jpeg'].values():
+            self.assertFalse(default_storage.exists(name), name)
+        for name in [*first['webp'].values(), *self.restaurant.logo_variants['jpeg'].values()]:
+            self.assertTrue(default_storage.exists(name), name)
+
+    def test_stale_variants_are_hidden(self):
+        self.upload((0, 0, 255, 255))
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(logo='restaurant/other.png')
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.get_logo_variants(), {})
+
+
+class MediaServingTest(QueryBudgetTestCase):
+    digest = '0123456789abcdef0123456789abcdef'
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.content = bytes(range(256)) * 40
+        default_storage.save('restaurant/logo.png', BytesIO(self.content))
+        default_storage.save(f'restaurant/renditions/{self.digest}.webp', BytesIO(self.content))
+
+    def test_hashed_files_are_immutable(self):
+        response = self.client.get(f'/media/restaurant/renditions/{self.digest}.webp')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.digest}"')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get('/media/restaurant/logo.png')
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get('/media/restaurant/logo.png', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # Uploads named like a digest may still be replaced under the same name.
+        default_storage.save(f'restaurant/{self.digest}.png', BytesIO(self.content))
+        response = self.client.get(f'/media/restaurant/{self.digest}.png')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotEqual(response['ETag'], f'"{self.digest}"')
+
+    def test_ranges(self):
+        path = '/media/restaurant/logo.png'
+        response = self.client.get(path, HTTP_RANGE='bytes=100-299')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-299/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:300])
+
+        response = self.client.get(path, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-10:])
+
+        response = self.client.get(path, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+        # A stale If-Range gets the whole file.
+        response = self.client.get(path, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_sendfile_and_missing_files(self):
+        with override_settings(MEDIA_SERVING={'SENDFILE': 'X-Accel-Redirect'}):
+            response = self.client.get('/media/restaurant/logo.png')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/restaurant/logo.png')
+        self.assertEqual(b''.join(response.streaming_content), b'')
+        self.assertFalse(response.has_header('Content-Length'))
+
+        self.assertEqual(self.client.get('/media/restaurant/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/restaurant').status_code, 404)
+
+
+class RestaurantSearchTest(QueryBudgetTestCase):
+
+    def search(self, term):
+        response = self.client.get('/api/restaurant/', {'search': term})
+        return [restaurant['id'] for restaurant in response.data['results']]
+
+    def test_ranked_prefix_search_follows_changes(self):
+        by_email = make_restaurant(email='pollo@brasa.com')
+        by_name = make_restaurant(name='Pollos Hermanos Brasa')
+        make_restaurant(name='El Sabor Tropical')
+
+        self.assertEqual(self.search('poll bras'), [by_name.id, by_email.id])
+        self.assertEqual(self.search('tropi'), [by_name.id + 1])
+
+        by_name.name = 'Café Olé'
+        by_name.save()
+        self.assertEqual(self.search('poll'), [by_email.id])
+        self.assertEqual(self.search('cafe'), [by_name.id])
+
+        by_email.delete()
+        self.assertEqual(self.search('poll'), [])
+
+
+class TableQueryBudgetTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+
+    def test_table_list(self):
+        self.assertQueryBudget('/api/table/', 2, grow=lambda: make_tables(self.restaurant, 4))
+
+    def test_tables_by_restaurant(self):
+        self.assertQueryBudget(
+            f'/api/table/{self.restaurant.id}/restaurant/', 2,
+            grow=lambda: make_tables(self.restaurant, 4)
+        )
+
+    def test_table_summary(self):
+        self.assertQueryBudget(
+            f'/api/table/{self.restaurant.id}/table-summary/', 1,
+            grow=lambda: make_tables(self.restaurant, 4)
+        )
+
+    def test_table_detail(self):
+        table = make_tables(self.restaurant, 1)[0]
+        self.assertQueryBudget(f'/api/table/{table.id}/', 1)
+
+
+@override_settings(TABLE_SUMMARY_COUNTERS=True)
+class TableSummaryCounterTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+        make_tables(self.restaurant, 3)
+        self.table = Table.objects.filter(restaurant=self.restaurant).first()
+        Table.get_summary(self.restaurant.id)
+
+    def assertCountersMatch(self):
+        counters = TableSummary.objects.filter(restaurant=self.restaurant).values(*TableSummary.FIELDS).first()
+        aggregate = next(iter(Table._aggregate_query(self.restaurant.id)))
+        aggregate.pop('name')
+        self.assertIn(counters, (None, aggregate))
+        self.assertEqual(Table.get_summary(self.restaurant.id), aggregate)
+
+    def test_status_change_moves_the_counters(self):
+        self.table.status = Table.Status.OCCUPIED
+        self.table.save()
+        self.assertEqual(TableSummary.objects.get(restaurant=self.restaurant).occupied_tables, 1)
+        self.assertCountersMatch()
+
+    def test_stale_status_change_rebuilds_the_counters(self):
+        stale = Table.objects.get(pk=self.table.pk)
+        self.table.status = Table.Status.OCCUPIED
+        self.table.save()
+        # Loaded as free, but the row is occupied by now.
+        stale.status = Table.Status.UNPAID
+        stale.save()
+        self.assertEqual(Table.objects.get(pk=self.table.pk).status, Table.Status.UNPAID)
+        self.assertCountersMatch()
+
+        # Loaded as unpaid and saved as unpaid, over a free row.
+        stale = Table.objects.get(pk=self.table.pk)
+        Table.objects.filter(pk=self.table.pk).update(status=Table.Status.FREE)
+        Table.get_summary(self.restaurant.id)
+        stale.save()
+        self.assertCountersMatch()
+
+
+    def test_rebuild_overwrites_a_row_inserted_by_another_writer(self):
+        TableSummary.objects.filter(restaurant=self.restaurant).update(total_tables=9, free_tables=0)
+        TableSummary.rebuild(self.restaurant.id)
+        self.assertCountersMatch()
+
+        self.assertIsNone(Table.get_restaurant_summary(0))
+        self.assertFalse(TableSummary.objects.filter(restaurant_id=0).exists())
+
+    async def test_async_rebuild_of_a_restaurant_without_tables(self):
+        empty = await Restaurant.objects.acreate(rnc='987654321', name='Vacio', address='Calle 2',
+                                                 phone='8091112222', email='vacio@dineeasy.com', capacity=10)
+        self.assertEqual(await Table.aget_restaurant_summary(empty.id),
+                         {'restaurant_name': empty.name, **dict.fromkeys(TableSummary.FIELDS, 0)})
+        self.assertIsNone(await Table.aget_restaurant_summary(0))
+
+class RestaurantOnboardingTest(QueryBudgetTestCase):
+    CSV_HEADER = 'rnc,name,address,phone,email,capacity\n'
+
+    def row(self, n, **kwargs):
+        return {'rnc': f'{n:09d}', 'name': f'Onboarded {n}', 'address': 'Calle 1', 'phone': f'80{n:08d}',
+                'email': f'onboarded{n}@dineeasy.com', 'capacity': 40, **kwargs}
+
+    def csv_line(self, n):
+        return ','.join(str(value) for value in self.row(n).values()) + '\n'
+
+    def test_read_rows(self):
+        self.assertEqual(list(read_rows(StringIO('rnc,name\n123,\n'), 'csv')), [{'rnc': '123'}])
+        rows = list(read_rows(StringIO('{"rnc": "1"}\n\nnot json\n'), 'jsonl'))
+        self.assertEqual(rows[0], {'rnc': '1'})
+        self.assertIsInstance(rows[1], ValueError)
+        self.assertEqual(len(rows), 2)
+
+    def test_onboarding_creates_owners_and_reports_duplicates(self):
+        existing = make_restaurant()
+        rows = [self.row(1), self.row(2, email=existing.email), self.row(3, rnc=f'{1:09d}'), ValueError('bad')]
+        with Onboarding(workers=1, batch_size=2) as onboarding:
+            onboarding.run(rows)
+        self.assertEqual(len(onboarding.created), 1)
+        self.assertEqual(sorted(onboarding.errors), [1, 2, 3])
+        self.assertIn('email', onboarding.errors[1])
+        self.assertIn('rnc', onboarding.errors[2])
+
+        owner = CustomerUser.objects.get(username='Onboarded 1')
+        self.assertTrue(owner.check_password(f'{1:09d}'))
+        self.assertTrue(owner.groups.filter(name='restaurant').exists())
+        self.assertTrue(Token.objects.filter(user=owner).exists())
+
+    def test_onboarding_without_returning_ids(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False), \
+                Onboarding(workers=1) as onboarding:
+            onboarding.run([self.row(40), self.row(41)])
+        self.assertEqual(sorted(onboarding.created),
+                         sorted(Restaurant.objects.filter(rnc__in=[f'{40:09d}', f'{41:09d}']).values_list('id', flat=True)))
+        owner = CustomerUser.objects.get(username='Onboarded 41')
+        self.assertTrue(owner.groups.filter(name='restaurant').exists())
+        self.assertTrue(Token.objects.filter(user=owner).exists())
+
+    def test_streaming_endpoint(self):
+        self.user.is_staff = True
+        self.user.save()
+        body = self.CSV_HEADER + self.csv_line(10) + self.csv_line(11)
+        response = self.client.post('/api/restaurant/bulk/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(response.data['created']),
+                         sorted(Restaurant.objects.filter(rnc__in=[f'{10:09d}', f'{11:09d}']).values_list('id', flat=True)))
+
+        body = json.dumps(self.row(12)) + '\nnot json\n'
+        response = self.client.post('/api/restaurant/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+
+        response = self.client.post('/api/restaurant/bulk/', self.CSV_HEADER + self.csv_line(12),
+                                    content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], [])
+        self.assertEqual(self.client.post('/api/restaurant/bulk/', '{}', content_type='application/json').status_code,
+                         415)
+
+    def test_streaming_endpoint_is_staff_only(self):
+        response = self.client.post('/api/restaurant/bulk/', self.CSV_HEADER + self.csv_line(20),
+                                    content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_post_hashes_in_process(self):
+        self.client.force_authenticate(None)
+        with mock.patch('core.restaurant.onboarding.ProcessPoolExecutor') as pool:
+            response = self.client.post('/api/restaurant/', [self.row(30), self.row(31)], format='json')
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertIsInstance(response.data['created'][0], int)
+
+
+class TableBulkCreateTest(QueryBudgetTestCase):
+
+    def test_creates_valid_rows_and_reports_the_rest(self):
+        restaurant = make_restaurant()
+        make_tables(restaurant, 1)
+        payload = [{'restaurant': restaurant.id, 'number': number, 'capacity': 4} for number in range(1, 201)]
+        payload += [{'restaurant': restaurant.id, 'number': 2, 'capacity': 2},
+                    {'restaurant': 999, 'number': 1, 'capacity': 2},
+                    {'restaurant': restaurant.id, 'number': 500}]
+
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/table/', payload, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.data['created']), 199)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 200, 201, 202])
+        self.assertEqual(restaurant.tables.count(), 200)
+
+
+class PerformanceMetricsTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.clear()
+        self.restaurant = make_restaurant()
+        make_tables(self.restaurant, 2)
+
+    def test_request_is_timed_and_exposed(self):
+        make_restaurant()
+        response = self.client.get('/api/restaurant/')
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$')
+
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        exposition = self.client.get('/api/metrics').content.decode()
+        labels = 'view="core.restaurant.endpoints.restaurants.views.RestaurantListAPIView",method="GET"'
+        self.assertIn(f'dineeasy_request_duration_seconds_count{{{labels}}} 1', exposition)
+        self.assertIn(f'dineeasy_db_queries_bucket{{{labels},le="+Inf"}} 1', exposition)
+        self.assertIn(f'dineeasy_responses_total{{{labels},status="200"}} 1', exposition)
+
+    async def test_queries_are_counted_under_asgi(self):
+        # The ORM runs in the sync_to_async executor, not in the thread of the middleware.
+        headers = {'Authorization': f'Token {await Token.objects.aget(user=self.user)}'}
+        for path in (f'/api/restaurant/{self.restaurant.id}/', f'/api/table/{self.restaurant.id}/table-summary/',
+                     f'/api/async/table/{self.restaurant.id}/table-summary/'):
+            response = await self.async_client.get(path, headers=headers)
+            self.assertEqual(response.status_code, 200, path)
+            queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing'])[1])
+            self.assertGreater(queries, 0, path)
+
+
+class FastPathTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant(name='Café "Ñandú"')
+        make_tables(self.restaurant, 12)
+        make_reservations(12, customer=self.user, restaurant=self.restaurant, special_request='Sin gluten')
+
+    def get_both(self, view, path):
+        fast = self.client.get(path)
+        self.assertTrue(fast.streaming, path)
+        with mock.patch.object(view, 'fast_path', False):
+            regular = self.client.get(path)
+        self.assertFalse(regular.streaming, path)
+        return response_json(fast), regular.json()
+
+    def test_fast_path_matches_serializer(self):
+        for view, path in ((TableListCreateView, '/api/table/?count=true&page_size=5'),
+                           (ReservationListAPIView, '/api/reservations/?page_size=5')):
+            fast, regular = self.get_both(view, path)
+            self.assertEqual(fast, regular, path)
+            # The keyset cursors work on the projected rows.
+            fast, regular = self.get_both(view, fast['next'])
+            self.assertEqual(fast, regular, path)
+            self.assertEqual(len(fast['results']), 5)
+
+    def test_fast_path_bytes_match_json_renderer(self):
+        Table.objects.filter(restaurant=self.restaurant).update(location='Terraza\u2028norte, Ñ')
+        Reservation.objects.filter(restaurant=self.restaurant).update(special_request='Cumpleaños\u2029🎂')
+        for view, path in ((TableListCreateView, '/api/table/?count=true&page_size=5'),
+                           (ReservationListAPIView, '/api/reservations/?page_size=5')):
+            fast = b''.join(self.client.get(path))
+            with mock.patch.object(view, 'fast_path', False):
+                regular = self.client.get(path).content
+            self.assertEqual(fast, regular, path)
+            self.assertNotIn('\u2028'.encode(), fast)
+            self.assertNotIn('\u2029'.encode(), fast)
+
+    def test_browsable_api_keeps_serializer(self):
+        response = self.client.get('/api/table/', HTTP_ACCEPT='text/html')
+        self.assertFalse(response.streaming)
+
+
+class AsyncEndpointTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+        make_tables(self.restaurant, 3)
+        make_reservations(12, customer=self.user, restaurant=self.restaurant)
+
+    def test_async_mirrors_match_sync_views(self):
+        for path in (
+            f'restaurant/{self.restaurant.id}/',
+            f'restaurant/{self.restaurant.id}/reservation-summary/?page=2',
+            f'table/{self.restaurant.id}/restaurant/',
+            f'table/{self.restaurant.id}/table-summary/',
+            'reservations/?count=true',
+            f'users/customers/{self.user.id}/reservations/',
+        ):
+            response = self.client.get(f'/api/async/{path}')
+            self.assertEqual(response.status_code, 200, path)
+            # Only the pagination links, which point back to the async route, may differ.
+            data = json.loads(response.content.decode().replace('/api/async/', '/api/'))
+            self.assertEqual(data, response_json(self.client.get(f'/api/{path}')), path)
+
+    def test_async_restaurant_detail_revalidates(self):
+        response = self.client.get(f'/api/async/restaurant/{self.restaurant.id}/')
+        sync = self.client.get(f'/api/restaurant/{self.restaurant.id}/')
+        self.assertEqual(response['ETag'], sync['ETag'])
+        self.assertEqual(response['Cache-Control'], sync['Cache-Control'])
+        response = self.client.get(f'/api/async/restaurant/{self.restaurant.id}/',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        Restaurant.objects.get(pk=self.restaurant.id).save()
+        response = self.client.get(f'/api/async/restaurant/{self.restaurant.id}/',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/async/restaurant/0/').status_code, 404)
+
+    def test_async_errors(self):
+        self.assertEqual(self.client.get('/api/async/table/0/table-summary/').status_code, 404)
+        self.client.force_authenticate(None)
+        response = self.client.get(f'/api/async/table/{self.restaurant.id}/table-summary/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        token = Token.objects.get(user=self.user)
+        response = self.client.get(f'/api/async/table/{self.restaurant.id}/table-summary/',
+                                   HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.wsgi_request.user, response.wsgi_request.auth), (self.user, token))
+
+
+class TableStreamTest(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.restaurant = make_restaurant()
+        self.table = make_tables(self.restaurant, 2)[0]
+        self.path = f'/api/restaurant/{self.restaurant.id}/tables/stream'
+
+    def read_events(self, **headers):
+        response = self.client.get(self.path, headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = b''.join(response).decode().strip().split('\n\n')
+        return [dict(line.split(': ', 1) for line in chunk.split('\n')) for chunk in chunks[1:]]
+
+    def test_snapshot_then_resume(self):
+        snapshot = self.read_events()
+        self.assertEqual([event['event'] for event in snapshot], ['snapshot'])
+        self.assertEqual(len(json.loads(snapshot[0]['data'])['tables']), 2)
+
+        table = Table.objects.get(pk=self.table.pk)
+        table.status = Table.Status.OCCUPIED
+        with self.captureOnCommitCallbacks(execute=True):
+            table.save()
+
+        events = self.read_events(**{'Last-Event-ID': snapshot[0]['id']})
+        self.assertEqual([event['event'] for event in events], ['table'])
+        self.assertEqual(json.loads(events[0]['data'])['previous_status'], Table.Status.FREE)
+        self.assertEqual(self.read_events(**{'Last-Event-ID': events[0]['id']}), [])
+        self.assertEqual(self.read_events(**{'Last-Event-ID': 'other-process:1'})[0]['event'], 'snapshot')
+        self.assertEqual(self.client.get('/api/restaurant/0/tables/stream').status_code, 404)
+
+    async def test_follow_wakes_on_publish(self):
+        stream = table_events(self.restaurant.id)
+        await anext(stream)
+        snapshot = await anext(stream)
+        self.assertIn('event: snapshot', snapshot)
+
+        threading.Thread(target=broker.publish, args=(self.restaurant.id, 'table', {'id': self.table.pk})).start()
+        event = await asyncio.wait_for(anext(stream), 5)
+        self.assertIn('event: table', event)
+        await stream.aclose()
@@ -1,16 +1,28 @@
 from django.urls import path
 from core.restaurant.endpoints.restaurants.views import RestaurantListAPIView, RestaurantRetrieveAPIView, \
-    GetReservationRestaurant
+    GetReservationRestaurant, RestaurantAvailabilityApiView, RestaurantOnboardingApiView, AsyncReservationsByRestaurant, \
+    RestaurantOccupancyApiView, AsyncRestaurantDetail
 from core.restaurant.endpoints.tables.views import TableListCreateView, TableRetrieveUpdateDestroyAPIView, \
-    TableSummaryApiView,TableByRestaurant
+    TableSummaryApiView,TableByRestaurant, AsyncTableByRestaurant, AsyncTableSummaryView, TableStreamView
 
 urlpatterns = [
     path('restaurant/', RestaurantListAPIView.as_view()),
+    path('restaurant/bulk/', RestaurantOnboardingApiView.as_view(), name='restaurant-onboarding'),
     path('restaurant/<int:pk>/', RestaurantRetrieveAPIView.as_view()),
     path('restaurant/<int:restaurant_id>/reservation-summary/', GetReservationRestaurant.as_view()),
+    path('restaurant/<int:restaurant_id>/availability/', RestaurantAvailabilityApiView.as_view(),
+         name='restaurant-availability'),
+    path('restaurant/<int:restaurant_id>/tables/stream', TableStreamView.as_view(), name='table-stream'),
+    path('restaurant/<int:restaurant_id>/occupancy/', RestaurantOccupancyApiView.as_view(),
+         name='restaurant-occupancy'),
     path('table/', TableListCreateView.as_view()),
     path('table/<int:pk>/restaurant/', TableByRestaurant.as_view()),
     path('table/<int:restaurant_id>/table-summary/', TableSummaryApiView.as_view(), name='table-summary'),
     path('table/<int:pk>/', TableRetrieveUpdateDestroyAPIView.as_view()),
 
+    path('async/restaurant/<int:pk>/', AsyncRestaurantDetail.as_view()),
+    path('async/restaurant/<int:restaurant_id>/reservation-summary/', AsyncReservationsByRestaurant.as_view()),
+    path('async/table/<int:pk>/restaurant/', AsyncTableByRestaurant.as_view()),
+    path('async/table/<int:restaurant_id>/table-summary/', AsyncTableSummaryView.as_view()),
+
 ]
@@ -0,0 +1,112 @@
+import datetime
+import random
+from contextlib import contextmanager
+
+from django.db import transaction, DEFAULT_DB_ALIAS
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+
+from core.customers.models import CustomerUser
+from core.reservations.models import Reservation, TableReservations
+from core.reservations.rollups import backfill
+from core.restaurant.models import Restaurant, Table
+from core.restaurant.signals import restaurants_bulk_created, tables_bulk_created
+
+SEED_START_DATE = datetime.date(2026, 1, 1)
+SEED_DAYS = 90
+SEED_BATCH_SIZE = 1000
+
+
+def seed(restaurants=50, tables=20, reservations=20000, customers=500, random_seed=0):
+    """
+    Fill the database with ``restaurants`` restaurants of ``tables`` tables
+    each, ``customers`` customers and ``reservations`` reservations spread
+    over them, using ``bulk_create`` only. Confirmed reservations get a table
+    of their restaurant. Meant for empty (test) databases, as it does not
+    look for clashes with existing rows.
+
+    Returns the ids of the created rows by model name.
+    """
+    rng = random.Random(random_seed)
+    statuses = [status for status, _ in Reservation.STATUS_RESERVATIONS]
+    table_statuses = Table.Status.values
+
+    with transaction.atomic():
+        Restaurant.objects.bulk_create((
+            Restaurant(
+                rnc=f'{n:011d}',
+                name=f'Seed restaurant {n}',
+                address='Avenida del Sol 234',
+                phone=f'8{n:09d}',
+                email=f'seed{n}@dineeasy.com',
+                capacity=tables * 4,
+                opening_time=datetime.time(10, 0),
+                closing_time=datetime.time(23, 0),
+            ) for n in range(1, restaurants + 1)
+        ), batch_size=SEED_BATCH_SIZE)
+        restaurant_ids = list(Restaurant.objects.filter(name__startswith='Seed restaurant ').order_by('id')
+                              .values_list('id', flat=True))
+
+        CustomerUser.objects.bulk_create((
+            CustomerUser(username=f'seed-customer-{n}', email=f'seed-customer{n}@dineeasy.com')
+            for n in range(1, customers + 1)
+        ), batch_size=SEED_BATCH_SIZE)
+        customer_ids = list(CustomerUser.objects.filter(username__startswith='seed-customer-').order_by('id')
+                            .values_list('id', flat=True))
+
+        Table.objects.bulk_create((
+            Table(restaurant_id=restaurant_id, number=number, capacity=rng.choice((2, 4, 6, 8)),
+                  status=rng.choice(table_statuses))
+            for restaurant_id in restaurant_ids for number in range(1, tables + 1)
+        ), batch_size=SEED_BATCH_SIZE)
+        tables_by_restaurant = {restaurant_id: [] for restaurant_id in restaurant_ids}
+        for table_id, restaurant_id in Table.objects.filter(restaurant_id__in=restaurant_ids).order_by('id') \
+                .values_list('id', 'restaurant_id'):
+            tables_by_restaurant[restaurant_id].append(table_id)
+
+        Reservation.objects.bulk_create((
+            Reservation(
+                customer_id=rng.choice(customer_ids),
+                restaurant_id=rng.choice(restaurant_ids),
+                party_size=rng.randint(1, 8),
+                status=rng.choice(statuses),
+                date=SEED_START_DATE + datetime.timedelta(days=rng.randrange(SEED_DAYS)),
+                time=datetime.time(rng.randint(10, 21), rng.choice((0, 30))),
+            ) for _ in range(reservations)
+        ), batch_size=SEED_BATCH_SIZE)
+        reservation_ids = []
+        assignments = []
+        for reservation_id, restaurant_id, status in Reservation.objects.filter(
+            restaurant_id__in=restaurant_ids
+        ).order_by('id').values_list('id', 'restaurant_id', 'status'):
+            reservation_ids.append(reservation_id)
+            if status == 'confirmed' and tables_by_restaurant[restaurant_id]:
+                assignments.append(TableReservations(
+                    reservation_id=reservation_id, table_id=rng.choice(tables_by_restaurant[restaurant_id])
+                ))
+        TableReservations.objects.bulk_create(assignments, batch_size=SEED_BATCH_SIZE)
+        backfill(restaurant_ids)
+
+    restaurants_bulk_created.send(sender=Restaurant, restaurant_ids=restaurant_ids)
+    tables_bulk_created.send(sender=Table, restaurant_ids=set(restaurant_ids))
+    return {
+        'restaurants': restaurant_ids,
+        'customers': customer_ids,
+        'tables': [table_id for table_ids in tables_by_restaurant.values() for table_id in table_ids],
+        'reservations': reservation_ids,
+    }
+
+
+@contextmanager
+def seeded_test_database(**sizes):
+    """
+    Create the test database, ``seed`` it with ``sizes`` and yield the ids of
+    the created rows. The test database is destroyed on exit.
+    """
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+    try:
+        yield seed(**sizes)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
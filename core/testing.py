@@ -0,0 +1,101 @@
+import datetime
+import json
+from itertools import count
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from core.customers.models import CustomerUser
+from core.reservations.models import Reservation
+from core.restaurant.models import Restaurant, Table
+
+_sequence = count(1)
+
+
+def make_restaurant(**kwargs):
+    n = next(_sequence)
+    data = {
+        'rnc': f'{n:09d}',
+        'name': f'Restaurant {n}',
+        'address': 'Avenida del Sol 234',
+        'phone': f'8{n:09d}',
+        'email': f'restaurant{n}@dineeasy.com',
+        'capacity': 100,
+        'opening_time': datetime.time(10, 0),
+        'closing_time': datetime.time(23, 0),
+    }
+    data.update(kwargs)
+    return Restaurant.objects.create(**data)
+
+
+def make_customer(**kwargs):
+    n = next(_sequence)
+    data = {'username': f'customer{n}', 'email': f'customer{n}@dineeasy.com'}
+    data.update(kwargs)
+    return CustomerUser.objects.create(**data)
+
+
+def make_tables(restaurant, total, capacity=4):
+    first = (Table.objects.filter(restaurant=restaurant).order_by('-number').values_list('number', flat=True).first()
+             or 0) + 1
+    return Table.objects.bulk_create(
+        Table(restaurant=restaurant, number=number, capacity=capacity) for number in range(first, first + total)
+    )
+
+
+def make_reservations(total, customer=None, restaurant=None, status='pending', party_size=2, **kwargs):
+    customer = customer or make_customer()
+    restaurant = restaurant or make_restaurant()
+    return Reservation.objects.bulk_create(
+        Reservation(customer=customer, restaurant=restaurant, party_size=party_size, status=status,
+                    date=datetime.date(2026, 1, 1) + datetime.timedelta(days=i), time=datetime.time(20, 0), **kwargs)
+        for i in range(total)
+    )
+
+
+def response_json(response):
+    """The JSON body of a test client response, streamed or not."""
+    content = b''.join(response) if response.streaming else response.content
+    return json.loads(content)
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Base test case for query budgets. ``assertQueryBudget`` requests an
+    endpoint, adds rows with ``grow`` and requests it again: the query count
+    must stay within the budget and must not change with the number of rows.
+    Budgets are measured against the configured cache, which starts empty.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_customer()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, path):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        self.assertLess(response.status_code, 400, f'{path} returned {response.status_code}')
+        return len(context.captured_queries), context
+
+    def assertQueryBudget(self, path, budget, grow=None):
+        if grow is not None:
+            grow()
+        queries, context = self.count_queries(path)
+        self.assertLessEqual(
+            queries, budget,
+            f'{path} issued {queries} queries, budget is {budget}:\n' + self._format(context)
+        )
+        if grow is not None:
+            grow()
+            grown, context = self.count_queries(path)
+            self.assertEqual(
+                grown, queries,
+                f'{path} issues queries per row ({queries} -> {grown}):\n' + self._format(context)
+            )
+
+    def _format(self, context):
+        return '\n'.join(query['sql'] for query in context.captured_queries)
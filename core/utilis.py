@@ -1,19 +1,267 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class SmallResultsSetPagination(PageNumberPagination):
+
+ESTIMATED_COUNT_THRESHOLD = 10000
+ESTIMATED_COUNT_QUERIES = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+    'mysql': 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s',
+    # Filled by ANALYZE: the first number of each stat is the row count of the table.
+    'sqlite': 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+}
+
+
+def estimated_count(model, using='default'):
+    """
+    Row count of the table of ``model`` from the statistics of the database,
+    None when the backend keeps none or the table was never analyzed.
+    """
+    connection = connections[using]
+    sql = ESTIMATED_COUNT_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # sqlite_stat1 only exists once ANALYZE has run.
+            if connection.vendor == 'sqlite' and 'sqlite_stat1' not in connection.introspection.table_names(cursor):
+                return None
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of the admin changelists of large tables: an unfiltered list
+    takes its size from ``estimated_count`` instead of a ``COUNT(*)`` over
+    the whole table once it holds ``ESTIMATED_COUNT_THRESHOLD`` rows. Filtered
+    lists, and small tables, are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class ResultsSetPagination(PageNumberPagination):
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, using the async ORM."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        try:
+            self.page = paginator.page(self.get_page_number(request, paginator))
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=request.query_params.get(
+                self.page_query_param, 1), message=str(exc)))
+        self.page.object_list = [item async for item in self.page.object_list]
+        return self.page.object_list
+
+
+class SmallResultsSetPagination(ResultsSetPagination):
     page_size = 3
     page_size_query_param = 'page_size'
     max_page_size = 10000
 
 
-class LargeResultsSetPagination(PageNumberPagination):
+class LargeResultsSetPagination(ResultsSetPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 10000
 
 
-class BigResultsSetPagination(PageNumberPagination):
+class BigResultsSetPagination(ResultsSetPagination):
     page_size = 15
     page_size_query_param = 'page_size'
     max_page_size = 10000
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination: the cursor is an opaque token holding the ordering key
+    of the last row of the page, and the next page is fetched with a
+    ``WHERE key > cursor`` predicate instead of an OFFSET, so every page costs
+    the same index seek. No COUNT is issued unless the client asks for it with
+    ``?count=true``.
+
+    Views pick their ordering with ``keyset_ordering``; the primary key is
+    appended when missing so the key is unique.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self._setup(queryset, request, view):
+            return None
+        if self.wants_count:
+            self.count = queryset.count()
+        return self._set_page(list(self._page_queryset(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, using the async ORM."""
+        if not self._setup(queryset, request, view):
+            return None
+        if self.wants_count:
+            self.count = await queryset.acount()
+        return self._set_page([item async for item in self._page_queryset(queryset)])
+
+    def _setup(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return False
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [queryset.model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+        self.cursor = self.decode_cursor(request)
+        self.reverse = self.cursor is not None and self.cursor[1]
+        self.count = None
+        self.wants_count = request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+        return True
+
+    def _page_queryset(self, queryset):
+        if self.cursor is not None:
+            queryset = queryset.filter(self._seek(self.cursor[0], self.reverse))
+        ordering = [self._invert(field) for field in self.ordering] if self.reverse else self.ordering
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def _invert(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _seek(self, values, reverse):
+        """
+        Lexicographic "after the cursor" predicate over the ordering key. The
+        leading range on the first field lets the database seek the index.
+        """
+        lookups = []
+        for field, value in zip(self.ordering, values):
+            descending = field.startswith('-') != reverse
+            lookups.append((field.lstrip('-'), 'lt' if descending else 'gt', value))
+
+        predicate = Q()
+        for position, (name, lookup, value) in enumerate(lookups):
+            previous = {previous_name: previous_value for previous_name, _, previous_value in lookups[:position]}
+            predicate |= Q(**previous) & Q(**{f'{name}__{lookup}': value})
+
+        if len(lookups) == 1:
+            return predicate
+        name, lookup, value = lookups[0]
+        return Q(**{f'{name}__{lookup}e': value}) & predicate
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            token = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values = [field.to_python(value) for field, value in zip(self.fields, token['k'], strict=True)]
+            return values, bool(token.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse=False):
+        if isinstance(instance, dict):
+            values = [instance.get(field.attname, instance.get(field.name)) for field in self.fields]
+        else:
+            values = [getattr(instance, field.attname) for field in self.fields]
+        token = {'k': values}
+        if reverse:
+            token['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(token, cls=DjangoJSONEncoder).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'] = {
+            'count': {'type': 'integer', 'example': 123},
+            **response_schema['properties']
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Include the total number of results.',
+            'schema': {'type': 'boolean'},
+        })
+        return parameters
+
+
+class SmallKeysetPagination(KeysetPagination):
+    page_size = 3
+
+
+class LargeKeysetPagination(KeysetPagination):
+    page_size = 10
+
+
+class BigKeysetPagination(KeysetPagination):
+    page_size = 15